@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 import wave
 from glob import glob
@@ -73,16 +74,22 @@ class FileMockMicrophone(AudioSource):
 
 
 class AudioTester(object):
-    def __init__(self, samp_rate):
+    def __init__(self, samp_rate, streaming=False):
         print  # Pad debug messages
         self.ww_recognizer = RecognizerLoop.create_mycroft_recognizer(
             samp_rate, 'en-us')
         self.listener = ResponsiveRecognizer(self.ww_recognizer)
+        self.listener.streaming = streaming
+        # CPU seconds spent listening to audio_s seconds of audio
+        self.cpu_s = 0.0
+        self.audio_s = 0.0
         print
         speech_logger.setLevel(100)  # Disables logging to clean output
 
     def test_audio(self, file_name):
         source = FileMockMicrophone(file_name)
+        self.audio_s += float(source.stream.size) / source.SAMPLE_RATE
+        start = time.clock()
         ee = pyee.EventEmitter()
 
         class SharedData:
@@ -98,6 +105,7 @@ class AudioTester(object):
                 self.listener.listen(source, ee)
         except EOFError:
             pass
+        self.cpu_s += time.clock() - start
 
         return SharedData.times_found
 
@@ -152,11 +160,17 @@ def print_ww_found_status(word, short_name):
     print("Wake word " + bold_str(word) + " - " + short_name)
 
 
-def test_false_negative(directory):
+def print_cpu_usage(tester):
+    print("CPU " + bold_str("{0:.2f}".format(tester.cpu_s) + "s") +
+          " for {0:.1f}s of audio, ".format(tester.audio_s) +
+          bold_str(to_percent(tester.cpu_s / max(tester.audio_s, 1e-9))))
+
+
+def test_false_negative(directory, streaming=False):
     file_names = get_file_names(directory)
 
     # Grab audio format info from first file
-    tester = AudioTester(file_frame_rate(file_names[0]))
+    tester = AudioTester(file_frame_rate(file_names[0]), streaming)
 
     def on_file_finish(short_name, times_found):
         not_found_str = Color.RED + "Not found"
@@ -170,14 +184,15 @@ def test_false_negative(directory):
     print
     print("Found " + bold_str(num_found) + " out of " + bold_str(total))
     print(bold_str(to_percent(float(num_found) / total)) + " accuracy.")
+    print_cpu_usage(tester)
     print
 
 
-def test_false_positive(directory):
+def test_false_positive(directory, streaming=False):
     file_names = get_file_names(directory)
 
     # Grab audio format info from first file
-    tester = AudioTester(file_frame_rate(file_names[0]))
+    tester = AudioTester(file_frame_rate(file_names[0]), streaming)
 
     def on_file_finish(short_name, times_found):
         not_found_str = Color.GREEN + "Not found"
@@ -191,27 +206,39 @@ def test_false_positive(directory):
     print
     print("Found " + bold_str(num_found) + " false positives")
     print("in " + bold_str(str(total)) + " files")
+    print_cpu_usage(tester)
     print
 
 
-def run_test():
+def run_test(streaming=False):
     directory = join('audio-accuracy-test', 'data')
 
     false_neg_dir = join(directory, 'with_wake_word', 'query_after')
     false_pos_dir = join(directory, 'without_wake_word')
 
+    print(bold_str("Wake word " + ("streaming" if streaming else
+                                   "window checks")))
     try:
-        test_false_negative(false_neg_dir)
+        test_false_negative(false_neg_dir, streaming)
     except IOError:
         print(bold_str("Warning: No wav files found in " + false_neg_dir))
 
     try:
-        test_false_positive(false_pos_dir)
+        test_false_positive(false_pos_dir, streaming)
     except IOError:
         print(bold_str("Warning: No wav files found in " + false_pos_dir))
 
     print("Complete!")
 
 
+# usage: python audio-accuracy-test/audio_accuracy_test.py [--streaming]
+#        python audio-accuracy-test/audio_accuracy_test.py --compare
+#
+# --compare runs the files with wake word window checks and then with
+# streaming decoding, to compare accuracy and CPU usage of both
 if __name__ == "__main__":
-    run_test()
+    if "--compare" in sys.argv:
+        run_test(streaming=False)
+        run_test(streaming=True)
+    else:
+        run_test("--streaming" in sys.argv)
@@ -0,0 +1,117 @@
+# Copyright 2016 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import time
+from collections import deque
+from threading import Condition
+
+from mycroft.util.log import getLogger
+
+__author__ = 'jarbas'
+
+LOG = getLogger(__name__)
+
+
+class Phrase(object):
+    """ Audio recorded by the AudioProducer on its way through STT """
+
+    def __init__(self, audio, number):
+        self.audio = audio
+        self.number = number
+        self.queued = time.time()
+
+    def age(self):
+        return time.time() - self.queued
+
+    def drop(self):
+        # a streaming STT may be transcribing it already
+        stream = getattr(self.audio, 'stt_stream', None)
+        if stream:
+            stream.cancel()
+
+
+class AudioQueue(object):
+    """
+    Phrases waiting for an AudioConsumer, bounded and without stale ones
+
+    Holds at most maxsize phrases. A phrase put in a full queue makes it
+    drop its oldest one, the producer never waits as it has to keep
+    reading the mic, and the latest thing the user said is worth more
+    than what they gave up waiting for. Phrases queued for longer than
+    max_age seconds are dropped when taken, an answer to them would come
+    too late to make sense.
+
+    Several consumers can transcribe phrases at the same time, wait_turn
+    holds each back until the phrases recorded before it are finished,
+    so utterances are still handled in the order they were spoken.
+    """
+
+    def __init__(self, maxsize=3, max_age=10):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.phrases = deque()
+        self.condition = Condition()
+        self.count = 0
+        # number of the oldest phrase not finished, and newer finished ones
+        self.next = 0
+        self.finished = set()
+        self.dropped = 0
+
+    def put(self, audio):
+        with self.condition:
+            if len(self.phrases) >= self.maxsize:
+                self._drop(self.phrases.popleft(), "queue full")
+            self.phrases.append(Phrase(audio, self.count))
+            self.count += 1
+            self.condition.notify_all()
+
+    def get(self):
+        with self.condition:
+            while True:
+                while not self.phrases:
+                    self.condition.wait()
+                phrase = self.phrases.popleft()
+                if phrase.age() <= self.max_age:
+                    return phrase
+                self._drop(phrase, "%.1f seconds old" % phrase.age())
+
+    def _drop(self, phrase, reason):
+        LOG.warn("Dropping phrase %d, %s" % (phrase.number, reason))
+        phrase.drop()
+        self.dropped += 1
+        self._finish(phrase)
+
+    def wait_turn(self, phrase):
+        """ waits until every phrase recorded before is finished """
+        with self.condition:
+            while self.next < phrase.number:
+                self.condition.wait()
+
+    def finish(self, phrase):
+        with self.condition:
+            self._finish(phrase)
+
+    def _finish(self, phrase):
+        self.finished.add(phrase.number)
+        while self.next in self.finished:
+            self.finished.remove(self.next)
+            self.next += 1
+        self.condition.notify_all()
+
+    def __len__(self):
+        return len(self.phrases)
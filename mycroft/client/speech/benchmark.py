@@ -0,0 +1,256 @@
+# Copyright 2016 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import audioop
+import logging
+import struct
+import sys
+import time
+import wave
+from glob import glob
+from os.path import basename, dirname, join
+from random import Random
+
+from speech_recognition import AudioSource
+
+from mycroft.client.speech.mic import ResponsiveRecognizer
+
+__author__ = 'jarbas'
+
+# usage: python -m mycroft.client.speech.benchmark [benchmark] [args]
+# ie:    python -m mycroft.client.speech.benchmark cpu 16000,48000 60
+#        python -m mycroft.client.speech.benchmark endpoint 0.2,0.3 wavs/
+#
+# cpu [rates] [seconds]
+# Feeds seconds of audio per sample rate through the listener loop of
+# ResponsiveRecognizer, waiting for the wake word and then recording a
+# phrase, and reports the CPU time spent per 1024 sample chunk. The
+# wake word recognizer is a stand in that costs nothing, so only the
+# audio handling of the loop itself is measured.
+#
+# endpoint [hangovers] [noise] [directory]
+# Records the speech of every WAV file of the directory, the test
+# fixtures by default, and of each pair of them with a short pause
+# between, with record_phrase and the threshold settled on white noise
+# of the given rms, which also follows the speech. Reports how long
+# after the end of speech the phrase was ended, with the noise counter
+# and with the voice activity detector for each hangover, or how early
+# when it was cut. The speech of a file runs from its first to its last
+# 10 ms frame louder than a fifth of the loudest one.
+
+DEFAULT_RATES = [16000, 48000]
+CHUNK = 1024
+FIXTURES = join(dirname(__file__), "..", "..", "..", "test", "client", "data")
+PAUSE_SEC = 0.25
+FRAME_SEC = 0.01
+NOISE = {}
+
+
+def noise(samples, amplitude):
+    values = [int(amplitude * ((i * 7919) % 200 - 100) / 100.0)
+              for i in range(samples)]
+    return struct.pack("<%dh" % samples, *values)
+
+
+class FakeStream(object):
+    def __init__(self, chunk):
+        self.chunk = chunk
+        self.reads = 0
+
+    def read(self, size):
+        self.reads += 1
+        return self.chunk
+
+
+class FakeSource(AudioSource):
+    def __init__(self, rate, amplitude):
+        self.CHUNK = CHUNK
+        self.SAMPLE_RATE = rate
+        self.SAMPLE_WIDTH = 2
+        self.stream = FakeStream(noise(CHUNK, amplitude))
+
+
+class FakeWakeWord(object):
+    """ hears the wake word once checks transcriptions were made """
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    def transcribe(self, byte_data):
+        self.checks -= 1
+        return len(byte_data)
+
+    def found_wake_word(self, hypothesis):
+        return self.checks <= 0
+
+
+def cpu_per_chunk(run, source):
+    source.stream.reads = 0
+    start = time.clock()
+    run()
+    return (time.clock() - start) / source.stream.reads
+
+
+def run_cpu(rate, seconds):
+    sec_per_buffer = float(CHUNK) / rate
+    checks = int(seconds / ResponsiveRecognizer.SEC_BETWEEN_WW_CHECKS)
+    recognizer = ResponsiveRecognizer(FakeWakeWord(checks))
+    recognizer.dynamic_energy_threshold = False
+    recognizer.energy_threshold = 1000
+    quiet = FakeSource(rate, 10)
+    wake_word = cpu_per_chunk(
+        lambda: recognizer.wait_until_wake_word(quiet, sec_per_buffer), quiet)
+    # loud all along, recorded until RECORDING_TIMEOUT
+    loud = FakeSource(rate, 20000)
+    phrases = int(max(seconds / recognizer.RECORDING_TIMEOUT, 1))
+    phrase = cpu_per_chunk(
+        lambda: [recognizer.record_phrase(loud, sec_per_buffer)
+                 for i in range(phrases)], loud)
+    print "%5d Hz  wake word %7.1f us/chunk (%4.2f%% cpu)  " \
+          "phrase %7.1f us/chunk (%4.2f%% cpu)" % (
+              rate, 1e6 * wake_word, 100 * wake_word / sec_per_buffer,
+              1e6 * phrase, 100 * phrase / sec_per_buffer)
+
+
+def run_cpu_benchmark(args):
+    rates = DEFAULT_RATES
+    seconds = 60
+    if len(args) > 0:
+        rates = [int(rate) for rate in args[0].split(",")]
+    if len(args) > 1:
+        seconds = float(args[1])
+    for rate in rates:
+        run_cpu(rate, seconds)
+
+
+def white_noise(level, seconds, rate):
+    """ seconds of white noise of rms level, the same every time """
+    key = (level, seconds, rate)
+    if key not in NOISE:
+        random = Random(0)
+        samples = [int(max(-32768, min(32767, random.gauss(0, level))))
+                   for i in range(int(seconds * rate))]
+        NOISE[key] = struct.pack("<%dh" % len(samples), *samples)
+    return NOISE[key]
+
+
+def load_speech(path):
+    """ rate and speech of a 16 bit mono WAV file, None for others """
+    wav = wave.open(path, 'rb')
+    if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+        return None
+    data = wav.readframes(wav.getnframes())
+    size = int(wav.getframerate() * FRAME_SEC) * 2
+    frames = [audioop.rms(data[i:i + size], 2)
+              for i in range(0, len(data) - size + 1, size)]
+    loud = [i for i, energy in enumerate(frames) if energy > max(frames) / 5]
+    return wav.getframerate(), data[loud[0] * size:(loud[-1] + 1) * size]
+
+
+class WavStream(object):
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+
+    def read(self, size):
+        chunk = self.data[self.position:self.position + 2 * size]
+        self.position += 2 * size
+        return chunk
+
+
+class WavSource(AudioSource):
+    def __init__(self, rate, data):
+        self.CHUNK = CHUNK
+        self.SAMPLE_RATE = rate
+        self.SAMPLE_WIDTH = 2
+        self.stream = WavStream(data)
+
+
+def endpoint(rate, speech, level, hangover=None):
+    """ seconds from the end of speech to the end of the phrase """
+    recognizer = ResponsiveRecognizer(None)
+    recognizer.vad = hangover is not None
+    recognizer.vad_hangover = hangover
+    sec_per_buffer = float(CHUNK) / rate
+    # let the threshold settle on the noise, like waiting for the wake word
+    noise = WavSource(rate, white_noise(level, 5, rate))
+    for i in range(int(5 / sec_per_buffer)):
+        energy = recognizer.calc_energy(
+            recognizer.record_sound_chunk(noise), 2)
+        if energy < recognizer.energy_threshold * recognizer.multiplier:
+            recognizer.adjust_threshold(energy, sec_per_buffer)
+    silence = recognizer.RECORDING_TIMEOUT_WITH_SILENCE + 1
+    source = WavSource(rate, speech + white_noise(level, silence, rate))
+    phrase = recognizer.record_phrase(source, sec_per_buffer)
+    return float(len(phrase) - 2 - len(speech)) / (2 * rate)
+
+
+def run_endpoint_benchmark(args):
+    hangovers = [0.2, 0.3]
+    level = 50
+    directory = FIXTURES
+    if len(args) > 0:
+        hangovers = [float(hangover) for hangover in args[0].split(",")]
+    if len(args) > 1:
+        level = int(args[1])
+    if len(args) > 2:
+        directory = args[2]
+    paths = sorted(glob(join(directory, "*.wav")))
+    speech = [(basename(path), load_speech(path)) for path in paths]
+    phrases = [(name, rate, data) for name, (rate, data) in
+               [(name, speech) for name, speech in speech if speech]]
+    phrases += [(first[0] + "+" + second[0], first[1],
+                 first[2] + white_noise(level, PAUSE_SEC, first[1]) +
+                 second[2])
+                for first in phrases[:] for second in phrases[:]
+                if first is not second and first[1] == second[1]]
+    print "%-32s %8s" % ("ms after speech", "counter") + "".join(
+        "  vad %4.2fs" % hangover for hangover in hangovers)
+    results = [[] for i in range(len(hangovers) + 1)]
+    for name, rate, data in phrases:
+        row = "%-32s" % name[:32]
+        for i, hangover in enumerate([None] + hangovers):
+            latency = endpoint(rate, data, level, hangover)
+            results[i].append(latency)
+            row += " %10s" % (("%d" % (1000 * latency)) if latency >= 0
+                              else "cut %d" % (-1000 * latency))
+        print row
+    print "%-32s" % "mean when not cut" + "".join(
+        " %10d" % (1000 * sum(ended) / max(len(ended), 1))
+        for ended in [[l for l in latencies if l >= 0]
+                      for latencies in results])
+    print "%-32s" % "cut" + "".join(
+        " %10d" % len([l for l in latencies if l < 0])
+        for latencies in results)
+
+
+BENCHMARKS = {
+    "cpu": run_cpu_benchmark,
+    "endpoint": run_endpoint_benchmark
+}
+
+
+def main(argv):
+    logging.disable(logging.INFO)
+    names = [argv[1]] if len(argv) > 1 else sorted(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name](argv[2:])
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -17,19 +17,19 @@
 
 
 import time
-from Queue import Queue
-from threading import Thread
+from threading import Lock, Thread
 
 import speech_recognition as sr
 from pyee import EventEmitter
 from requests import HTTPError
 from requests.exceptions import ConnectionError
 
+from mycroft.client.speech.audio_queue import AudioQueue
 from mycroft.client.speech.local_recognizer import LocalRecognizer
 from mycroft.client.speech.mic import MutableMicrophone, ResponsiveRecognizer
 from mycroft.configuration import ConfigurationManager
 from mycroft.messagebus.message import Message
-from mycroft.metrics import MetricsAggregator
+from mycroft.metrics import MetricsAggregator, Stopwatch
 from mycroft.session import SessionManager
 from mycroft.stt import STTFactory
 from mycroft.util import connected
@@ -45,7 +45,7 @@ class AudioProducer(Thread):
     mic for potential speech chunks and pushes them onto the queue.
     """
 
-    def __init__(self, state, queue, mic, recognizer, emitter):
+    def __init__(self, state, queue, mic, recognizer, emitter, stt=None):
         super(AudioProducer, self).__init__()
         self.daemon = True
         self.state = state
@@ -53,13 +53,16 @@ class AudioProducer(Thread):
         self.mic = mic
         self.recognizer = recognizer
         self.emitter = emitter
+        # streaming STTs get the phrase while it is being recorded
+        self.stt = stt if stt and stt.streaming else None
 
     def run(self):
         with self.mic as source:
             self.recognizer.adjust_for_ambient_noise(source)
             while self.state.running:
                 try:
-                    audio = self.recognizer.listen(source, self.emitter)
+                    stt = None if self.state.sleeping else self.stt
+                    audio = self.recognizer.listen(source, self.emitter, stt)
                     self.queue.put(audio)
                 except IOError, ex:
                     # NOTE: Audio stack on raspi is slightly different, throws
@@ -73,14 +76,15 @@ class AudioProducer(Thread):
 class AudioConsumer(Thread):
     """
     AudioConsumer
-    Consumes AudioData chunks off the queue
+    Consumes phrases off the AudioQueue, several consumers can share one
+    to transcribe phrases at the same time
     """
 
     # In seconds, the minimum audio size to be sent to remote STT
     MIN_AUDIO_SIZE = 0.5
 
     def __init__(self, state, queue, emitter, stt,
-                 wakeup_recognizer, mycroft_recognizer):
+                 wakeup_recognizer, mycroft_recognizer, wakeup_lock=None):
         super(AudioConsumer, self).__init__()
         self.daemon = True
         self.queue = queue
@@ -89,6 +93,8 @@ class AudioConsumer(Thread):
         self.stt = stt
         self.wakeup_recognizer = wakeup_recognizer
         self.mycroft_recognizer = mycroft_recognizer
+        # the wake up decoder is shared by the consumers
+        self.wakeup_lock = wakeup_lock or Lock()
         self.metrics = MetricsAggregator()
 
     def run(self):
@@ -96,17 +102,27 @@ class AudioConsumer(Thread):
             self.read()
 
     def read(self):
-        audio = self.queue.get()
-
-        if self.state.sleeping:
-            self.wake_up(audio)
-        else:
-            self.process(audio)
+        phrase = self.queue.get()
+        self.metrics.timer("mycroft.listener.queue_s", phrase.age())
+        self.metrics.timer("mycroft.listener.record_s",
+                           self._audio_length(phrase.audio))
+        try:
+            if self.state.sleeping:
+                self.wake_up(phrase)
+            else:
+                self.process(phrase)
+        finally:
+            self.queue.finish(phrase)
+            self.metrics.level("mycroft.listener.dropped", self.queue.dropped)
+            self.metrics.flush()
 
     # TODO: Localization
-    def wake_up(self, audio):
-        if self.wakeup_recognizer.is_recognized(audio.frame_data,
-                                                self.metrics):
+    def wake_up(self, phrase):
+        phrase.drop()
+        with self.wakeup_lock:
+            recognized = self.wakeup_recognizer.is_recognized(
+                phrase.audio.frame_data, self.metrics)
+        if recognized:
             SessionManager.touch()
             self.state.sleeping = False
             self.__speak("I'm awake.")
@@ -118,7 +134,7 @@ class AudioConsumer(Thread):
             audio.sample_rate * audio.sample_width)
 
     # TODO: Localization
-    def process(self, audio):
+    def process(self, phrase):
         SessionManager.touch()
         payload = {
             'utterance': self.mycroft_recognizer.key_phrase,
@@ -126,16 +142,26 @@ class AudioConsumer(Thread):
         }
         self.emitter.emit("recognizer_loop:wakeword", payload)
 
-        if self._audio_length(audio) < self.MIN_AUDIO_SIZE:
+        if self._audio_length(phrase.audio) < self.MIN_AUDIO_SIZE:
             LOG.warn("Audio too short to be processed")
+            phrase.drop()
         else:
-            self.transcribe(audio)
+            self.transcribe(phrase)
 
-    def transcribe(self, audio):
+    def transcribe(self, phrase):
         text = None
+        audio = phrase.audio
+        stream = getattr(audio, 'stt_stream', None)
+        stopwatch = Stopwatch()
+        stopwatch.start()
         try:
-            # Invoke the STT engine on the audio clip
-            text = self.stt.execute(audio).lower().strip()
+            if stream:
+                # Streamed while recording, only the end is left to process
+                text = stream.stop()
+            else:
+                # Invoke the STT engine on the audio clip
+                text = self.stt.execute(audio)
+            text = text.lower().strip()
             LOG.debug("STT: " + text)
         except sr.RequestError as e:
             LOG.error("Could not request Speech Recognition {0}".format(e))
@@ -150,6 +176,7 @@ class AudioConsumer(Thread):
             LOG.error(e)
             LOG.error("Speech Recognition could not understand audio")
             self.__speak("Sorry, I didn't catch that")
+        self.metrics.timer("mycroft.listener.stt_s", stopwatch.lap())
         if text:
             # STT succeeded, send the transcribed speech on for processing
             payload = {
@@ -157,7 +184,10 @@ class AudioConsumer(Thread):
                 'lang': self.stt.lang,
                 'session': SessionManager.get().session_id
             }
+            # after the phrases spoken before it
+            self.queue.wait_turn(phrase)
             self.emitter.emit("recognizer_loop:utterance", payload)
+            self.metrics.timer("mycroft.listener.emit_s", stopwatch.stop())
             self.metrics.attr('utterances', [text])
 
     def __speak(self, utterance):
@@ -207,11 +237,16 @@ class RecognizerLoop(EventEmitter):
 
     def start_async(self):
         self.state.running = True
-        queue = Queue()
+        queue = AudioQueue(self.config.get('queue_size', 3),
+                           self.config.get('queue_max_age', 10))
+        stt = STTFactory.create()
         AudioProducer(self.state, queue, self.microphone,
-                      self.remote_recognizer, self).start()
-        AudioConsumer(self.state, queue, self, STTFactory.create(),
-                      self.wakeup_recognizer, self.mycroft_recognizer).start()
+                      self.remote_recognizer, self, stt).start()
+        wakeup_lock = Lock()
+        for i in range(self.config.get('stt_workers', 1)):
+            AudioConsumer(self.state, queue, self, stt,
+                          self.wakeup_recognizer, self.mycroft_recognizer,
+                          wakeup_lock).start()
 
     def stop(self):
         self.state.running = False
@@ -23,12 +23,21 @@ from os.path import join, dirname, abspath
 
 from pocketsphinx import Decoder
 
+from mycroft.client.speech.ring_buffer import RingBuffer
+
 __author__ = 'seanfitz, jdorleans'
 
 BASEDIR = dirname(abspath(__file__))
 
 
 class LocalRecognizer(object):
+    # seconds of audio a streamed utterance decodes before it is restarted,
+    # pocketsphinx keeps the whole utterance until it ends
+    STREAM_RESTART_SEC = 30
+    # the end of the old utterance is decoded again in the new one, so a
+    # key phrase said across the restart is still heard
+    STREAM_OVERLAP_SEC = 2
+
     def __init__(self, key_phrase, phonemes, threshold, sample_rate=16000,
                  lang="en-us"):
         self.lang = str(lang)
@@ -38,6 +47,11 @@ class LocalRecognizer(object):
         self.phonemes = phonemes
         dict_name = self.create_dict(key_phrase, phonemes)
         self.decoder = Decoder(self.create_config(dict_name))
+        # 16 bit mono audio
+        bytes_per_sec = 2 * sample_rate
+        self.stream_restart = int(self.STREAM_RESTART_SEC * bytes_per_sec)
+        self.stream_tail = RingBuffer(self.STREAM_OVERLAP_SEC * bytes_per_sec)
+        self.streamed = 0
 
     def create_dict(self, key_phrase, phonemes):
         (fd, file_name) = tempfile.mkstemp()
@@ -68,6 +82,36 @@ class LocalRecognizer(object):
             metrics.timer("mycroft.stt.local.time_s", time.time() - start)
         return self.decoder.hyp()
 
+    def start_stream(self):
+        """
+        Open an utterance that audio is fed to chunk by chunk with stream(),
+        each sample is decoded once instead of once per window checked
+        (twice around the periodic restarts of the utterance)
+        """
+        self.decoder.start_utt()
+        self.stream_tail.clear()
+        self.streamed = 0
+
+    def stream(self, chunk):
+        """ Decode the next chunk, True once the key phrase was heard """
+        if self.streamed >= self.stream_restart:
+            self.restart_stream()
+        self.decoder.process_raw(chunk, False, False)
+        self.stream_tail.append(chunk)
+        self.streamed += len(chunk)
+        return self.found_wake_word(self.decoder.hyp())
+
+    def restart_stream(self):
+        """ Start a new utterance with the last STREAM_OVERLAP_SEC """
+        tail = self.stream_tail.get()
+        self.decoder.end_utt()
+        self.decoder.start_utt()
+        self.decoder.process_raw(tail, False, False)
+        self.streamed = len(tail)
+
+    def end_stream(self):
+        self.decoder.end_utt()
+
     def is_recognized(self, byte_data, metrics):
         hyp = self.transcribe(byte_data, metrics)
         return hyp and self.key_phrase in hyp.hypstr.lower()
@@ -29,6 +29,9 @@ from speech_recognition import (
     AudioData
 )
 
+from mycroft.client.speech.mic_level import MicLevel
+from mycroft.client.speech.ring_buffer import RingBuffer
+from mycroft.client.speech.vad import VoiceActivityDetector
 from mycroft.configuration import ConfigurationManager
 from mycroft.util import check_for_signal, get_ipc_directory
 from mycroft.util.log import getLogger
@@ -149,7 +152,14 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         self.audio = pyaudio.PyAudio()
         self.multiplier = listener_config.get('multiplier')
         self.energy_ratio = listener_config.get('energy_ratio')
-        self.mic_level_file = os.path.join(get_ipc_directory(), "mic_level")
+        # decode new chunks as they come instead of the whole window
+        self.streaming = (listener_config.get('wake_word_streaming') and
+                          hasattr(wake_word_recognizer, 'stream'))
+        # end phrases with the frame level voice activity detector
+        self.vad = listener_config.get('vad')
+        self.vad_hangover = listener_config.get('vad_hangover', 0.3)
+        self.mic_level = MicLevel(os.path.join(get_ipc_directory(),
+                                               "mic_level"))
 
     @staticmethod
     def record_sound_chunk(source):
@@ -159,19 +169,23 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
     def calc_energy(sound_chunk, sample_width):
         return audioop.rms(sound_chunk, sample_width)
 
+    def write_mic_level(self, energy):
+        self.mic_level.publish(energy, self.energy_threshold)
+
     def wake_word_in_audio(self, frame_data):
         hyp = self.wake_word_recognizer.transcribe(frame_data)
         return self.wake_word_recognizer.found_wake_word(hyp)
 
-    def record_phrase(self, source, sec_per_buffer):
+    def record_phrase(self, source, sec_per_buffer, stream=None):
         """
         This attempts to record an entire spoken phrase. Essentially,
         this waits for a period of silence and then returns the audio
 
-        :rtype: bytearray
+        :rtype: str
         :param source: AudioSource
         :param sec_per_buffer: Based on source.SAMPLE_RATE
-        :return: bytearray representing the frame_data of the recorded phrase
+        :param stream: STTStream written every chunk as it is recorded
+        :return: bytes representing the frame_data of the recorded phrase
         """
         num_loud_chunks = 0
         noise = 0
@@ -200,13 +214,22 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         max_chunks_of_silence = int(self.RECORDING_TIMEOUT_WITH_SILENCE /
                                     sec_per_buffer)
 
-        # bytearray to store audio in
-        byte_data = '\0' * source.SAMPLE_WIDTH
+        vad = None
+        if self.vad:
+            vad = VoiceActivityDetector(source.SAMPLE_RATE,
+                                        source.SAMPLE_WIDTH,
+                                        self.vad_hangover,
+                                        self.MIN_LOUD_SEC_PER_PHRASE)
+
+        # bytearray to store audio in, extended in place
+        byte_data = bytearray(source.SAMPLE_WIDTH)
 
         phrase_complete = False
         while num_chunks < max_chunks and not phrase_complete:
             chunk = self.record_sound_chunk(source)
-            byte_data += chunk
+            byte_data.extend(chunk)
+            if stream:
+                stream.write(chunk)
             num_chunks += 1
 
             energy = self.calc_energy(chunk, source.SAMPLE_WIDTH)
@@ -219,43 +242,46 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
                 noise = decrease_noise(noise)
                 self.adjust_threshold(energy, sec_per_buffer)
 
-            if num_chunks % 10 == 0:
-                with open(self.mic_level_file, 'w') as f:
-                    f.write("Energy:  cur=" + str(energy) + " thresh=" +
-                            str(self.energy_threshold))
-                f.close()
+            self.write_mic_level(energy)
 
-            was_loud_enough = num_loud_chunks > min_loud_chunks
-            quiet_enough = noise <= min_noise
+            if vad:
+                vad.update(chunk, test_threshold)
+                was_loud_enough = vad.heard_speech
+                quiet_enough = vad.silent
+            else:
+                was_loud_enough = num_loud_chunks > min_loud_chunks
+                quiet_enough = noise <= min_noise
             recorded_too_much_silence = num_chunks > max_chunks_of_silence
             if quiet_enough and (was_loud_enough or recorded_too_much_silence):
                 phrase_complete = True
             if check_for_signal('buttonPress'):
                 phrase_complete = True
 
-        return byte_data
+        return str(byte_data)
 
     @staticmethod
     def sec_to_bytes(sec, source):
         return sec * source.SAMPLE_RATE * source.SAMPLE_WIDTH
 
     def wait_until_wake_word(self, source, sec_per_buffer):
+        if self.streaming:
+            self.stream_until_wake_word(source, sec_per_buffer)
+            return
+
         num_silent_bytes = int(self.SILENCE_SEC * source.SAMPLE_RATE *
                                source.SAMPLE_WIDTH)
 
         silence = '\0' * num_silent_bytes
 
-        # bytearray to store audio in
-        byte_data = silence
-
         buffers_per_check = self.SEC_BETWEEN_WW_CHECKS / sec_per_buffer
         buffers_since_check = 0.0
 
-        # Max bytes for byte_data before audio is removed from the front
-        max_size = self.sec_to_bytes(self.SAVED_WW_SEC, source)
+        # The last SAVED_WW_SEC of audio, once full the oldest audio is
+        # overwritten as new chunks come in
+        audio = RingBuffer(self.sec_to_bytes(self.SAVED_WW_SEC, source))
+        audio.append(silence)
 
         said_wake_word = False
-        counter = 0
         while not said_wake_word:
             if check_for_signal('buttonPress'):
                 said_wake_word = True
@@ -267,27 +293,39 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
             if energy < self.energy_threshold * self.multiplier:
                 self.adjust_threshold(energy, sec_per_buffer)
 
-            if counter > 2:
-                with open(self.mic_level_file, 'w') as f:
-                    f.write("Energy:  cur=" + str(energy) + " thresh=" +
-                            str(self.energy_threshold))
-                f.close()
-                counter = 0
-            else:
-                counter += 1
+            self.write_mic_level(energy)
 
-            # At first, the buffer is empty and must fill up.  After that
-            # just drop the first chunk bytes to keep it the same size.
-            needs_to_grow = len(byte_data) < max_size
-            if needs_to_grow:
-                byte_data += chunk
-            else:  # Remove beginning of audio and add new chunk to end
-                byte_data = byte_data[len(chunk):] + chunk
+            audio.append(chunk)
 
             buffers_since_check += 1.0
             if buffers_since_check > buffers_per_check:
                 buffers_since_check -= buffers_per_check
-                said_wake_word = self.wake_word_in_audio(byte_data + silence)
+                # the only copy of the window, once per check
+                said_wake_word = self.wake_word_in_audio(audio.view() +
+                                                         silence)
+
+    def stream_until_wake_word(self, source, sec_per_buffer):
+        """
+        Like wait_until_wake_word but every chunk is fed once to an
+        utterance kept open in the wake word recognizer, which is checked
+        after each chunk. The recognizer restarts the utterance every
+        STREAM_RESTART_SEC, and each wait starts a new one.
+        """
+        self.wake_word_recognizer.start_stream()
+        try:
+            while not check_for_signal('buttonPress'):
+                chunk = self.record_sound_chunk(source)
+
+                energy = self.calc_energy(chunk, source.SAMPLE_WIDTH)
+                if energy < self.energy_threshold * self.multiplier:
+                    self.adjust_threshold(energy, sec_per_buffer)
+
+                self.write_mic_level(energy)
+
+                if self.wake_word_recognizer.stream(chunk):
+                    return
+        finally:
+            self.wake_word_recognizer.end_stream()
 
     @staticmethod
     def create_audio_data(raw_data, source):
@@ -297,13 +335,15 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         """
         return AudioData(raw_data, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
 
-    def listen(self, source, emitter):
+    def listen(self, source, emitter, stt=None):
         """
         Listens for audio that Mycroft should respond to
 
         :param source: an ``AudioSource`` instance for reading from
         :param emitter: a pyee EventEmitter for sending when the wakeword
                         has been found
+        :param stt: STT to stream the phrase to while it is recorded, the
+                    returned audio then has the STTStream as stt_stream
         """
         assert isinstance(source, AudioSource), "Source must be an AudioSource"
 
@@ -315,8 +355,18 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
 
         logger.debug("Recording...")
         emitter.emit("recognizer_loop:record_begin")
-        frame_data = self.record_phrase(source, sec_per_buffer)
+        stream = None
+        if stt:
+            stream = stt.stream(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        try:
+            frame_data = self.record_phrase(source, sec_per_buffer, stream)
+        except:
+            # nobody will stop the stream, don't leave its thread waiting
+            if stream:
+                stream.cancel()
+            raise
         audio_data = self.create_audio_data(frame_data, source)
+        audio_data.stt_stream = stream
         emitter.emit("recognizer_loop:record_end")
         logger.debug("Thinking...")
 
@@ -0,0 +1,70 @@
+# Copyright 2016 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import mmap
+import os
+import struct
+
+__author__ = 'jarbas'
+
+
+class MicLevel(object):
+    """
+    Energy of the latest mic audio and the threshold it is compared to
+
+    Both are kept in a small file mapped to memory, shared by the speech
+    client publishing them and readers like the text client, so updating
+    them is a write to memory instead of opening and rewriting a file.
+    """
+
+    FORMAT = struct.Struct('<dd')
+
+    def __init__(self, path):
+        self.path = path
+        self.memory = None
+
+    def _map(self, writable):
+        if writable:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            access = mmap.ACCESS_WRITE
+        else:
+            fd = os.open(self.path, os.O_RDONLY)
+            access = mmap.ACCESS_READ
+        try:
+            if writable:
+                os.ftruncate(fd, self.FORMAT.size)
+            elif os.fstat(fd).st_size < self.FORMAT.size:
+                return
+            self.memory = mmap.mmap(fd, self.FORMAT.size, access=access)
+        finally:
+            os.close(fd)
+
+    def publish(self, energy, threshold):
+        if not self.memory:
+            self._map(True)
+        self.memory[:] = self.FORMAT.pack(energy, threshold)
+
+    def read(self):
+        """ (energy, threshold), None while nothing was published """
+        if not self.memory:
+            if not os.path.isfile(self.path):
+                return None
+            self._map(False)
+            if not self.memory:
+                return None
+        return self.FORMAT.unpack(self.memory[:])
@@ -0,0 +1,74 @@
+# Copyright 2016 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+
+__author__ = 'jarbas'
+
+
+class RingBuffer(object):
+    """
+    The last size bytes of audio appended, in a preallocated bytearray
+
+    Every byte is stored twice, at its position and size bytes after it,
+    so the window is always one contiguous run of the array and view()
+    returns it without copying. Appending a chunk copies the chunk twice
+    whatever the window size, where slicing and concatenating strings
+    copies the whole window on every chunk.
+    """
+
+    def __init__(self, size):
+        self.size = int(size)
+        self.data = bytearray(2 * self.size)
+        # position after the newest byte, and bytes held
+        self.end = 0
+        self.length = 0
+
+    def append(self, chunk):
+        if len(chunk) > self.size:
+            chunk = chunk[-self.size:]
+        size = self.size
+        end = self.end
+        first = min(len(chunk), size - end)
+        rest = len(chunk) - first
+        head = chunk[:first]
+        self.data[end:end + first] = head
+        self.data[end + size:end + size + first] = head
+        if rest:
+            tail = chunk[first:]
+            self.data[0:rest] = tail
+            self.data[size:size + rest] = tail
+        self.end = (end + len(chunk)) % size
+        self.length = min(self.length + len(chunk), size)
+
+    def view(self):
+        """
+        Read only buffer of the window, oldest byte first. It shares the
+        memory of the ring, so appending changes what it holds, copy it
+        with str() to keep it.
+        """
+        start = (self.end - self.length) % self.size
+        return buffer(self.data, start, self.length)
+
+    def get(self):
+        return str(self.view())
+
+    def clear(self):
+        self.end = 0
+        self.length = 0
+
+    def __len__(self):
+        return self.length
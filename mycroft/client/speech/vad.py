@@ -0,0 +1,106 @@
+# Copyright 2016 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import audioop
+
+__author__ = 'jarbas'
+
+
+class VoiceActivityDetector(object):
+    """
+    Speech or silence decisions on 10 ms frames of a recording
+
+    A frame is speech when its energy is over the threshold, or close to
+    it with the zero crossing rate of unvoiced sounds like "s" or "f",
+    quiet but not silence. The decisions are smoothed with a hangover: a
+    phrase is over after hangover seconds of silent frames, so the pauses
+    between words do not end it, and runs of speech frames shorter than
+    a burst, clicks and bumps, count as silence.
+    """
+
+    FRAME_SEC = 0.01
+
+    # Zero crossings per sample over which a quiet frame is unvoiced speech
+    UNVOICED_CROSSINGS = 0.3
+
+    # Part of the threshold unvoiced speech frames must reach
+    UNVOICED_ENERGY = 0.8
+
+    # Shortest run of speech frames that is speech
+    BURST_FRAMES = 2
+
+    def __init__(self, sample_rate, sample_width, hangover=0.3,
+                 min_speech=0.1):
+        self.sample_width = sample_width
+        self.frame_samples = int(sample_rate * self.FRAME_SEC)
+        self.frame_bytes = self.frame_samples * sample_width
+        self.hangover_frames = int(round(hangover / self.FRAME_SEC))
+        self.min_speech_frames = int(round(min_speech / self.FRAME_SEC))
+        self.reset()
+
+    def reset(self):
+        self.speech_frames = 0
+        # silent frames since the last speech frame
+        self.silence_frames = 0
+        # speech frames in a row
+        self.burst = 0
+        # bytes short of a whole frame, analysed with the next chunk
+        self.remainder = ''
+
+    def features(self, data):
+        """ energy and zero crossings per sample of the frames in data """
+        features = []
+        for start in xrange(0, len(data), self.frame_bytes):
+            frame = data[start:start + self.frame_bytes]
+            features.append((audioop.rms(frame, self.sample_width),
+                             audioop.cross(frame, self.sample_width) /
+                             float(self.frame_samples)))
+        return features
+
+    def is_speech(self, energy, crossings, threshold):
+        return energy > threshold or (
+            energy > threshold * self.UNVOICED_ENERGY and
+            crossings > self.UNVOICED_CROSSINGS)
+
+    def update(self, chunk, threshold):
+        """ classifies the whole frames recorded so far """
+        data = self.remainder + chunk
+        end = len(data) - len(data) % self.frame_bytes
+        self.remainder = data[end:]
+        for energy, crossings in self.features(data[:end]):
+            if self.is_speech(energy, crossings, threshold):
+                self.burst += 1
+                if self.burst == self.BURST_FRAMES:
+                    self.speech_frames += self.burst
+                    self.silence_frames = 0
+                elif self.burst > self.BURST_FRAMES:
+                    self.speech_frames += 1
+            else:
+                if self.burst < self.BURST_FRAMES:
+                    self.silence_frames += self.burst
+                self.burst = 0
+                self.silence_frames += 1
+
+    @property
+    def heard_speech(self):
+        return self.speech_frames >= self.min_speech_frames
+
+    @property
+    def silent(self):
+        """ True once silence lasted for the whole hangover """
+        return self.silence_frames >= self.hangover_frames
@@ -33,6 +33,7 @@ import subprocess                                           # nopep8
 import curses                                               # nopep8
 import curses.ascii                                         # nopep8
 from threading import Thread, Lock                          # nopep8
+from mycroft.client.speech.mic_level import MicLevel        # nopep8
 from mycroft.messagebus.client.ws import WebsocketClient    # nopep8
 from mycroft.messagebus.message import Message              # nopep8
 from mycroft.tts import TTSFactory                          # nopep8
@@ -143,45 +144,29 @@ def start_log_monitor(filename):
 class MicMonitorThread(Thread):
     def __init__(self, filename):
         Thread.__init__(self)
-        self.filename = filename
-        self.st_results = os.stat(filename)
+        self.mic_level = MicLevel(filename)
+        self.level = None
 
     def run(self):
+        global meter_cur
+        global meter_thresh
+
         while True:
             try:
-                st_results = os.stat(self.filename)
-
-                if (not st_results.st_ctime == self.st_results.st_ctime or
-                        not st_results.st_mtime == self.st_results.st_mtime):
-                    self.read_file_from(0)
-                    self.st_results = st_results
+                # Shared with the speech client, it publishes every chunk
+                level = self.mic_level.read()
+                if level and level != self.level:
+                    self.level = level
+                    meter_cur, meter_thresh = level
                     draw_screen()
             finally:
                 time.sleep(0.1)
 
-    def read_file_from(self, bytefrom):
-        global meter_cur
-        global meter_thresh
-
-        with open(self.filename, 'rb') as fh:
-            fh.seek(bytefrom)
-            while True:
-                line = fh.readline()
-                if line == "":
-                    break
-
-                # Just adjust meter settings
-                # Ex:Energy:  cur=4 thresh=1.5
-                parts = line.split("=")
-                meter_thresh = float(parts[len(parts)-1])
-                meter_cur = float(parts[len(parts)-2].split(" ")[0])
-
 
 def start_mic_monitor(filename):
-    if os.path.isfile(filename):
-        thread = MicMonitorThread(filename)
-        thread.setDaemon(True)  # this thread won't prevent prog from exiting
-        thread.start()
+    thread = MicMonitorThread(filename)
+    thread.setDaemon(True)  # this thread won't prevent prog from exiting
+    thread.start()
 
 
 ##############################################################################
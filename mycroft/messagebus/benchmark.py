@@ -0,0 +1,323 @@
+# Copyright 2016 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import json
+import logging
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from multiprocessing import Process, Queue
+
+import psutil
+import tornado.ioloop as ioloop
+from tornado import gen
+from tornado.websocket import websocket_connect
+from websocket import create_connection
+
+from mycroft.messagebus.client.unix import UnixWebSocket
+from mycroft.messagebus.message import Message, FORMATS
+
+__author__ = 'jarbas'
+
+# usage: python -m mycroft.messagebus.benchmark [benchmark] [args]
+# ie:    python -m mycroft.messagebus.benchmark throughput 1,10,50 10000 \
+#            1000 1 100
+#        python -m mycroft.messagebus.benchmark serialization 10000
+#        python -m mycroft.messagebus.benchmark transport 5000
+#
+# throughput [clients] [messages] [payload] [slow] [rate]
+# Starts a messagebus service on a free local port, connects the clients
+# plus slow ones that never read, and publishes messages as fast as one
+# client can, then at rate messages/s. Reports messages/s delivered to
+# each client, the latency from publishing to receiving and the memory
+# used by the service. Flooding measures throughput, its latency is
+# mostly time spent queued; the paced run measures latency.
+#
+# serialization [repeats]
+# Size and time to serialize and deserialize typical messages in every
+# format Message supports.
+#
+# transport [messages]
+# Round trip time of a message through the service over tcp and over a
+# unix domain socket, with websocket-client like the mycroft services.
+# An utterance reaches speech after three such hops.
+
+DEFAULT_CLIENTS = [1, 10, 50]
+ROUTE = "/core"
+
+
+def serve(port, ready, options, path=None):
+    import tornado.web as web
+    from mycroft.messagebus.service.main import listen_unix
+    from mycroft.messagebus.service.ws import WebsocketEventHandler
+
+    logging.disable(logging.INFO)
+    application = web.Application([(ROUTE, WebsocketEventHandler, options)])
+    # the loop of the parent process must not be shared
+    loop = ioloop.IOLoop()
+    loop.make_current()
+    application.listen(port, "127.0.0.1")
+    if path:
+        listen_unix(application, path)
+    ready.put(True)
+    loop.start()
+
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@gen.coroutine
+def connect(url):
+    connection = yield websocket_connect(url)
+    # the service greets every client
+    yield connection.read_message()
+    raise gen.Return(connection)
+
+
+@gen.coroutine
+def read(connection, latencies):
+    """ Receive benchmark messages until the end marker """
+    while True:
+        message = yield connection.read_message()
+        if message is None:
+            break
+        message = json.loads(message)
+        if message["type"] == "benchmark.end":
+            break
+        latencies.append(time.time() - message["data"]["time"])
+    raise gen.Return(time.time())
+
+
+@gen.coroutine
+def publish(url, clients, messages, payload, rate):
+    connections = []
+    for i in range(clients):
+        connection = yield connect(url)
+        connections.append(connection)
+    latencies = []
+    readers = [read(connection, latencies) for connection in connections]
+    # the first client publishes, it also gets its own messages back
+    publisher = connections[0]
+    data = "x" * payload
+    start = time.time()
+    for i in range(messages):
+        publisher.write_message(json.dumps({"type": "benchmark",
+                                            "data": {"time": time.time(),
+                                                     "payload": data}}))
+        if rate:
+            yield gen.sleep(1.0 / rate)
+        else:
+            # let the readers run meanwhile
+            yield gen.moment
+    publisher.write_message(json.dumps({"type": "benchmark.end",
+                                        "data": {}}))
+    finished = yield readers
+    for connection in connections:
+        connection.close()
+    raise gen.Return((max(finished) - start, latencies))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def run(clients, messages, payload, slow, rate=0, options=None):
+    port = free_port()
+    url = "ws://127.0.0.1:" + str(port) + ROUTE
+    ready = Queue()
+    server = Process(target=serve, args=(port, ready, options or {}))
+    server.start()
+    ready.get()
+    try:
+        # slow clients connect and never read a message
+        stalled = [create_connection(url) for i in range(slow)]
+        loop = ioloop.IOLoop()
+        loop.make_current()
+        elapsed, latencies = loop.run_sync(
+            lambda: publish(url, clients, messages, payload, rate))
+        loop.close(all_fds=True)
+        rss = psutil.Process(server.pid).memory_info().rss
+        for ws in stalled:
+            ws.close()
+    finally:
+        server.terminate()
+        server.join()
+    delivered = float(len(latencies)) / (clients * messages)
+    print ("%4d clients %2d slow %6s  %8.0f msg/s per client  "
+           "delivered %5.1f%%  p50 %7.1f ms  p99 %7.1f ms  "
+           "service %5.1f MB" % (
+               clients, slow, rate or "flood",
+               len(latencies) / clients / elapsed,
+               100 * delivered, 1000 * percentile(latencies, 0.5),
+               1000 * percentile(latencies, 0.99), rss / 1024.0 / 1024))
+
+
+def run_throughput(args):
+    clients = DEFAULT_CLIENTS
+    messages = 10000
+    payload = 100
+    slow = 0
+    rate = 100
+    if len(args) > 0:
+        clients = [int(n) for n in args[0].split(",")]
+    if len(args) > 1:
+        messages = int(args[1])
+    if len(args) > 2:
+        payload = int(args[2])
+    if len(args) > 3:
+        slow = int(args[3])
+    if len(args) > 4:
+        rate = int(args[4])
+    for n in clients:
+        run(n, messages, payload, slow)
+        # paced runs last at most 10 seconds
+        run(n, min(messages, rate * 10), payload, slow, rate)
+
+
+def typical_messages():
+    """ name, Message pairs from small bus chatter to LILACS payloads """
+    context = {"target": None, "client_name": "mycroft_cli"}
+    node = {"name": "dog", "type": "info",
+            "data": {"description": "domesticated canid " * 5},
+            "connections": {
+                "parents": dict(("animal_" + str(i), 5) for i in range(50)),
+                "childs": dict(("breed_" + str(i), 5) for i in range(100)),
+                "synonims": ["hound", "canine", "pooch"],
+                "cousins": ["wolf_" + str(i) for i in range(50)]}}
+    knowledge = {"dbpedia": {"dog": {
+        "score": 0.99, "subject": "dog", "offset": 0,
+        "parents": ["DBpedia:Animal", "DBpedia:Mammal", "Schema:Thing"],
+        "url": "http://dbpedia.org/resource/Dog",
+        "page_info": {
+            "abstract": "The domestic dog is a member of the genus Canis, "
+                        "which forms part of the wolf-like canids. " * 30,
+            "picture": "http://commons.wikimedia.org/Dog.jpg",
+            "external_links": ["http://example.org/dog/" + str(i)
+                               for i in range(50)],
+            "related_subjects": ["Subject_" + str(i)
+                                 for i in range(50)]}}}}
+    return [
+        ("speak", Message("speak", {"utterance": "It is ten past three",
+                                    "target": None}, context)),
+        ("utterance", Message("recognizer_loop:utterance",
+                              {"utterances": ["what time is it"],
+                               "lang": "en-us",
+                               "session": "b0a2c4e6-1f3d-4b5a-9c8e"},
+                              context)),
+        ("intent", Message("TimeSkill:TimeIntent",
+                           {"intent_type": "TimeSkill:TimeIntent",
+                            "confidence": 1.0, "target": None,
+                            "utterance": "what time is it",
+                            "TimeSkill:TimeKeyword": "time"}, context)),
+        ("concept", Message("LILACS_StorageService_result",
+                            {"node": "dog", "data": node}, context)),
+        ("knowledge", Message("LILACS_result",
+                              {"data": knowledge, "request_id": "1"},
+                              context))
+    ]
+
+
+def run_serialization(args):
+    repeats = int(args[0]) if args else 10000
+    formats = [(format, compress) for format in reversed(FORMATS)
+               for compress in [0, 1024]]
+    print "%-10s %-14s %8s %10s %10s" % ("message", "format", "bytes",
+                                         "dumps us", "loads us")
+    for name, message in typical_messages():
+        for format, compress in formats:
+            start = time.time()
+            for i in range(repeats):
+                serialized = message.serialize(format, compress)
+            dumps = (time.time() - start) / repeats
+            start = time.time()
+            for i in range(repeats):
+                Message.deserialize(serialized)
+            loads = (time.time() - start) / repeats
+            label = format + ("+zlib" if compress else "")
+            print "%-10s %-14s %8d %10.1f %10.1f" % (
+                name, label, len(serialized), 1e6 * dumps, 1e6 * loads)
+
+
+def round_trips(ws, messages):
+    # the service greets every client
+    ws.recv()
+    data = dict(typical_messages())["utterance"].serialize()
+    times = []
+    for i in range(messages):
+        start = time.time()
+        ws.send(data)
+        ws.recv()
+        times.append(time.time() - start)
+    ws.close()
+    return times
+
+
+def run_transport(args):
+    messages = int(args[0]) if args else 5000
+    port = free_port()
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bus.sock")
+    ready = Queue()
+    server = Process(target=serve, args=(port, ready, {}, path))
+    server.start()
+    ready.get()
+    try:
+        url = "ws://127.0.0.1:" + str(port) + ROUTE
+
+        def unix():
+            ws = UnixWebSocket(path)
+            ws.connect(url)
+            return ws
+        # one at a time, an idle connection would be a slow client
+        for name, connect in [("tcp", lambda: create_connection(url)),
+                              ("unix", unix)]:
+            times = round_trips(connect(), messages)
+            print "%-5s round trip  mean %6.3f ms  p50 %6.3f ms  " \
+                  "p99 %6.3f ms" % (name, 1000 * sum(times) / len(times),
+                                    1000 * percentile(times, 0.5),
+                                    1000 * percentile(times, 0.99))
+    finally:
+        server.terminate()
+        server.join()
+        shutil.rmtree(directory)
+
+
+BENCHMARKS = {
+    "throughput": run_throughput,
+    "serialization": run_serialization,
+    "transport": run_transport
+}
+
+
+def main(argv):
+    names = [argv[1]] if len(argv) > 1 else sorted(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name](argv[2:])
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,68 @@
+# Copyright 2016 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from collections import deque
+from threading import Lock
+
+from mycroft.util.log import getLogger
+
+__author__ = 'jarbas'
+
+LOG = getLogger(__name__)
+
+
+class Dispatcher(object):
+    """
+    Runs calls on an executor, at most limit of them at the same time
+
+    Calls over the limit wait in a queue and are run in arrival order by
+    the executor threads already running calls, so with limit=1 calls
+    run one after the other in the order they were dispatched. Waiting
+    calls hold no executor thread.
+    """
+
+    def __init__(self, executor, limit=1):
+        self.executor = executor
+        self.limit = limit
+        self.running = 0
+        self.queue = deque()
+        self.lock = Lock()
+
+    def dispatch(self, func, *args):
+        with self.lock:
+            if self.running >= self.limit:
+                self.queue.append((func, args))
+                return
+            self.running += 1
+        self.executor.submit(self._run, func, args)
+
+    def _run(self, func, args):
+        while True:
+            try:
+                func(*args)
+            except Exception, e:
+                LOG.exception(e)
+            with self.lock:
+                if not self.queue:
+                    self.running -= 1
+                    return
+                func, args = self.queue.popleft()
+
+    def __len__(self):
+        """ calls waiting for their turn """
+        return len(self.queue)
@@ -0,0 +1,90 @@
+# Copyright 2016 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from collections import OrderedDict
+from threading import Event, Lock
+from uuid import uuid4
+
+__author__ = 'jarbas'
+
+
+class PendingRequest(object):
+    __slots__ = ["event", "result"]
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+
+
+class PendingRequests(object):
+    """
+    Replies awaited from the bus, keyed by request id
+
+    The requester calls new() for an id, sends it along with its message
+    and blocks in wait(); the handler of the reply message calls
+    resolve() with the id the responder echoed back. Waiting threads sleep
+    on an Event, any number of requests can be in flight at once.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._pending = OrderedDict()
+
+    def new(self):
+        request_id = str(uuid4())
+        with self._lock:
+            self._pending[request_id] = PendingRequest()
+        return request_id
+
+    def resolve(self, request_id, result):
+        """
+        Hand result to whoever waits on request_id. Replies without an id
+        (from responders that do not echo it) go to the oldest request.
+        Returns False if nobody waits for it, e.g. it already timed out.
+        """
+        with self._lock:
+            if request_id is None:
+                request_id = next((key for key, pending
+                                   in self._pending.iteritems()
+                                   if not pending.event.is_set()), None)
+            pending = self._pending.get(request_id)
+            if pending is None or pending.event.is_set():
+                return False
+            pending.result = result
+            pending.event.set()
+        return True
+
+    def wait(self, request_id, timeout=None, default=None):
+        """ result of request_id, default if it is not resolved in time """
+        with self._lock:
+            pending = self._pending.get(request_id)
+        if pending is None:
+            return default
+        pending.event.wait(timeout)
+        with self._lock:
+            self._pending.pop(request_id, None)
+            if not pending.event.is_set():
+                return default
+        return pending.result
+
+    def cancel(self, request_id):
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    def __len__(self):
+        return len(self._pending)
@@ -0,0 +1,93 @@
+# Copyright 2016 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import select
+import socket
+
+from websocket import ABNF, WebSocket, WebSocketApp, WebSocketException
+from websocket._handshake import handshake
+from websocket._url import parse_url
+
+__author__ = 'jarbas'
+
+
+class UnixWebSocket(WebSocket):
+    """
+    WebSocket connected through the unix domain socket at path
+
+    The url still gives the route and the Host header of the handshake,
+    framing is the same as over tcp.
+    """
+
+    def __init__(self, path, *args, **kwargs):
+        super(UnixWebSocket, self).__init__(*args, **kwargs)
+        self.path = path
+
+    def connect(self, url, **options):
+        hostname, port, resource, is_secure = parse_url(url)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(self.gettimeout())
+            self.sock.connect(self.path)
+            self.handshake_response = handshake(self.sock, hostname, port,
+                                                resource, **options)
+            self.connected = True
+        except:
+            self.sock.close()
+            self.sock = None
+            raise
+
+
+class UnixWebSocketApp(WebSocketApp):
+    """ WebSocketApp over a UnixWebSocket, without pings or proxies """
+
+    def __init__(self, path, url, **kwargs):
+        super(UnixWebSocketApp, self).__init__(url, **kwargs)
+        self.path = path
+
+    def run_forever(self):
+        if self.sock:
+            raise WebSocketException("socket is already opened")
+        close_frame = None
+        try:
+            self.sock = UnixWebSocket(self.path, self.get_mask_key)
+            self.sock.connect(self.url, header=self.header,
+                              cookie=self.cookie,
+                              subprotocols=self.subprotocols)
+            self._callback(self.on_open)
+            while self.sock.connected:
+                r, w, e = select.select((self.sock.sock,), (), ())
+                if not self.keep_running:
+                    break
+                op_code, frame = self.sock.recv_data_frame(True)
+                if op_code == ABNF.OPCODE_CLOSE:
+                    close_frame = frame
+                    break
+                elif op_code == ABNF.OPCODE_PING:
+                    self._callback(self.on_ping, frame.data)
+                elif op_code == ABNF.OPCODE_PONG:
+                    self._callback(self.on_pong, frame.data)
+                else:
+                    self._callback(self.on_message, frame.data)
+        except Exception, e:
+            self._callback(self.on_error, e)
+        finally:
+            self.sock.close()
+            self._callback(self.on_close, *self._get_close_args(
+                close_frame.data if close_frame else None))
+            self.sock = None
@@ -17,15 +17,19 @@
 
 
 import json
-import time
-from multiprocessing.pool import ThreadPool
+import os
+import random
+from threading import Event
 
+from concurrent.futures import ThreadPoolExecutor
 from pyee import EventEmitter
-from websocket import WebSocketApp
+from websocket import ABNF, WebSocketApp
 
 from mycroft.configuration import ConfigurationManager
-from mycroft.messagebus.message import Message
-from mycroft.util import validate_param
+from mycroft.messagebus.client.dispatch import Dispatcher
+from mycroft.messagebus.client.unix import UnixWebSocketApp
+from mycroft.messagebus.message import Message, FORMATS, is_binary
+from mycroft.util import validate_param, get_ipc_directory
 from mycroft.util.log import getLogger
 
 __author__ = 'seanfitz', 'jdorleans'
@@ -33,32 +37,85 @@ __author__ = 'seanfitz', 'jdorleans'
 LOG = getLogger(__name__)
 config = ConfigurationManager.get().get("websocket")
 
+# asks the service to forward only the message types in data["types"]
+SUBSCRIBE = "mycroft.bus.subscribe"
+UNSUBSCRIBE = "mycroft.bus.unsubscribe"
+# asks the service for a serialization, it answers with the one it chose
+FORMAT = "mycroft.bus.format"
+# events of the client itself, not message types on the bus
+LOCAL_EVENTS = ["open", "close", "error"]
+# "message" handlers get every raw message, so they subscribe to all types
+RAW = "message"
+
 
 class WebsocketClient(object):
+    # seconds between reconnection attempts, doubled on every failure
+    MIN_RETRY = 1
+    MAX_RETRY = 60
+
     def __init__(self, host=config.get("host"), port=config.get("port"),
-                 route=config.get("route"), ssl=config.get("ssl")):
+                 route=config.get("route"), ssl=config.get("ssl"),
+                 format=config.get("format", "json"),
+                 compress=config.get("compress", 0),
+                 transport=config.get("transport", "tcp"),
+                 unix_socket=config.get("unix_socket"),
+                 executor=None, workers=config.get("workers", 10),
+                 concurrency=config.get("concurrency", {})):
 
         validate_param(host, "websocket.host")
         validate_param(port, "websocket.port")
         validate_param(route, "websocket.route")
 
         self.build_url(host, port, route, ssl)
+        # "unix" connects through the socket file of a service on this
+        # machine, tcp is used while the file does not exist
+        self.transport = transport
+        self.unix_socket = unix_socket or os.path.join(get_ipc_directory(),
+                                                       "bus.sock")
         self.emitter = EventEmitter()
         self.client = self.create_client()
-        self.pool = ThreadPool(10)
-        self.retry = 5
+        # handlers run on the executor, types in concurrency run at most
+        # that many handlers at once, 1 keeps them in arrival order
+        self.executor = executor or ThreadPoolExecutor(workers)
+        self.dispatchers = {}
+        for message_type, limit in concurrency.iteritems():
+            self.set_concurrency(message_type, limit)
+        self.retry = self.MIN_RETRY
+        self.stopped = Event()
+        self.subscriptions = set()
+        # wanted serialization, the one in use until the service agrees
+        self.wanted_format = (format, compress)
+        self.format = ("json", 0)
 
     def build_url(self, host, port, route, ssl):
         scheme = "wss" if ssl else "ws"
         self.url = scheme + "://" + host + ":" + str(port) + route
 
     def create_client(self):
+        if self.transport == "unix" and os.path.exists(self.unix_socket):
+            return UnixWebSocketApp(self.unix_socket, self.url,
+                                    on_open=self.on_open,
+                                    on_close=self.on_close,
+                                    on_error=self.on_error,
+                                    on_message=self.on_message)
         return WebSocketApp(self.url,
                             on_open=self.on_open, on_close=self.on_close,
                             on_error=self.on_error, on_message=self.on_message)
 
     def on_open(self, ws):
         LOG.info("Connected")
+        self.retry = self.MIN_RETRY
+        self.format = ("json", 0)
+        format, compress = self.wanted_format
+        if format != "json" or compress:
+            formats = [f for f in FORMATS if f == format] + ["json"]
+            self.emit(Message(FORMAT, {"formats": formats,
+                                       "compress": compress}))
+        # a new connection starts with no subscriptions, resend them all,
+        # until there are any the service sends this client every message
+        if self.subscriptions:
+            self.emit(Message(SUBSCRIBE,
+                              {"types": list(self.subscriptions)}))
         self.emitter.emit("open")
 
     def on_close(self, ws):
@@ -67,43 +124,106 @@ class WebsocketClient(object):
     def on_error(self, ws, error):
         try:
             self.emitter.emit('error', error)
-            self.client.close()
         except Exception, e:
             LOG.error(repr(e))
-        LOG.warn("WS Client will reconnect in %d seconds." % self.retry)
-        time.sleep(self.retry)
-        self.retry = min(self.retry * 2, 60)
-        self.client = self.create_client()
-        self.run_forever()
 
     def on_message(self, ws, message):
-        self.emitter.emit('message', message)
         parsed_message = Message.deserialize(message)
-        self.pool.apply_async(
-            self.emitter.emit, (parsed_message.type, parsed_message))
+        if is_binary(message):
+            # listeners of raw messages always get json
+            if self.emitter.listeners('message'):
+                self.emitter.emit('message', parsed_message.serialize())
+        else:
+            self.emitter.emit('message', message)
+        if parsed_message.type == FORMAT:
+            self.format = (parsed_message.data.get("format", "json"),
+                           parsed_message.data.get("compress", 0))
+        self.dispatch(parsed_message)
+
+    def dispatch(self, message):
+        dispatcher = self.dispatchers.get(message.type)
+        if dispatcher:
+            dispatcher.dispatch(self.emitter.emit, message.type, message)
+        else:
+            self.executor.submit(self.emitter.emit, message.type, message)
+
+    def set_concurrency(self, message_type, limit):
+        """
+        Run at most limit handlers of message_type at once, None for no
+        limit. With 1 messages of that type are handled one at a time in
+        the order they arrived.
+        """
+        if limit:
+            self.dispatchers[message_type] = Dispatcher(self.executor,
+                                                        limit)
+        else:
+            self.dispatchers.pop(message_type, None)
 
     def emit(self, message):
         if (not self.client or not self.client.sock or
                 not self.client.sock.connected):
             return
         if hasattr(message, 'serialize'):
-            self.client.send(message.serialize())
+            data = message.serialize(*self.format)
+        else:
+            data = json.dumps(message.__dict__)
+        if is_binary(data):
+            self.client.send(data, ABNF.OPCODE_BINARY)
         else:
-            self.client.send(json.dumps(message.__dict__))
+            self.client.send(data)
 
     def on(self, event_name, func):
         self.emitter.on(event_name, func)
+        self.subscribe(event_name)
 
     def once(self, event_name, func):
         self.emitter.once(event_name, func)
+        self.subscribe(event_name)
 
     def remove(self, event_name, func):
         self.emitter.remove_listener(event_name, func)
+        if self.emitter.listeners(event_name):
+            return
+        message_type = "*" if event_name == RAW else event_name
+        if message_type in self.subscriptions:
+            self.subscriptions.discard(message_type)
+            self.emit(Message(UNSUBSCRIBE, {"types": [message_type]}))
+
+    def subscribe(self, message_type):
+        """
+        Have the service forward messages of message_type, "*" for all.
+        Types a handler is registered for are subscribed automatically,
+        "message" handlers to "*". Once subscribed to anything the service
+        only sends this client messages it subscribed to.
+        """
+        if message_type == RAW:
+            message_type = "*"
+        if (message_type in LOCAL_EVENTS or
+                message_type in self.subscriptions):
+            return
+        self.subscriptions.add(message_type)
+        self.emit(Message(SUBSCRIBE, {"types": [message_type]}))
 
     def run_forever(self):
-        self.client.run_forever()
+        """
+        Stay connected until close(), reconnecting after a random delay
+        of half to all of retry seconds so clients restarted together do
+        not all retry at the same moment
+        """
+        self.stopped.clear()
+        while True:
+            self.client.run_forever()
+            if self.stopped.is_set():
+                break
+            delay = self.retry * random.uniform(0.5, 1)
+            LOG.warn("WS Client will reconnect in %.1f seconds." % delay)
+            if self.stopped.wait(delay):
+                break
+            self.retry = min(self.retry * 2, self.MAX_RETRY)
+            self.client = self.create_client()
 
     def close(self):
+        self.stopped.set()
         self.client.close()
 
 
@@ -117,6 +237,7 @@ def echo():
         message.type = 'speak'
         ws.emit(message)
 
+    ws.subscribe("*")
     ws.on('message', echo)
     ws.on('recognizer_loop:utterance', repeat_utterance)
     ws.run_forever()
@@ -17,9 +17,29 @@
 
 
 import json
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 __author__ = 'seanfitz'
 
+# Binary serializations start with a header byte below any printable
+# character, json text always starts with "{"
+JSON = 0x01
+MSGPACK = 0x02
+COMPRESSED = 0x10
+
+# supported serializations, best first
+FORMATS = ["msgpack", "json"] if msgpack else ["json"]
+
+
+def is_binary(value):
+    """ True for serialized messages that must go in binary frames """
+    return len(value) > 0 and ord(value[0]) < 0x20
+
 
 class Message(object):
     def __init__(self, type, data={}, context=None):
@@ -27,16 +47,44 @@ class Message(object):
         self.data = data
         self.context = context
 
-    def serialize(self):
-        return json.dumps({
+    def serialize(self, format="json", compress=0):
+        """
+        Message as json text, or as a binary header byte and body when
+        format is "msgpack" or when the body is at least compress bytes
+        long and compress is not 0, then the body is zlib compressed.
+        """
+        obj = {
             'type': self.type,
             'data': self.data,
             'context': self.context
-        })
+        }
+        if format == "msgpack" and msgpack:
+            header = MSGPACK
+            body = msgpack.packb(obj)
+        else:
+            header = JSON
+            body = json.dumps(obj)
+        if compress and len(body) >= compress:
+            compressed = zlib.compress(body, 1)
+            if len(compressed) < len(body):
+                return chr(header | COMPRESSED) + compressed
+        if header == JSON:
+            return body
+        return chr(header) + body
 
     @staticmethod
     def deserialize(value):
-        obj = json.loads(value)
+        if is_binary(value):
+            header = ord(value[0])
+            value = value[1:]
+            if header & COMPRESSED:
+                value = zlib.decompress(value)
+            if header & ~COMPRESSED == MSGPACK:
+                obj = msgpack.unpackb(value, raw=False)
+            else:
+                obj = json.loads(value)
+        else:
+            obj = json.loads(value)
         return Message(obj.get('type'), obj.get('data'), obj.get('context'))
 
     def reply(self, type, data, context={}):
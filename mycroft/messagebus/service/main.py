@@ -15,12 +15,16 @@
 # You should have received a copy of the GNU General Public License
 # along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+
 import tornado.ioloop as ioloop
 import tornado.web as web
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_unix_socket
 
 from mycroft.configuration import ConfigurationManager
 from mycroft.messagebus.service.ws import WebsocketEventHandler
-from mycroft.util import validate_param
+from mycroft.util import validate_param, get_ipc_directory
 from mycroft.lock import Lock  # creates/supports PID locking file
 
 
@@ -31,6 +35,19 @@ settings = {
 }
 
 
+def listen_unix(application, path):
+    """
+    Serve application on the unix domain socket at path as well, clients
+    on this machine skip the tcp stack. A stale socket file is replaced.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    server = HTTPServer(application)
+    server.add_socket(bind_unix_socket(path, mode=0o660))
+    return server
+
+
 def main():
     import tornado.options
     lock = Lock("service")
@@ -44,11 +61,20 @@ def main():
     validate_param(port, "websocket.port")
     validate_param(route, "websocket.route")
 
+    # per client outbound queue, see WebsocketEventHandler
+    options = {
+        "max_queue_size": config.get("max_queue_size", 1000),
+        "max_queue_bytes": config.get("max_queue_bytes", 16 * 1024 * 1024),
+        "overflow": config.get("overflow", "drop-oldest")
+    }
     routes = [
-        (route, WebsocketEventHandler)
+        (route, WebsocketEventHandler, options)
     ]
     application = web.Application(routes, **settings)
     application.listen(port, host)
+    if config.get("transport", "tcp") == "unix":
+        listen_unix(application, config.get("unix_socket") or
+                    os.path.join(get_ipc_directory(), "bus.sock"))
     ioloop.IOLoop.instance().start()
 
 
@@ -19,12 +19,14 @@
 import json
 import sys
 import traceback
+from collections import deque
 
+import tornado.iostream
 import tornado.websocket
 from pyee import EventEmitter
 
 import mycroft.util.log
-from mycroft.messagebus.message import Message
+from mycroft.messagebus.message import Message, FORMATS, is_binary
 
 logger = mycroft.util.log.getLogger(__name__)
 __author__ = 'seanfitz'
@@ -33,13 +35,47 @@ EventBusEmitter = EventEmitter()
 
 client_connections = []
 
+# sent by clients to choose the message types forwarded to them
+SUBSCRIBE = "mycroft.bus.subscribe"
+UNSUBSCRIBE = "mycroft.bus.unsubscribe"
+# sent by clients to choose the serialization of messages sent to them,
+# answered with the chosen one
+FORMAT = "mycroft.bus.format"
+
 
 class WebsocketEventHandler(tornado.websocket.WebSocketHandler):
+    """
+    Routes every message to all connected clients
+
+    Messages for a client wait in its own bounded queue while the socket
+    can not take more data, so a slow client never holds back the others.
+    When a queue is full the overflow policy applies: "drop-oldest" drops
+    the oldest messages queued for that client, "disconnect" closes it.
+
+    Clients that subscribed to message types only get those, "*" stands
+    for every type. Clients that never subscribed get every message.
+
+    Messages are json text unless the client asked for another format,
+    a message is serialized once per format used by the clients.
+    """
+
     def __init__(self, application, request, **kwargs):
         tornado.websocket.WebSocketHandler.__init__(
             self, application, request, **kwargs)
         self.emitter = EventBusEmitter
 
+    def initialize(self, max_queue_size=1000,
+                   max_queue_bytes=16 * 1024 * 1024, overflow="drop-oldest"):
+        self.max_queue_size = max_queue_size
+        self.max_queue_bytes = max_queue_bytes
+        self.overflow = overflow
+        self.queue = deque()
+        self.queue_bytes = 0
+        self.flushing = False
+        self.dropped = 0
+        self.subscriptions = None
+        self.format = ("json", 0)
+
     def on(self, event_name, handler):
         self.emitter.on(event_name, handler)
 
@@ -50,6 +86,16 @@ class WebsocketEventHandler(tornado.websocket.WebSocketHandler):
         except:
             return
 
+        if deserialized_message.type == SUBSCRIBE:
+            self.subscribe(deserialized_message.data.get("types", []))
+            return
+        if deserialized_message.type == UNSUBSCRIBE:
+            self.unsubscribe(deserialized_message.data.get("types", []))
+            return
+        if deserialized_message.type == FORMAT:
+            self.choose_format(deserialized_message.data)
+            return
+
         try:
             self.emitter.emit(deserialized_message.type, deserialized_message)
         except Exception, e:
@@ -57,15 +103,99 @@ class WebsocketEventHandler(tornado.websocket.WebSocketHandler):
             traceback.print_exc(file=sys.stdout)
             pass
 
-        for client in client_connections:
-            client.write_message(message)
+        serialized = {}
+        if not is_binary(message):
+            serialized[("json", 0)] = message
+        # a client may be disconnected meanwhile
+        for client in list(client_connections):
+            if client.wants(deserialized_message.type):
+                if client.format not in serialized:
+                    serialized[client.format] = \
+                        deserialized_message.serialize(*client.format)
+                client.send(serialized[client.format])
+
+    def choose_format(self, data):
+        """ First of the formats the client asked for that is supported """
+        for format in data.get("formats", []):
+            if format in FORMATS:
+                break
+        else:
+            format = "json"
+        self.format = (format, data.get("compress", 0))
+        self.send(Message(FORMAT, {"format": format,
+                                   "compress": self.format[1]}).serialize())
+
+    def subscribe(self, message_types):
+        if self.subscriptions is None:
+            self.subscriptions = set()
+        self.subscriptions.update(message_types)
+
+    def unsubscribe(self, message_types):
+        if self.subscriptions is not None:
+            self.subscriptions.difference_update(message_types)
+
+    def wants(self, message_type):
+        return (self.subscriptions is None or
+                message_type in self.subscriptions or
+                "*" in self.subscriptions)
+
+    def send(self, message):
+        """ Queue message for this client, it is written when possible """
+        if self.ws_connection is None:
+            return
+        self.queue.append(message)
+        self.queue_bytes += len(message)
+        if (len(self.queue) > self.max_queue_size or
+                self.queue_bytes > self.max_queue_bytes):
+            if self.overflow == "disconnect":
+                logger.warn("disconnecting slow client, " +
+                            str(len(self.queue)) + " messages queued")
+                if self in client_connections:
+                    client_connections.remove(self)
+                self.queue.clear()
+                self.queue_bytes = 0
+                self.close()
+                return
+            while len(self.queue) > 1 and (
+                    len(self.queue) > self.max_queue_size or
+                    self.queue_bytes > self.max_queue_bytes):
+                self.queue_bytes -= len(self.queue.popleft())
+                self.dropped += 1
+                if self.dropped % 1000 == 1:
+                    logger.warn("slow client, dropped " + str(self.dropped) +
+                                " messages")
+        if not self.flushing:
+            self.flush_queue()
+
+    def flush_queue(self):
+        # write while the socket takes it, then wait until the stream
+        # buffer is drained, at most one message is buffered by tornado
+        self.flushing = False
+        if self.ws_connection is None:
+            return
+        stream = self.ws_connection.stream
+        try:
+            while self.queue and not stream.writing():
+                message = self.queue.popleft()
+                self.queue_bytes -= len(message)
+                self.write_message(message, binary=is_binary(message))
+            if self.queue:
+                self.flushing = True
+                stream.write(b"", self.flush_queue)
+        except (tornado.websocket.WebSocketClosedError,
+                tornado.iostream.StreamClosedError):
+            self.queue.clear()
+            self.queue_bytes = 0
 
     def open(self):
         self.write_message(Message("connected").serialize())
         client_connections.append(self)
 
     def on_close(self):
-        client_connections.remove(self)
+        if self in client_connections:
+            client_connections.remove(self)
+        self.queue.clear()
+        self.queue_bytes = 0
 
     def emit(self, channel_message):
         if (hasattr(channel_message, 'serialize') and
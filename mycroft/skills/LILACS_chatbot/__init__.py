@@ -101,6 +101,11 @@ class LILACSChatbotSkill(MycroftSkill):
     def stop(self):
         self.handle_deactivate_intent("global stop")
 
+    def shutdown(self):
+        if self.service is not None:
+            self.service.shutdown()
+        super(LILACSChatbotSkill, self).shutdown()
+
     def converse(self, transcript, lang="en-us"):
         # parse 1st utterance for entitys
         if self.active and "bump chat" not in transcript[0] and "bump curiosity" not in transcript[0]:
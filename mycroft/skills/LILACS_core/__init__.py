@@ -24,10 +24,13 @@ from adapt.intent import IntentBuilder
 from mycroft.messagebus.message import Message
 from mycroft.skills.LILACS_core.concept import ConceptConnector
 from mycroft.skills.LILACS_core.crawler import ConceptCrawler
+from mycroft.skills.LILACS_core.journal import ConceptJournal
+from mycroft.skills.LILACS_core.working_set import WorkingSet
 from mycroft.skills.LILACS_core.question_parser import LILACSQuestionParser
 # import helper questions functions
 from mycroft.skills.LILACS_core.questions import *
 from mycroft.skills.LILACS_knowledge.knowledgeservice import KnowledgeService
+from mycroft.skills.LILACS_storage.concept_store import ConceptStore
 from mycroft.skills.core import MycroftSkill
 from mycroft.util.log import getLogger
 
@@ -44,8 +47,10 @@ class LilacsCoreSkill(MycroftSkill):
         self.reload_skill = False
         self.connector = None
         self.crawler = None
+        self.journal = None
         self.parser = None
         self.service = None
+        self.knowledge_backends = []
         self.debug = False
         self.focus = 10
         # focus = 0 -> think about all nodes
@@ -69,12 +74,38 @@ class LilacsCoreSkill(MycroftSkill):
         self.emitter.on("LILACS_feedback", self.feedback)
 
         self.parser = LILACSQuestionParser()
-        self.service = KnowledgeService(self.emitter)
         self.build_intents()
 
-        self.connector = ConceptConnector(emitter=self.emitter)
+        config = self.config or {}
+        # backends asked about unknown concepts, best answers first
+        self.knowledge_backends = config.get("knowledge_backends",
+                                             ["dbpedia", "wikidata",
+                                              "wikipedia", "wordnik"])
+        self.service = KnowledgeService(
+            self.emitter, timeout=config.get("knowledge_timeout", 30))
+        if config.get("concept_store"):
+            # bounded set of concepts in memory, the rest is loaded on access
+            store = ConceptStore(config["concept_store"], durable=True)
+            concepts = WorkingSet(store,
+                                  config.get("working_set_size", 100000))
+            self.connector = ConceptConnector(concepts=concepts,
+                                              emitter=self.emitter)
+            # changed concepts are written to storage in the background
+            self.journal = ConceptJournal(
+                self.connector, store,
+                batch_size=config.get("journal_batch_size", 500),
+                interval=config.get("journal_interval", 5.0))
+            self.connector.journal = self.journal
+            concepts.journal = self.journal
+        else:
+            self.connector = ConceptConnector(emitter=self.emitter)
         self.create_concepts()
-        self.crawler = ConceptCrawler(self.connector)
+        # crawl limits, a single question should not pin a cpu for seconds
+        self.crawler = ConceptCrawler(
+            depth=config.get("crawl_max_depth", 20),
+            concept_connector=self.connector,
+            max_visits=config.get("crawl_max_visits"),
+            time_budget=config.get("crawl_time_budget"))
 
     def build_intents(self):
         # build intents
@@ -217,7 +248,7 @@ class LilacsCoreSkill(MycroftSkill):
         # create_concept(self, new_concept_name, data={},
         #                   child_concepts={}, parent_concepts={}, synonims=[], antonims=[])
 
-        # TODO update storage
+        # changes reach storage through the connector journal
         # make empty nodes
         for node in nodes:
             self.log.info("processing node: " + node)
@@ -286,13 +317,24 @@ class LilacsCoreSkill(MycroftSkill):
 
     # questions methods
 
-    def get_wordnik(self, node):
+    def get_knowledge(self, node, backend, answer):
+        """ knowledge about node in the answer of backend, raises if none """
+        knowledge = answer[backend]
+        if backend == "dbpedia":
+            knowledge = knowledge[node]
+        return knowledge
+
+    def get_wordnik(self, node, wordnik=None):
 
         # check wordnik backend for more related nodes
-        try:
-            wordnik = self.connector.get_data(node, "wordnik")
-        except:
-            wordnik = self.service.adquire(node, "wordnik")["wordnik"]
+        known = False
+        if wordnik is None:
+            try:
+                wordnik = self.connector.get_data(node, "wordnik")
+                known = True
+            except:
+                wordnik = self.service.adquire(node, "wordnik")["wordnik"]
+        if not known:
             self.connector.add_data(node, "wordnik", wordnik)
             definition = wordnik["definitions"][0]
             self.connector.add_data(node, "definition", definition)
@@ -477,10 +519,13 @@ class LilacsCoreSkill(MycroftSkill):
         # is this that
         self.crawler.update_connector(self.connector)
         flag = is_this_that(center_node, target_node, self.crawler)
+        if self.crawler.truncated:
+            self.log.info("crawl stopped early, answer may be incomplete")
         self.speak("answer to is " + center_node + " a " + target_node + " is " + str(flag))
         if flag:
             # why
-            nodes = why_is_this_that(center_node, target_node, self.crawler)
+            nodes = why_is_this_that(center_node, target_node,
+                                     self.crawler) or []
             i = 0
             for node in nodes:
                 if node != target_node:
@@ -536,6 +581,11 @@ class LilacsCoreSkill(MycroftSkill):
     def handle_examples_intent(self, node):
         self.crawler.update_connector(self.connector)
         examples = examples_of_this(node, self.crawler)
+        if self.crawler.truncated:
+            self.log.info("examples crawl stopped early, examples are partial")
+        elif self.crawler.depth_limited:
+            self.log.info("examples crawl reached max depth, deeper examples "
+                          "were skipped")
         for example in examples:
             if example != node:
                 self.speak(example + " is an example of " + node)
@@ -559,43 +609,35 @@ class LilacsCoreSkill(MycroftSkill):
         if data == {}:
             self.log.info("no node data available")
             if self.debug:
-                self.speak("seaching dbpedia")
-            self.log.info("adquiring dbpedia")
-            try:
-                dbpedia = self.service.adquire(node, "dbpedia")["dbpedia"][node]
-            except:
-                if self.debug:
-                    self.speak("no results from dbpedia")
-                self.log.info("no results from dbpedia")
-
-                if self.debug:
-                    self.speak("seaching wikidata")
-                self.log.info("adquiring wikidata")
+                self.speak("seaching " + ", ".join(self.knowledge_backends))
+            self.log.info("adquiring " + str(self.knowledge_backends))
+            # all backends are asked at once, the answer of the first one
+            # in order is used together with anything else already received
+            chosen, answers = self.service.adquire_first(
+                node, self.knowledge_backends,
+                accept=lambda backend, answer: bool(
+                    self.get_knowledge(node, backend, answer)))
+            self.log.info("knowledge from " + str(chosen))
+            for backend in self.knowledge_backends:
                 try:
-                    wikidata = self.service.adquire(node, "wikidata")["wikidata"]
+                    knowledge = self.get_knowledge(node, backend,
+                                                   answers[backend])
                 except:
                     if self.debug:
-                        self.speak("no results from wikidata")
-                    self.log.info("no results from wikidata")
-
-                    if self.debug:
-                        self.speak("seaching wikipedia")
-                    self.log.info("adquiring wikipedia")
+                        self.speak("no results from " + backend)
+                    self.log.info("no results from " + backend)
+                    continue
+                if backend == "dbpedia":
+                    dbpedia = knowledge
+                elif backend == "wikidata":
+                    wikidata = knowledge
+                elif backend == "wikipedia":
+                    wikipedia = knowledge
+                elif backend == "wordnik":
                     try:
-                        wikipedia = self.service.adquire(node, "wikipedia")["wikipedia"]
+                        wordnik = self.get_wordnik(node, knowledge)
                     except:
-                        if self.debug:
-                            self.speak("no results from wikipedia")
-                        self.log.info("no results from wikipedia")
-                        if self.debug:
-                            self.speak("seaching wordnik")
-                        self.log.info("adquiring wordnik")
-                        try:
-                            wordnik = self.get_wordnik(node)
-                        except:
-                            if self.debug:
-                                self.speak("no results from wordnik")
-                            self.log.info("no results from wordnik")
+                        self.log.info("no results from wordnik")
 
            # debug available data
 
@@ -732,6 +774,13 @@ class LilacsCoreSkill(MycroftSkill):
     def stop(self):
         pass
 
+    def shutdown(self):
+        if self.journal is not None:
+            self.journal.stop()
+        if self.service is not None:
+            self.service.shutdown()
+        super(LilacsCoreSkill, self).shutdown()
+
 def create_skill():
     return LilacsCoreSkill()
 
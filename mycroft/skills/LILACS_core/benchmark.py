@@ -0,0 +1,353 @@
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from multiprocessing import Process, Queue
+
+import psutil
+
+from mycroft.skills.LILACS_core.concept import ConceptConnector
+from mycroft.skills.LILACS_core.crawler import ConceptCrawler
+from mycroft.skills.LILACS_core.journal import ConceptJournal
+from mycroft.skills.LILACS_core.working_set import WorkingSet
+from mycroft.skills.LILACS_core.questions import is_this_that, \
+    common_this_and_that
+from mycroft.skills.LILACS_storage.concept_store import ConceptStore
+
+__authors__ = ["jarbas", "heinzschmidt"]
+
+# usage: python -m mycroft.skills.LILACS_core.benchmark [benchmark] [sizes]
+# ie:    python -m mycroft.skills.LILACS_core.benchmark ingest 10000,100000
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+
+def random_graph(size, parents=3, childs=1, synonims=1, antonims=1, seed=0):
+    """
+    Yield create_concept arguments for a graph of size concepts
+
+    Every concept connects to random other concepts in the graph, so about
+    as many stub nodes get created and later merged as in real ingestion
+    """
+    rand = random.Random(seed)
+
+    def pick(n):
+        return ["concept_" + str(rand.randint(0, size - 1)) for i in range(n)]
+
+    for i in range(size):
+        name = "concept_" + str(i)
+        parent_concepts = dict((p, rand.randint(1, 7)) for p in pick(parents))
+        child_concepts = dict((c, rand.randint(1, 7)) for c in pick(childs))
+        yield name, parent_concepts, child_concepts, pick(synonims), \
+            pick(antonims)
+
+
+def random_taxonomy(size, branching=8, seed=0):
+    """
+    Yield create_concept arguments for an is-a hierarchy of size concepts
+
+    Concepts get a parent one level up and sometimes a second one, about
+    log(size, branching) levels deep and without cycles
+    """
+    rand = random.Random(seed)
+    for i in range(1, size + 1):
+        parents = {}
+        if i > 1:
+            parent = max(i // branching, 1)
+            parents["concept_" + str(parent)] = rand.randint(1, 7)
+        if i >= branching * 2 and rand.random() < 0.3:
+            parent = rand.randint(i // branching // 2, i // branching - 1)
+            parents["concept_" + str(parent)] = rand.randint(1, 7)
+        yield "concept_" + str(i), parents, {}, [], []
+
+
+def bench_ingest(size, graph=random_graph):
+    connector = ConceptConnector()
+    start = time.time()
+    for name, parents, childs, synonims, antonims in graph(size):
+        connector.create_concept(name, data={}, parent_concepts=parents,
+                                 child_concepts=childs, synonims=synonims,
+                                 antonims=antonims)
+    elapsed = time.time() - start
+    return connector, elapsed
+
+
+def run_ingest(sizes):
+    print "ingest throughput (create_concept calls)"
+    for size in sizes:
+        connector, elapsed = bench_ingest(size)
+        print "%9d concepts  %8.2f s  %10.0f concepts/s  %9d nodes" % \
+            (size, elapsed, size / elapsed, len(connector.get_concepts()))
+
+
+class LegacyConceptNode(object):
+    """
+    Previous ConceptNode layout, a dict of eleven containers per node
+
+    Only used to compare memory usage against the slotted ConceptNode
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.type = "info"
+        self.data = {}
+        self.connections = {"parents": {}, "childs": {}}
+        for relation in ["synonims", "antonims", "cousins", "spawns",
+                         "spawned_by", "consumes", "consumed_by", "parts",
+                         "part_off"]:
+            self.connections[relation] = []
+
+
+def build_legacy(size):
+    concepts = {}
+
+    def node(name):
+        if name not in concepts:
+            concepts[name] = LegacyConceptNode(name)
+        return concepts[name]
+
+    def link(name, relation, other):
+        if other not in node(name).connections[relation]:
+            node(name).connections[relation].append(other)
+
+    for name, parents, childs, synonims, antonims in random_graph(size):
+        node(name)
+        for parent in parents:
+            node(name).connections["parents"][parent] = parents[parent]
+            node(parent).connections["childs"][name] = parents[parent]
+        for child in childs:
+            node(name).connections["childs"][child] = childs[child]
+            node(child).connections["parents"][name] = childs[child]
+        for synonim in synonims:
+            link(name, "synonims", synonim)
+            link(synonim, "synonims", name)
+        for antonim in antonims:
+            link(name, "antonims", antonim)
+            link(antonim, "antonims", name)
+    return concepts
+
+
+def build_current(size):
+    return bench_ingest(size)[0].get_concepts()
+
+
+def _measure(build, size, queue):
+    process = psutil.Process(os.getpid())
+    before = process.memory_info().rss
+    concepts = build(size)
+    queue.put((process.memory_info().rss - before, len(concepts)))
+
+
+def measure_rss(build, size):
+    """ RSS growth of building a graph, in a fresh process for each run """
+    queue = Queue()
+    worker = Process(target=_measure, args=(build, size, queue))
+    worker.start()
+    result = queue.get()
+    worker.join()
+    return result
+
+
+def run_memory(sizes):
+    print "memory usage (RSS growth)"
+    for size in sizes:
+        legacy, nodes = measure_rss(build_legacy, size)
+        current, nodes = measure_rss(build_current, size)
+        print "%9d concepts  %9d nodes  legacy %8.1f MB  current %8.1f MB" \
+              "  (%.0f%%)" % (size, nodes, legacy / 1048576.0,
+                              current / 1048576.0, 100.0 * current / legacy)
+
+
+def run_path(sizes, queries=200):
+    print "shortest path queries (why is X a Y)"
+    for size in sizes:
+        connector = bench_ingest(size)[0]
+        crawler = ConceptCrawler(concept_connector=connector)
+        rand = random.Random(1)
+        names = connector.get_concept_names()
+        pairs = [(rand.choice(names), rand.choice(names))
+                 for i in range(queries)]
+        for weighted in [False, True]:
+            found = 0
+            start = time.time()
+            for center, target in pairs:
+                if crawler.find_shortest_path(center, target,
+                                              weighted=weighted):
+                    found += 1
+            elapsed = time.time() - start
+            print "%9d concepts  %-10s %8.2f ms/query  %d/%d paths" % \
+                (size, "weighted" if weighted else "bfs",
+                 1000.0 * elapsed / queries, found, queries)
+
+
+def run_ancestors(sizes, queries=200):
+    print "is X a Y queries (ancestor index vs drunk crawl)"
+    for size in sizes:
+        connector = bench_ingest(size, random_taxonomy)[0]
+        crawler = ConceptCrawler(concept_connector=connector)
+        rand = random.Random(1)
+        names = connector.get_concept_names()
+        # half the targets are real ancestors
+        pairs = []
+        for i in range(queries):
+            center = rand.choice(names)
+            target = rand.choice(names)
+            if i % 2:
+                target = rand.choice(list(connector.ancestors.ancestors(
+                    center)) or [target])
+            pairs.append((center, target))
+        connector.ancestors.clear()
+        for label, mode in [("index", "index"), ("index warm", "index"),
+                            ("drunk", "drunk")]:
+            found = 0
+            start = time.time()
+            for center, target in pairs:
+                if is_this_that(center, target, crawler, mode=mode):
+                    found += 1
+            elapsed = time.time() - start
+            print "%9d concepts  %-10s %10.2f ms/query  %d/%d true" % \
+                (size, label, 1000.0 * elapsed / queries, found, queries)
+
+
+def run_common(sizes, queries=200):
+    print "what do X and Y have in common (common ancestors vs drunk crawl)"
+    for size in sizes:
+        connector = bench_ingest(size, random_taxonomy)[0]
+        crawler = ConceptCrawler(concept_connector=connector)
+        rand = random.Random(1)
+        names = connector.get_concept_names()
+        pairs = [(rand.choice(names), rand.choice(names))
+                 for i in range(queries)]
+        for mode in ["index", "drunk"]:
+            found = 0
+            start = time.time()
+            for center, target in pairs:
+                found += len(common_this_and_that(center, target, crawler,
+                                                  mode=mode))
+            elapsed = time.time() - start
+            print "%9d concepts  %-10s %10.2f ms/query  %d in common" % \
+                (size, mode, 1000.0 * elapsed / queries, found)
+
+
+def run_drunk(sizes):
+    print "drunk crawl cost per step (examples of the hierarchy root)"
+    for size in sizes:
+        connector = bench_ingest(size, random_taxonomy)[0]
+        crawler = ConceptCrawler(concept_connector=connector)
+        random.seed(0)
+        start = time.time()
+        crawler.drunk_crawl("concept_1", "no target crawl",
+                            direction="childs")
+        elapsed = time.time() - start
+        steps = len(crawler.crawl_path)
+        print "%9d concepts  %9d steps  %8.2f s  %8.1f us/step" % \
+            (size, steps, elapsed, 1000000.0 * elapsed / steps)
+
+
+def run_journal(sizes, batch_sizes=[100, 1000, 10000]):
+    print "sustained write throughput (journal to a durable sqlite store)"
+    for size in sizes:
+        for batch_size in batch_sizes:
+            folder = tempfile.mkdtemp()
+            store = ConceptStore(os.path.join(folder, "concepts.db"),
+                                 durable=True)
+            connector = ConceptConnector()
+            journal = ConceptJournal(connector, store, batch_size=batch_size)
+            connector.journal = journal
+            start = time.time()
+            for name, parents, childs, synonims, antonims in \
+                    random_graph(size):
+                connector.create_concept(name, data={},
+                                         parent_concepts=parents,
+                                         child_concepts=childs,
+                                         synonims=synonims,
+                                         antonims=antonims)
+            ingested = time.time() - start
+            journal.stop()
+            elapsed = time.time() - start
+            print "%9d concepts  batch %6d  ingest %8.0f concepts/s  " \
+                  "persisted %8.0f concepts/s  %6d batches  %9d writes" % \
+                (size, batch_size, size / ingested, size / elapsed,
+                 journal.batches, journal.written)
+            store.close()
+            shutil.rmtree(folder)
+
+
+def _query_paged(path, size, capacity, queries, queue):
+    process = psutil.Process(os.getpid())
+    before = process.memory_info().rss
+    store = ConceptStore(path)
+    concepts = WorkingSet(store, capacity)
+    crawler = ConceptCrawler(concept_connector=ConceptConnector(concepts))
+    rand = random.Random(1)
+    pairs = [("concept_" + str(rand.randint(1, size)),
+              "concept_" + str(rand.randint(1, size)))
+             for i in range(queries)]
+    start = time.time()
+    # every concept is a concept_1, this crawl pages in the whole graph
+    crawler.drunk_crawl("concept_1", "no target crawl", direction="childs")
+    crawl = time.time() - start
+    start = time.time()
+    for center, target in pairs:
+        crawler.find_shortest_path(center, target, direction="parents")
+        common_this_and_that(center, target, crawler)
+    elapsed = time.time() - start
+    queue.put((crawl, 1000.0 * elapsed / queries, concepts.hits,
+               concepts.misses, process.memory_info().rss - before))
+    store.close()
+
+
+def run_paging(sizes, queries=1000):
+    print "stored graph with a bounded working set, full drunk crawl then " \
+          "shortest path + common ancestors queries"
+    for size in sizes:
+        folder = tempfile.mkdtemp()
+        path = os.path.join(folder, "concepts.db")
+        store = ConceptStore(path)
+        connector = bench_ingest(size, random_taxonomy)[0]
+        store.save_many([node.to_dict() for node in
+                         connector.get_concepts().values()])
+        store.close()
+        del connector
+        for capacity in [size, size / 10, size / 100]:
+            queue = Queue()
+            worker = Process(target=_query_paged,
+                             args=(path, size, capacity, queries, queue))
+            worker.start()
+            crawl, per_query, hits, misses, rss = queue.get()
+            worker.join()
+            print "%9d concepts  working set %8d  crawl %7.2f s  " \
+                  "%6.2f ms/query  hit rate %5.1f%%  %8.1f MB" % \
+                (size, capacity, crawl, per_query,
+                 100.0 * hits / (hits + misses), rss / 1048576.0)
+        shutil.rmtree(folder)
+
+
+BENCHMARKS = {
+    "ancestors": run_ancestors,
+    "common": run_common,
+    "drunk": run_drunk,
+    "ingest": run_ingest,
+    "journal": run_journal,
+    "memory": run_memory,
+    "paging": run_paging,
+    "path": run_path
+}
+
+
+def main(argv):
+    # logging every connection would dominate the measurements
+    logging.disable(logging.INFO)
+    names = [argv[1]] if len(argv) > 1 else sorted(BENCHMARKS)
+    sizes = DEFAULT_SIZES
+    if len(argv) > 2:
+        sizes = [int(size) for size in argv[2].split(",")]
+    for name in names:
+        BENCHMARKS[name](sizes)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
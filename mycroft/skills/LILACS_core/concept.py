@@ -1,10 +1,211 @@
+import heapq
+import time
+from threading import RLock
+
 from mycroft.util.log import getLogger
 
 
 __authors__ = ["jarbas", "heinzschmidt"]
 
 
-class ConceptNode():
+# every relation that has an inverse relation on the connected node
+# adding/removing one side through the ConceptConnector keeps the other in sync
+REVERSE_RELATIONS = {
+    "parents": "childs",
+    "childs": "parents",
+    "spawns": "spawned_by",
+    "spawned_by": "spawns",
+    "parts": "part_off",
+    "part_off": "parts",
+    "consumes": "consumed_by",
+    "consumed_by": "consumes",
+    "synonims": "synonims",
+    "antonims": "antonims"
+}
+
+
+class OrderedSet(object):
+    """
+    Hashed set that remembers insertion order
+
+    Membership, add and discard are O(1), iteration follows the order
+    connections were made in, like the lists used before. Most nodes only
+    have a handful of connections, so the hash index is only built once a
+    set grows past SMALL items, below that a list scan is just as fast.
+    Discarded items leave a hole in the order list that is compacted once
+    holes make up half of it.
+    """
+    __slots__ = ["_index", "_order", "_holes"]
+    _HOLE = object()
+    SMALL = 8
+
+    def __init__(self, iterable=None):
+        self._index = None
+        self._order = []
+        self._holes = 0
+        if iterable is not None:
+            for item in iterable:
+                self.add(item)
+
+    def add(self, item):
+        if item in self:
+            return
+        if self._index is not None:
+            self._index[item] = len(self._order)
+        self._order.append(item)
+        if self._index is None and len(self._order) > self.SMALL:
+            self._index = dict((item, i) for i, item in
+                               enumerate(self._order))
+
+    def discard(self, item):
+        if self._index is None:
+            if item in self._order:
+                self._order.remove(item)
+            return
+        i = self._index.pop(item, None)
+        if i is None:
+            return
+        self._order[i] = self._HOLE
+        self._holes += 1
+        if self._holes * 2 > len(self._order):
+            self._compact()
+
+    def _compact(self):
+        self._order = [item for item in self._order if item is not self._HOLE]
+        self._index = dict((item, i) for i, item in enumerate(self._order))
+        self._holes = 0
+
+    def __contains__(self, item):
+        if self._index is None:
+            return item in self._order
+        return item in self._index
+
+    def __iter__(self):
+        if not self._holes:
+            return iter(self._order)
+        return (item for item in self._order if item is not self._HOLE)
+
+    def __len__(self):
+        return len(self._order) - self._holes
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+# relations holding a gen weight per connected node, the rest are sets
+WEIGHTED_RELATIONS = ["parents", "childs"]
+
+RELATIONS = ["parents", "childs", "synonims", "antonims", "cousins", "spawns",
+             "spawned_by", "consumes", "consumed_by", "parts", "part_off"]
+
+# ConceptNode slot holding each relation
+RELATION_SLOTS = dict((relation, "_" + relation) for relation in RELATIONS)
+
+# concept names are repeated in every node connected to them, keep one copy
+# of up to MAX_NAMES of them, past that arbitrary ones are forgotten (nodes
+# keep their copy, new ones just do not share it)
+MAX_NAMES = 100000
+_names = {}
+
+
+def intern_name(name):
+    """ Return the shared copy of a concept name (str or unicode) """
+    shared = _names.get(name)
+    if shared is not None:
+        return shared
+    while len(_names) >= MAX_NAMES:
+        _names.popitem()
+    _names[name] = name
+    return name
+
+
+class OrderedWeights(dict):
+    """
+    gen per connected node for parents/childs, iterating in the order
+    connections were made in
+
+    A dict plus a list of names, OrderedDict costs several hundred bytes
+    per instance on python 2. Nodes have few parents or childs, so
+    removing one scans the list.
+    """
+    __slots__ = ["_order"]
+
+    def __init__(self):
+        dict.__init__(self)
+        self._order = []
+
+    def __setitem__(self, name, gen):
+        if name not in self:
+            self._order.append(name)
+        dict.__setitem__(self, name, gen)
+
+    def __delitem__(self, name):
+        dict.__delitem__(self, name)
+        self._order.remove(name)
+
+    def pop(self, name, *default):
+        if name in self:
+            self._order.remove(name)
+        return dict.pop(self, name, *default)
+
+    def setdefault(self, name, gen=None):
+        if name not in self:
+            self[name] = gen
+        return self[name]
+
+    def update(self, other=(), **kwargs):
+        for name, gen in dict(other, **kwargs).items():
+            self[name] = gen
+
+    def popitem(self):
+        name = self._order[-1]
+        return name, self.pop(name)
+
+    def clear(self):
+        dict.clear(self)
+        self._order = []
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def keys(self):
+        return list(self._order)
+
+    def items(self):
+        return [(name, self[name]) for name in self._order]
+
+    def values(self):
+        return [self[name] for name in self._order]
+
+    def iterkeys(self):
+        return iter(self._order)
+
+    def iteritems(self):
+        return ((name, self[name]) for name in self._order)
+
+    def itervalues(self):
+        return (self[name] for name in self._order)
+
+    def __repr__(self):
+        return "{" + ", ".join(repr(name) + ": " + repr(self[name])
+                               for name in self._order) + "}"
+
+
+class FrozenDict(dict):
+    """ Read only dict, used as the shared empty parents/childs sentinel """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenDict is read only")
+
+    __setitem__ = __delitem__ = _readonly
+    setdefault = update = pop = popitem = clear = _readonly
+
+
+EMPTY_WEIGHTS = FrozenDict()
+EMPTY_SET = frozenset()
+
+
+class ConceptNode(object):
     ''' 
     Node:
        name:
@@ -33,108 +234,158 @@ class ConceptNode():
             external_links[ suggested links from dbpedia]
     '''
 
+    # stub nodes are created for every parent, child, synonim and antonim
+    # touched, so nodes only allocate containers for relations they have
+    __slots__ = ["name", "type", "data"] + sorted(RELATION_SLOTS.values())
+
     def __init__(self, name, data=None, parent_concepts=None,
         child_concepts=None, synonims=None, antonims=None, cousins = None,
         spawns = None, spawned_by = None, consumes = None, consumed_by = None,
         parts = None, part_off=None, type="info"):
-        self.name = name
+        self.name = intern_name(name)
         self.type = type
-        self.data = data
-        self.connections = {}
-        if parent_concepts is not None:
-            self.connections.setdefault("parents", parent_concepts)
-        else:
-            self.connections.setdefault("parents", {})
-        if child_concepts is not None:
-            self.connections.setdefault("childs", child_concepts)
-        else:
-            self.connections.setdefault("childs", {})
-        if synonims is not None:
-            self.connections.setdefault("synonims", synonims)
-        else:
-            self.connections.setdefault("synonims", [])
-        if antonims is not None:
-            self.connections.setdefault("antonims", antonims)
+        # empty data is not kept, get_data creates it on first access
+        self.data = data if data else None
+        # OrderedWeights of gen per node for parents/childs, OrderedSet
+        # otherwise
+        for slot in RELATION_SLOTS.values():
+            setattr(self, slot, None)
+        for parent in parent_concepts or {}:
+            self.add_parent(parent, gen=parent_concepts[parent])
+        for child in child_concepts or {}:
+            self.add_child(child, gen=child_concepts[child])
+        for relation, names in [("synonims", synonims),
+                                ("antonims", antonims), ("cousins", cousins),
+                                ("spawns", spawns), ("spawned_by", spawned_by),
+                                ("consumes", consumes),
+                                ("consumed_by", consumed_by),
+                                ("parts", parts), ("part_off", part_off)]:
+            for connected in names or []:
+                self.add_connection(relation, connected)
+
+    @property
+    def connections(self):
+        """ All relations of this node, empty ones as shared sentinels """
+        return dict((relation, self.get_connections(relation))
+                    for relation in RELATIONS)
+
+    def get_connections(self, relation):
+        container = getattr(self, RELATION_SLOTS[relation])
+        if container is not None:
+            return container
+        if relation in WEIGHTED_RELATIONS:
+            return EMPTY_WEIGHTS
+        return EMPTY_SET
+
+    def _materialize(self, relation):
+        slot = RELATION_SLOTS[relation]
+        container = getattr(self, slot)
+        if container is None:
+            if relation in WEIGHTED_RELATIONS:
+                container = OrderedWeights()
+            else:
+                container = OrderedSet()
+            setattr(self, slot, container)
+        return container
+
+    def add_connection(self, relation, name, gen=1):
+        name = intern_name(name)
+        container = self._materialize(relation)
+        if relation in WEIGHTED_RELATIONS:
+            container[name] = gen
         else:
-            self.connections.setdefault("antonims", [])
-        if cousins is not None:
-            self.connections.setdefault("cousins", cousins)
-        else:
-            self.connections.setdefault("cousins", [])
-        if spawns is not None:
-            self.connections.setdefault("spawns", spawns)
-        else:
-            self.connections.setdefault("spawns", [])
-        if spawned_by is not None:
-            self.connections.setdefault("spawned_by", spawned_by)
-        else:
-            self.connections.setdefault("spawned_by", [])
-        if consumes is not None:
-            self.connections.setdefault("consumes", consumes)
-        else:
-            self.connections.setdefault("consumes", [])
-        if consumed_by is not None:
-            self.connections.setdefault("consumed_by", consumed_by)
-        else:
-            self.connections.setdefault("consumed_by", [])
-        if parts is not None:
-            self.connections.setdefault("parts", parts)
-        else:
-            self.connections.setdefault("parts", [])
-        if part_off is not None:
-            self.connections.setdefault("part_off", part_off)
+            container.add(name)
+
+    def remove_connection(self, relation, name):
+        container = self.get_connections(relation)
+        if name not in container:
+            return
+        if relation in WEIGHTED_RELATIONS:
+            container.pop(name)
         else:
-            self.connections.setdefault("part_off", [])
+            container.discard(name)
+        if not container:
+            # drop back to the shared empty sentinel
+            setattr(self, RELATION_SLOTS[relation], None)
+
+    def is_connected(self, relation, name):
+        return name in self.get_connections(relation)
+
+    def to_dict(self):
+        """ json friendly copy of this node, as sent to storage backends """
+        connections = {}
+        for relation in RELATIONS:
+            container = getattr(self, RELATION_SLOTS[relation])
+            if not container:
+                continue
+            if relation in WEIGHTED_RELATIONS:
+                connections[relation] = dict(container)
+            else:
+                connections[relation] = list(container)
+        return {"name": self.name, "type": self.type,
+                "data": dict(self.data or {}), "connections": connections}
+
+    @staticmethod
+    def from_dict(node):
+        """ Rebuild a node saved with to_dict """
+        concept = ConceptNode(node["name"], data=node.get("data"),
+                              type=node.get("type", "info"))
+        connections = node.get("connections", {})
+        for relation in connections:
+            if relation in WEIGHTED_RELATIONS:
+                for name, gen in connections[relation].items():
+                    concept.add_connection(relation, name, gen)
+            else:
+                for name in connections[relation]:
+                    concept.add_connection(relation, name)
+        return concept
 
     def get_parents(self):
-        return self.connections["parents"]
+        return self.get_connections("parents")
 
     def get_childs(self):
-        return self.connections["childs"]
+        return self.get_connections("childs")
 
     def get_cousins(self):
-        return self.connections["cousins"]
+        return list(self.get_connections("cousins"))
 
     def get_consumes(self):
-        return self.connections["consumes"]
+        return list(self.get_connections("consumes"))
 
     def get_consumed_by(self):
-        return self.connections["consumed_by"]
+        return list(self.get_connections("consumed_by"))
 
     def get_spawn(self):
-        return self.connections["spawns"]
+        return list(self.get_connections("spawns"))
 
     def get_spawned_by(self):
-        return self.connections["spawned_by"]
+        return list(self.get_connections("spawned_by"))
 
     def get_parts(self):
-        return self.connections["parts"]
+        return list(self.get_connections("parts"))
 
     def get_part_off(self):
-        return self.connections["part_off"]
+        return list(self.get_connections("part_off"))
 
     def get_synonims(self):
-        return self.connections["synonims"]
+        return list(self.get_connections("synonims"))
 
     def get_antonims(self):
-        return self.connections["antonims"]
+        return list(self.get_connections("antonims"))
 
     def get_data(self):
+        if self.data is None:
+            self.data = {}
         return self.data
 
     def add_synonim(self, synonim):
-        if synonim not in self.connections["synonims"]:
-            self.connections["synonims"].append(synonim)
+        self.add_connection("synonims", synonim)
 
     def add_antonim(self, antonim):
-        if antonim not in self.connections["antonims"]:
-            self.connections["antonims"].append(antonim)
+        self.add_connection("antonims", antonim)
 
     def add_data(self, key, data={}):
-        if key in self.data:
-            self.data[key] = data
-        else:
-            self.data.setdefault(key, data)
+        self.get_data()[key] = data
 
     def add_parent(self, parent_name, gen = 1, update = True):
 
@@ -143,144 +394,242 @@ class ConceptNode():
             return
 
         # a node cannot be a parent and a child (would it make sense in some corner case?)
-        if parent_name in self.connections["childs"]:
+        if parent_name in self.get_childs():
             return
 
-        if parent_name not in self.connections["parents"]:
-            self.connections["parents"].setdefault(parent_name, gen)
-        elif parent_name in self.connections["parents"] and update:
-            self.connections["parents"][parent_name] = gen
+        if parent_name not in self.get_parents() or update:
+            self.add_connection("parents", parent_name, gen)
 
     def add_child(self, child_name, gen=1, update = True):
         # a node cannot be a child of itself
         if child_name == self.name:
             return
 
-        if child_name in self.connections["parents"]:
+        if child_name in self.get_parents():
             return
 
-        if child_name not in self.connections["childs"]:
-            self.connections["childs"].setdefault(child_name, gen)
-        elif child_name in self.connections["childs"] and update:
-            self.connections["childs"][child_name] = gen
+        if child_name not in self.get_childs() or update:
+            self.add_connection("childs", child_name, gen)
 
     def add_cousin(self, cousin):
-        if cousin not in self.connections["cousins"] and cousin != self.name:
-            self.connections["cousins"].append(cousin)
+        if cousin != self.name:
+            self.add_connection("cousins", cousin)
 
     def add_spawn(self, spawn):
-        if spawn not in self.connections["spawns"]:
-            self.connections["spawns"].append(spawn)
+        self.add_connection("spawns", spawn)
 
     def add_spawned_by(self, spawned_by):
-        if spawned_by not in self.connections["spawned_by"]:
-            self.connections["spawned_by"].append(spawned_by)
+        self.add_connection("spawned_by", spawned_by)
 
     def add_consumes(self, consumes):
-        if consumes not in self.connections["consumes"]:
-            self.connections["consumes"].append(consumes)
+        self.add_connection("consumes", consumes)
 
     def add_consumed_by(self, consumed_by):
-        if consumed_by not in self.connections["consumed_by"]:
-            self.connections["consumed_by"].append(consumed_by)
+        self.add_connection("consumed_by", consumed_by)
 
     def add_part(self, part):
-        if part not in self.connections["parts"]:
-            self.connections["parts"].append(part)
+        self.add_connection("parts", part)
 
     def add_part_off(self, part_off):
-        if part_off not in self.connections["part_off"]:
-            self.connections["part_off"].append(part_off)
+        self.add_connection("part_off", part_off)
 
     def remove_synonim(self, synonim):
-        i = 0
-        for name in self.connections["synonims"]:
-            if name == synonim:
-                self.connections["synonims"].pop(i)
-                return
-            i += 1
+        self.remove_connection("synonims", synonim)
 
     def remove_antonim(self, antonim):
-        i = 0
-        for name in self.connections["antonims"]:
-            if name == antonim:
-                self.connections["antonims"].pop(i)
-                return
-            i += 1
+        self.remove_connection("antonims", antonim)
 
     def remove_cousin(self, cousin):
-        i = 0
-        for name in self.connections["cousins"]:
-            if name == cousin:
-                self.connections["cousins"].pop(i)
-                return
-            i += 1
+        self.remove_connection("cousins", cousin)
 
     def remove_part(self, part):
-        i = 0
-        for name in self.connections["parts"]:
-            if name == part:
-                self.connections["parts"].pop(i)
-                return
-            i += 1
+        self.remove_connection("parts", part)
 
     def remove_part_off(self, part_off):
-        i = 0
-        for name in self.connections["part_off"]:
-            if name == part_off:
-                self.connections["part_off"].pop(i)
-                return
-            i += 1
+        self.remove_connection("part_off", part_off)
 
     def remove_consumes(self, consumes):
-        i = 0
-        for name in self.connections["consumes"]:
-            if name == consumes:
-                self.connections["consumes"].pop(i)
-                return
-            i += 1
+        self.remove_connection("consumes", consumes)
 
     def remove_consumed_by(self, consumed_by):
-        i = 0
-        for name in self.connections["consumed_by"]:
-            if name == consumed_by:
-                self.connections["consumed_by"].pop(i)
-                return
-            i += 1
+        self.remove_connection("consumed_by", consumed_by)
 
     def remove_spawns(self, spawn):
-        i = 0
-        for name in self.connections["spawns"]:
-            if name == spawn:
-                self.connections["spawns"].pop(i)
-                return
-            i += 1
+        self.remove_connection("spawns", spawn)
 
     def remove_spawned_by(self, spawned_by):
-        i = 0
-        for name in self.connections["spawned_by"]:
-            if name == spawned_by:
-                self.connections["spawned_by"].pop(i)
-                return
-            i += 1
+        self.remove_connection("spawned_by", spawned_by)
 
     def remove_data(self, key):
-        self.data.pop(key)
+        self.get_data().pop(key)
 
     def remove_parent(self, parent_name):
-        self.connections["parents"].pop(parent_name)
+        self.remove_connection("parents", parent_name)
 
     def remove_child(self, child_name):
-        self.connections["childs"].pop(child_name)
+        self.remove_connection("childs", child_name)
+
+
+class AncestorIndex(object):
+    """
+    Cached reachability sets over the parents graph
+
+    The ancestors of a concept are every node reachable through parents,
+    plus the synonims of the concept and of every reached node, whose
+    parents are followed as well (same nodes a drunk crawl would find).
+
+    Closures are computed on demand and reused while computing others;
+    changed concepts are only recorded, and cached closures that depend
+    on them are dropped before the next lookup. At most MAX_CLOSURES are
+    kept, arbitrary ones are dropped to make room for new ones.
+    """
+
+    MAX_CLOSURES = 10000
+
+    def __init__(self, connector):
+        self.connector = connector
+        self._closures = {}
+        self._dirty = set()
+
+    def invalidate(self, concept_name):
+        """ Mark the parents or synonims of concept_name as changed """
+        if self._closures:
+            self._dirty.add(concept_name)
+
+    def clear(self):
+        self._closures = {}
+        self._dirty = set()
+
+    def _purge(self):
+        dirty = self._dirty
+        self._dirty = set()
+        for name, closure in self._closures.items():
+            if name in dirty or not closure.isdisjoint(dirty):
+                del self._closures[name]
+
+    def ancestors(self, concept_name):
+        """
+        frozenset of concepts concept_name is (directly or not) a kind of
+        """
+        return self.closure(concept_name)[0]
+
+    def closure(self, concept_name, max_visits=None, deadline=None):
+        """
+        Ancestors of concept_name, giving up after expanding max_visits
+        nodes or past the deadline (a time.time() value)
+
+        :return: (ancestors, complete), only complete closures are cached
+        """
+        if self._dirty:
+            self._purge()
+        closure = self._closures.get(concept_name)
+        if closure is not None:
+            return closure, True
+        concepts = self.connector.get_concepts()
+        if concept_name not in concepts:
+            return EMPTY_SET, True
+        found = set()
+        stack = [concept_name]
+        expanded = set(stack)
+        visited = 0
+        while stack:
+            if max_visits is not None and visited >= max_visits or \
+                    deadline is not None and time.time() > deadline:
+                return frozenset(found), False
+            visited += 1
+            node = concepts.get(stack.pop())
+            if node is None:
+                continue
+            sources = [node]
+            for synonim in node.get_connections("synonims"):
+                found.add(synonim)
+                if synonim in concepts:
+                    sources.append(concepts[synonim])
+            for source in sources:
+                for parent in source.get_connections("parents"):
+                    if parent in expanded:
+                        continue
+                    expanded.add(parent)
+                    found.add(parent)
+                    cached = self._closures.get(parent)
+                    if cached is not None:
+                        # complete closure, nothing new past this parent
+                        found.update(cached)
+                    else:
+                        stack.append(parent)
+        closure = frozenset(found)
+        if len(self._closures) >= self.MAX_CLOSURES:
+            self._closures.popitem()
+        self._closures[concept_name] = closure
+        return closure, True
+
+    def is_ancestor(self, concept_name, ancestor):
+        if concept_name == ancestor:
+            return concept_name in self.connector.get_concepts()
+        return ancestor in self.ancestors(concept_name)
+
+    def distances(self, concept_name):
+        """
+        Smallest sum of gens from concept_name to each of its ancestors
+
+        concept_name itself is at distance 0 and synonims are at the
+        distance of the node they are a synonim of
+        """
+        concepts = self.connector.get_concepts()
+        if concept_name not in concepts:
+            return {}
+        distances = {}
+        queue = [(0, concept_name, True)]
+        while queue:
+            distance, name, follow_synonims = heapq.heappop(queue)
+            if name in distances:
+                continue
+            distances[name] = distance
+            node = concepts.get(name)
+            if node is None:
+                continue
+            if follow_synonims:
+                for synonim in node.get_connections("synonims"):
+                    if synonim not in distances:
+                        heapq.heappush(queue, (distance, synonim, False))
+            parents = node.get_connections("parents")
+            for parent in parents:
+                if parent not in distances:
+                    heapq.heappush(queue, (distance + parents[parent],
+                                           parent, True))
+        return distances
+
+    def common_ancestors(self, concept_name, other_name):
+        """
+        Concepts both are a kind of, closest (smallest combined gen
+        distance) first, so the lowest common ancestor leads the list
+        """
+        distances = self.distances(concept_name)
+        other = self.distances(other_name)
+        if len(other) < len(distances):
+            distances, other = other, distances
+        common = [(distances[name] + other[name], name)
+                  for name in distances if name in other]
+        common.sort()
+        return [name for distance, name in common]
 
 
 class ConceptConnector():
 
-    def __init__(self, concepts = {}, emitter=None):
+    def __init__(self, concepts=None, emitter=None):
+        if concepts is None:
+            concepts = {}
         self.concepts = concepts
+        # held while changing nodes and marking them in the journal, shared
+        # with a WorkingSet so nodes are not evicted in between
+        self.lock = getattr(concepts, "lock", None) or RLock()
+        self.ancestors = AncestorIndex(self)
+        # ConceptJournal writing changed nodes to storage, if any
+        self.journal = None
         self.logger = getLogger("ConceptConnector")
         self.emitter = emitter
-        self.emitter.on("new_node", self.new_node)
+        if self.emitter is not None:
+            self.emitter.on("new_node", self.new_node)
 
     def new_node(self, message):
         # create node signaled from outside
@@ -310,38 +659,119 @@ class ConceptConnector():
     def get_concepts(self):
         return self.concepts
 
+    def get_loaded(self, concept_name):
+        # node if it is in memory, without loading it from storage
+        peek = getattr(self.concepts, "peek", self.concepts.get)
+        return peek(concept_name)
+
+    def has_concept(self, concept_name):
+        return concept_name in self.concepts
+
+    def _changed(self, concept_name, taxonomy=True):
+        # call after changing the node, holding self.lock: a flush between
+        # the mark and the change would store the old node and forget the
+        # mark, an eviction between the change and the mark would drop it
+        # taxonomy: parents, childs or synonims of the node changed
+        if taxonomy:
+            self.ancestors.invalidate(concept_name)
+        if self.journal is not None:
+            self.journal.mark(concept_name)
+
+    def _ensure_concept(self, concept_name):
+        # stub node for the other end of a connection
+        if concept_name not in self.concepts:
+            self.logger.debug("creating node: " + concept_name)
+            name = intern_name(concept_name)
+            self.concepts[name] = ConceptNode(name)
+        return self.concepts[concept_name]
+
+    def connect(self, concept_name, relation, target, gen=1):
+        """
+        Connect concept_name to target and update the reverse index
+
+        Creates the target node if it does not exist yet, relations
+        without an inverse (cousins) are only added to concept_name
+        """
+        with self.lock:
+            node = self._ensure_concept(concept_name)
+            target_node = self._ensure_concept(target)
+            if relation == "parents":
+                node.add_parent(target, gen=gen)
+                target_node.add_child(concept_name, gen=gen)
+            elif relation == "childs":
+                node.add_child(target, gen=gen)
+                target_node.add_parent(concept_name, gen=gen)
+            elif relation == "cousins":
+                node.add_cousin(target)
+            else:
+                node.add_connection(relation, target)
+                if target != concept_name:
+                    target_node.add_connection(REVERSE_RELATIONS[relation],
+                                               concept_name)
+            taxonomy = relation in ["parents", "childs", "synonims"]
+            self._changed(concept_name, taxonomy)
+            self._changed(target, taxonomy)
+
+    def disconnect(self, concept_name, relation, target):
+        """ Remove a connection from both sides of the reverse index """
+        with self.lock:
+            node = self.concepts.get(concept_name)
+            if node is not None:
+                node.remove_connection(relation, target)
+            reverse = REVERSE_RELATIONS.get(relation)
+            target_node = self.concepts.get(target)
+            if reverse is not None and target_node is not None:
+                target_node.remove_connection(reverse, concept_name)
+            self._changed(concept_name)
+            self._changed(target)
+
     def add_concept(self, concept_name, concept):
-        if concept_name in self.concepts:
-            #  merge fields
-            for parent in concept.get_parents():
-                if parent not in self.get_parents(concept_name):
-                    self.logger.info(("adding parent node: " + parent))
-                    self.concepts[concept_name].add_parent(parent, gen=concept.get_parents()[parent])
-            for child in concept.connections["childs"]:
-                if child not in self.get_childs(concept_name):
-                    self.logger.info("adding child node: " + str(child))
-                    self.concepts[concept_name].add_child(child, gen=concept.get_childs()[child])
-            for antonim in concept.get_antonims():
-                if antonim not in self.concepts[concept_name].get_antonims():
-                    self.logger.info("adding antonim: " + str(antonim))
-                    self.concepts[concept_name].add_antonim(antonim)
-            for synonim in concept.get_synonims():
-                if synonim not in self.concepts[concept_name].get_synonims():
-                    self.logger.info("adding synonim: " + str(synonim))
-                    self.concepts[concept_name].add_synonim(synonim)
+        with self.lock:
+            if concept_name in self.concepts:
+                #  merge fields
+                current = self.concepts[concept_name]
+                for parent, gen in concept.get_parents().items():
+                    if parent not in current.get_parents():
+                        self.logger.info(("adding parent node: " + parent))
+                        current.add_parent(parent, gen=gen)
+                for child, gen in concept.get_childs().items():
+                    if child not in current.get_childs():
+                        self.logger.info("adding child node: " + str(child))
+                        current.add_child(child, gen=gen)
+                for antonim in concept.get_antonims():
+                    if not current.is_connected("antonims", antonim):
+                        self.logger.info("adding antonim: " + str(antonim))
+                        current.add_antonim(antonim)
+                for synonim in concept.get_synonims():
+                    if not current.is_connected("synonims", synonim):
+                        self.logger.info("adding synonim: " + str(synonim))
+                        current.add_synonim(synonim)
+
+
+            else:
+                self.concepts.setdefault(intern_name(concept_name), concept)
+            self._changed(concept_name)
 
+    def remove_concept(self, concept_name):
+        with self.lock:
+            self.ancestors.invalidate(concept_name)
+            if self.journal is not None:
+                self.journal.mark_deleted(concept_name)
+            self.concepts.pop(concept_name)
 
-        else:
-            self.concepts.setdefault(concept_name, concept)
+    def is_ancestor(self, concept_name, ancestor):
+        return self.ancestors.is_ancestor(concept_name, ancestor)
 
-    def remove_concept(self, concept_name):
-        self.concepts.pop(concept_name)
+    def common_ancestors(self, concept_name, other_name):
+        return self.ancestors.common_ancestors(concept_name, other_name)
 
     def get_data(self, concept_name):
         return self.concepts[concept_name].get_data()
 
     def add_data(self, concept_name, key, data={}):
-        self.concepts[concept_name].add_data(key, data)
+        with self.lock:
+            self.concepts[concept_name].add_data(key, data)
+            self._changed(concept_name, taxonomy=False)
 
     def get_childs(self, concept_name):
         try:
@@ -350,8 +780,8 @@ class ConceptConnector():
             c = {}
         return c
 
-    def add_child(self, concept_name, child):
-        self.concepts[concept_name].add_child(child)
+    def add_child(self, concept_name, child, gen=1):
+        self.connect(concept_name, "childs", child, gen)
 
     def get_parents(self, concept_name):
         try:
@@ -360,131 +790,114 @@ class ConceptConnector():
             p = {}
         return p
 
-    def add_parent(self, concept_name, parent):
-        self.concepts[concept_name].add_parent(parent)
+    def add_parent(self, concept_name, parent, gen=1):
+        self.connect(concept_name, "parents", parent, gen)
 
     def get_antonims(self, concept_name):
         return self.concepts[concept_name].get_antonims()
 
     def add_antonim(self, concept_name, antonim):
-        self.concepts[concept_name].add_antonim(antonim)
+        self.connect(concept_name, "antonims", antonim)
 
     def get_synonims(self, concept_name):
         return self.concepts[concept_name].get_synonims()
 
     def add_synonim(self, concept_name, synonim):
-        self.concepts[concept_name].add_synonim(synonim)
+        self.connect(concept_name, "synonims", synonim)
 
     def get_cousins(self, concept_name):
         return self.concepts[concept_name].get_cousins()
 
     def add_cousin(self, concept_name, cousin):
         self.logger.info("adding cousin: " + cousin + " to concept: " + concept_name)
-        self.concepts[concept_name].add_cousin(cousin)
+        self.connect(concept_name, "cousins", cousin)
 
     def get_parts(self, concept_name):
         return self.concepts[concept_name].get_parts()
 
     def add_part(self, concept_name, part):
-        self.concepts[concept_name].add_part(part)
+        self.connect(concept_name, "parts", part)
 
     def get_part_off(self, concept_name):
         return self.concepts[concept_name].get_part_off()
 
     def add_part_off(self, concept_name, part_off):
-        self.concepts[concept_name].add_part_off(part_off)
+        self.connect(concept_name, "part_off", part_off)
 
     def get_spawn(self, concept_name):
         return self.concepts[concept_name].get_spawn()
 
     def add_spawn(self, concept_name, spawn):
-        self.concepts[concept_name].add_spawn(spawn)
+        self.connect(concept_name, "spawns", spawn)
 
     def get_spawned_by(self, concept_name):
         return self.concepts[concept_name].get_spawned_by()
 
     def add_spawned_by(self, concept_name, spawned_by):
-        self.concepts[concept_name].add_spawned_by(spawned_by)
+        self.connect(concept_name, "spawned_by", spawned_by)
 
     def get_consumes(self, concept_name):
         return self.concepts[concept_name].get_consumes()
 
     def add_consumes(self, concept_name, consumes):
-        self.concepts[concept_name].add_consumes(consumes)
+        self.connect(concept_name, "consumes", consumes)
 
     def get_consumed_by(self, concept_name):
         return self.concepts[concept_name].get_consumed_by()
 
     def add_consumed_by(self, concept_name, consumed_by):
-        self.concepts[concept_name].add_consumed_by(consumed_by)
+        self.connect(concept_name, "consumed_by", consumed_by)
 
     def create_concept(self, new_concept_name, data={},
                            child_concepts={}, parent_concepts={}, synonims=[], antonims=[]):
 
-        # safe - checking
-        if new_concept_name in parent_concepts:
-            parent_concepts.pop(new_concept_name)
-        if new_concept_name in child_concepts:
-            child_concepts.pop(new_concept_name)
-
-        if new_concept_name not in self.concepts:
-            self.logger.info("creating concept " + new_concept_name)
-        else:
-            self.logger.info("updating concept " + new_concept_name)
-        # handle new concept
-        concept = ConceptNode(name=new_concept_name, data=data, child_concepts=child_concepts, parent_concepts=parent_concepts,
-                              synonims=synonims, antonims=antonims)
-
-        self.add_concept(new_concept_name, concept)
-
-        # handle parent concepts
-        for concept_name in parent_concepts:
-            self.logger.info("checking if parent node exists: " + concept_name)
-            gen = parent_concepts[concept_name]
-            # create parent if it doesnt exist
-            if concept_name not in self.concepts:
-                self.logger.info("creating node: " + concept_name )
-                concept = ConceptNode(concept_name, data={}, child_concepts={}, parent_concepts={}, synonims=[], antonims=[])
-                self.add_concept(concept_name, concept)
-            # add child to parent
-            self.logger.info("adding child: " + new_concept_name + " to parent: " + concept_name)
-            self.concepts[concept_name].add_child(new_concept_name, gen=gen)
-
-        # handle child concepts
-        for concept_name in child_concepts:
-            self.logger.info("checking if child node exists: " + concept_name)
-            gen = child_concepts[concept_name]
-            # create child if it doesnt exist
-            if concept_name not in self.concepts:
-                self.logger.info("creating node: " + concept_name)
-                concept = ConceptNode(concept_name, data={}, child_concepts={}, parent_concepts={}, synonims=[], antonims=[])
-                self.add_concept(concept_name, concept)
-            #add parent to child
-            self.logger.info("adding parent: " + new_concept_name + " to child: " + concept_name)
-            self.concepts[concept_name].add_parent(new_concept_name, gen=gen)
-
-        # handle synonims
-        for concept_name in synonims:
-            self.logger.info("checking if synonim exists: " + concept_name)
-            # create synonim if it doesnt exist
-            if concept_name not in self.concepts:
-                self.logger.info("creating node: " + concept_name)
-                concept = ConceptNode(concept_name, data={}, child_concepts={}, parent_concepts={}, synonims=[],
-                                      antonims=[])
-                self.add_concept(concept_name, concept)
-            # add synonim to synonim
-            self.logger.info("adding synonim: " + new_concept_name + " to concept: " + concept_name)
-            self.concepts[concept_name].add_synonim(new_concept_name)
-
-        # handle antonims
-        for concept_name in antonims:
-            self.logger.info("checking if antonim exists: " + concept_name)
-            # create synonim if it doesnt exist
-            if concept_name not in self.concepts:
-                self.logger.info("creating node: " + concept_name)
-                concept = ConceptNode(concept_name, data={}, child_concepts={}, parent_concepts={}, synonims=[],
-                                      antonims=[])
-                self.add_concept(concept_name, concept)
-            # add antonim to antonim
-            self.logger.info("adding antonim: " + new_concept_name + " to concept: " + concept_name)
-            self.concepts[concept_name].add_antonim(new_concept_name)
+        with self.lock:
+            # safe - checking
+            if new_concept_name in parent_concepts:
+                parent_concepts.pop(new_concept_name)
+            if new_concept_name in child_concepts:
+                child_concepts.pop(new_concept_name)
+
+            if new_concept_name not in self.concepts:
+                self.logger.info("creating concept " + new_concept_name)
+            else:
+                self.logger.info("updating concept " + new_concept_name)
+            # handle new concept
+            concept = ConceptNode(name=new_concept_name, data=data,
+                                  child_concepts=child_concepts,
+                                  parent_concepts=parent_concepts,
+                                  synonims=synonims, antonims=antonims)
+
+            self.add_concept(new_concept_name, concept)
+
+            # handle parent concepts, creating them if they dont exist
+            for concept_name in parent_concepts:
+                self.logger.debug("adding child: " + new_concept_name +
+                                  " to parent: " + concept_name)
+                self._ensure_concept(concept_name).add_child(
+                    new_concept_name, gen=parent_concepts[concept_name])
+                self._changed(concept_name)
+
+            # handle child concepts
+            for concept_name in child_concepts:
+                self.logger.debug("adding parent: " + new_concept_name +
+                                  " to child: " + concept_name)
+                self._ensure_concept(concept_name).add_parent(
+                    new_concept_name, gen=child_concepts[concept_name])
+                self._changed(concept_name)
+
+            # handle synonims
+            for concept_name in synonims:
+                self.logger.debug("adding synonim: " + new_concept_name +
+                                  " to concept: " + concept_name)
+                self._ensure_concept(concept_name).add_synonim(
+                    new_concept_name)
+                self._changed(concept_name)
+
+            # handle antonims
+            for concept_name in antonims:
+                self.logger.debug("adding antonim: " + new_concept_name +
+                                  " to concept: " + concept_name)
+                self._ensure_concept(concept_name).add_antonim(
+                    new_concept_name)
+                self._changed(concept_name, taxonomy=False)
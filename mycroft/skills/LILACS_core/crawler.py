@@ -1,7 +1,11 @@
+import bisect
+import heapq
 import math
 import random
+import time
+from collections import deque
 
-from mycroft.skills.LILACS_core.concept import ConceptConnector
+from mycroft.skills.LILACS_core.concept import ConceptConnector, OrderedSet
 from mycroft.skills.LILACS_core.crawl_log import getLogger as CrawlLogger
 from mycroft.util.log import getLogger
 
@@ -13,23 +17,38 @@ def sigmoid(x):
 
 
 class ConceptCrawler():
-    def __init__(self, depth=20, concept_connector=None):
+    def __init__(self, depth=20, concept_connector=None, max_visits=None,
+                 time_budget=None):
         # https://github.com/ElliotTheRobot/LILACS-mycroft-core/issues/9
         self.logger = CrawlLogger("Crawler", "Drunk")
         # concept database
         self.concept_db = concept_connector
         if self.concept_db is None:
             self.logger.error("no concept connector")
-        # crawl depth
+        # crawl depth (connections away from the start node)
         self.depth = depth
+        # maximum number of nodes a crawl may check
+        self.max_visits = max_visits
+        # maximum seconds a crawl may take
+        self.time_budget = time_budget
+        # last crawl gave up before finishing, results are partial
+        self.truncated = False
+        # last crawl skipped nodes beyond the depth limit, the rest was done
+        self.depth_limited = False
+        self._max_depth = None
+        self._max_visits = None
+        self._deadline = None
+        # connections away from the start node of each node seen in a drunk
+        # crawl
+        self.depths = {}
         # crawl path
         self.crawl_path = []
         # crawled antonims
-        self.do_not_crawl = []
+        self.do_not_crawl = set()
         # nodes we left behind without checking
-        self.uncrawled = []
+        self.uncrawled = deque()
         # nodes we already checked
-        self.crawled = []
+        self.crawled = set()
         # count visits to each node
         self.visits = {}
         #
@@ -39,18 +58,65 @@ class ConceptCrawler():
         self.logger.info("Updating crawler connector")
         self.concept_db = connector
 
-    def find_all_paths(self, center_node, target_node, path=[], direction="parents"):
-        # TODO give a depth parameter, there may be "infinite" nodes and make this super slow
+    def start_budget(self, max_depth=None, max_visits=None, time_budget=None):
+        # limits for the crawl about to start, None means no limit
+        self.truncated = False
+        self.depth_limited = False
+        self._max_depth = max_depth
+        self._max_visits = max_visits
+        self._deadline = None
+        if time_budget is not None:
+            self._deadline = time.time() + time_budget
+
+    def default_budget(self, max_depth=None, max_visits=None,
+                       time_budget=None):
+        # crawl limits, falling back to the crawler wide ones
+        if max_depth is None:
+            max_depth = self.depth
+        if max_visits is None:
+            max_visits = self.max_visits
+        if time_budget is None:
+            time_budget = self.time_budget
+        self.start_budget(max_depth, max_visits, time_budget)
+
+    def over_budget(self, visited):
+        # check the visit count and time limits, flagging the crawl as
+        # truncated
+        if self._max_visits is not None and visited >= self._max_visits:
+            self.logger.info("Maximum visited nodes reached: " + str(visited))
+            self.truncated = True
+        elif self._deadline is not None and time.time() > self._deadline:
+            self.logger.info("Crawl time budget exhausted")
+            self.truncated = True
+        return self.truncated
+
+    def beyond_depth(self, depth):
+        # depth only prunes the branch, it does not stop the crawl
+        if self._max_depth is not None and depth > self._max_depth:
+            self.depth_limited = True
+            return True
+        return False
+
+    def find_all_paths(self, center_node, target_node, path=[],
+                       direction="parents", max_depth=None, max_visits=None,
+                       time_budget=None):
+        # there may be "infinite" nodes, limits are checked in every call
+        if not path:
+            self.visits = {}
+            self.start_budget(max_depth, max_visits, time_budget)
+        if self.beyond_depth(len(path)) or self.over_budget(len(self.visits)):
+            return []
         path = path + [center_node]
         self.logger.info("Current Node: " + center_node)
-        self.visits[center_node] += 1
+        self.visits[center_node] = self.visits.get(center_node, 0) + 1
         if center_node == target_node:
-            self.logger.info("path found from " + path[0] + " to " + target_node)
+            self.logger.info("path found from " + path[0] + " to " +
+                             target_node)
             self.logger.info(path)
             return [path]
 
-        if center_node not in self.concept_db.get_concept_names():
-            # TODO load node and all connections from storage
+        # nodes not in memory are loaded from storage by the connector
+        if not self.concept_db.has_concept(center_node):
             return []
 
         paths = []
@@ -66,22 +132,233 @@ class ConceptCrawler():
 
         for node in nodes:
             if node not in path:
-                newpaths = self.find_all_paths(node, target_node, path, direction)
+                newpaths = self.find_all_paths(node, target_node, path,
+                                               direction)
                 for newpath in newpaths:
                     paths.append(newpath)
         return paths
 
-    def find_shortest_path(self, center_node, target_node, path=[], direction="parents"):
+    def get_connections(self, node, direction="parents"):
+        if direction == "parents":
+            return self.concept_db.get_parents(node)
+        elif direction == "childs":
+            return self.concept_db.get_childs(node)
+        self.logger.error("Invalid crawl direction")
+        return {}
+
+    def find_shortest_path(self, center_node, target_node, path=[],
+                           direction="parents", max_depth=None,
+                           weighted=False, max_visits=None,
+                           time_budget=None):
+        """
+        Shortest path from center_node to target_node following direction
+
+        Unweighted search is a bidirectional breadth first search, going
+        forward from center_node and backwards (the reverse relation) from
+        target_node. With weighted=True the gen of each connection is used
+        as its length and the path with the smallest total gen is returned.
+
+        :param max_depth: maximum number of connections in the path
+        :param max_visits: maximum number of nodes to check
+        :param time_budget: maximum seconds to search
+        :return: list of node names from center_node to target_node or None,
+                 self.truncated tells if the visit or time limit stopped
+                 the search, self.depth_limited if max_depth pruned it
+        """
         self.logger = CrawlLogger("Crawler", "Explorer")
-        self.logger.info("finding all paths from " + center_node + " to " + target_node)
-        paths = self.find_all_paths(center_node, target_node, direction=direction)
-        shortest = None
-        for newpath in paths:
-            if not shortest or len(newpath) < len(shortest):
-                shortest = newpath
+        self.logger.info("finding shortest path from " + center_node +
+                         " to " + target_node)
+        self.crawled = set()
+        self.start_budget(max_depth, max_visits, time_budget)
+        if weighted:
+            shortest = self._weighted_path(center_node, target_node,
+                                           direction, max_depth)
+        else:
+            shortest = self._bidirectional_path(center_node, target_node,
+                                                direction, max_depth)
         self.logger.info("shortest path is: " + str(shortest))
         return shortest
 
+    def _bidirectional_path(self, center_node, target_node, direction,
+                            max_depth):
+        if direction == "parents":
+            reverse = "childs"
+        elif direction == "childs":
+            reverse = "parents"
+        else:
+            self.logger.error("Invalid crawl direction")
+            return None
+        # node -> (next node towards the search origin, distance to origin)
+        forward = {center_node: (None, 0)}
+        backward = {target_node: (None, 0)}
+        forward_frontier = [center_node]
+        backward_frontier = [target_node]
+        forward_depth = backward_depth = 0
+        best = None
+        if center_node == target_node:
+            best = (0, center_node)
+        while best is None and forward_frontier and backward_frontier:
+            if (max_depth is not None and
+                    forward_depth + backward_depth >= max_depth):
+                self.depth_limited = True
+                break
+            if self.truncated:
+                break
+            # grow the smallest side, one full level at a time
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_depth += 1
+                forward_frontier, best = self._expand_level(
+                    forward_frontier, forward, backward, direction,
+                    forward_depth)
+            else:
+                backward_depth += 1
+                backward_frontier, best = self._expand_level(
+                    backward_frontier, backward, forward, reverse,
+                    backward_depth)
+        self.crawled = set(forward) | set(backward)
+        if best is None:
+            return None
+        meeting = best[1]
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = forward[node][0]
+        path.reverse()
+        node = backward[meeting][0]
+        while node is not None:
+            path.append(node)
+            node = backward[node][0]
+        return path
+
+    def _expand_level(self, frontier, visited, other, direction, depth):
+        next_frontier = []
+        best = None
+        for node in frontier:
+            if self.over_budget(len(visited) + len(other)):
+                break
+            for connected in self.get_connections(node, direction):
+                if connected in visited:
+                    continue
+                visited[connected] = (node, depth)
+                next_frontier.append(connected)
+                if connected in other:
+                    # several meetings may happen in one level, keep the
+                    # closest
+                    distance = depth + other[connected][1]
+                    if best is None or distance < best[0]:
+                        best = (distance, connected)
+        return next_frontier, best
+
+    def _weighted_path(self, center_node, target_node, direction, max_depth):
+        if max_depth is not None:
+            return self._hop_limited_weighted_path(center_node, target_node,
+                                                   direction, max_depth)
+        if direction == "parents":
+            reverse = "childs"
+        elif direction == "childs":
+            reverse = "parents"
+        else:
+            self.logger.error("Invalid crawl direction")
+            return None
+        # bidirectional dijkstra, connection length is its gen
+        forward = {center_node: (None, 0)}
+        backward = {target_node: (None, 0)}
+        forward_queue = [(0, center_node)]
+        backward_queue = [(0, target_node)]
+        done = (set(), set())
+        best = None
+        if center_node == target_node:
+            best = (0, center_node)
+        while forward_queue and backward_queue:
+            if (best is not None and
+                    forward_queue[0][0] + backward_queue[0][0] >= best[0]):
+                break
+            if self.over_budget(len(done[0]) + len(done[1])):
+                break
+            if forward_queue[0][0] <= backward_queue[0][0]:
+                best = self._dijkstra_step(forward_queue, forward, backward,
+                                           done[0], direction, best)
+            else:
+                best = self._dijkstra_step(backward_queue, backward, forward,
+                                           done[1], reverse, best)
+        self.crawled = done[0] | done[1]
+        if best is None:
+            return None
+        meeting = best[1]
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = forward[node][0]
+        path.reverse()
+        node = backward[meeting][0]
+        while node is not None:
+            path.append(node)
+            node = backward[node][0]
+        return path
+
+    def _dijkstra_step(self, queue, distances, other, done, direction, best):
+        distance, node = heapq.heappop(queue)
+        if node in done:
+            return best
+        done.add(node)
+        connections = self.get_connections(node, direction)
+        for connected in connections:
+            new_distance = distance + connections[connected]
+            if (connected in distances and
+                    distances[connected][1] <= new_distance):
+                continue
+            distances[connected] = (node, new_distance)
+            heapq.heappush(queue, (new_distance, connected))
+            if connected in other:
+                total = new_distance + other[connected][1]
+                if best is None or total < best[0]:
+                    best = (total, connected)
+        return best
+
+    def _hop_limited_weighted_path(self, center_node, target_node,
+                                   direction, max_depth):
+        # dijkstra from center_node over (node, connections so far) states,
+        # a dearer path with fewer connections may still reach the target
+        # within max_depth when the cheapest one can not
+        queue = [(0, 0, center_node, None)]
+        # (node, hops) -> (previous node, its hops)
+        previous = {}
+        # fewest hops each node was settled with
+        fewest = {}
+        found = None
+        while queue:
+            distance, hops, node, parent = heapq.heappop(queue)
+            if fewest.get(node, max_depth + 1) <= hops:
+                # reached before as cheaply with no more connections
+                continue
+            fewest[node] = hops
+            previous[(node, hops)] = parent
+            if node == target_node:
+                found = (node, hops)
+                break
+            if self.over_budget(len(fewest)):
+                break
+            if hops >= max_depth:
+                self.depth_limited = True
+                continue
+            connections = self.get_connections(node, direction)
+            for connected in connections:
+                if fewest.get(connected, max_depth + 1) > hops + 1:
+                    heapq.heappush(queue, (distance + connections[connected],
+                                           hops + 1, connected, (node, hops)))
+        self.crawled = set(fewest)
+        if found is None:
+            return None
+        path = []
+        state = found
+        while state is not None:
+            path.append(state[0])
+            state = previous[state]
+        path.reverse()
+        return path
+
     def find_minimum_node_distance(self, center_node, target_node):
         return len(self.find_shortest_path(center_node, target_node))
 
@@ -94,15 +371,8 @@ class ConceptCrawler():
 
     def mark_as_crawled(self, node):
         self.logger.info("Marking node as crawled: " + node)
-        # remove current node from uncrawled nodes list
-        i = 0
-        for uncrawled_node in self.uncrawled:
-            if uncrawled_node == node:
-                self.uncrawled.pop(i)
-            i += 1
-        # add current node to crawled list
-        if node not in self.crawled:
-            self.crawled.append(node)
+        # uncrawled is cleaned lazily, crawled nodes are skipped when popped
+        self.crawled.add(node)
 
     def choose_next_node(self, node, direction="parents"):
         # when choosing the next node we have to think about what matters more
@@ -112,61 +382,44 @@ class ConceptCrawler():
         # - choose stronger connections preferably
         # - number of times we visited this node
 
-        # TODO load node and all its connected nodes from storage
+        # nodes not in memory are loaded from storage by the connector
         # TODO if node not loaded ask knowledge service for node info
-        # TODO send update nodes to storage
 
         if node is None:
             return node
 
         # keep count of visits to this node
-        if node in self.visits:
-            self.visits[node] += 1
-        else:
-            self.visits[node] = 1
+        self.visits[node] = self.visits.get(node, 0) + 1
 
-        self.logger.info("Number of visits to this node: " + str(self.visits[node]))
+        self.logger.info("Number of visits to this node: " +
+                         str(self.visits[node]))
 
         # add current node to crawl path
         self.crawl_path.append(node)
 
         self.mark_as_crawled(node)
         # are we checking parents or childs?
+        # copy, synonim connections are merged in and antonims popped below
         if direction == "parents":
-            nodes = self.concept_db.get_parents(node)
-            self.logger.info("parents of " + node + " : " + str(nodes))
+            nodes = dict(self.concept_db.get_parents(node))
             # check if node as synonims
-            synonims = []
             synonims = self.concept_db.get_synonims(node)
-            self.logger.info("synonim of " + node + " : " + str(synonims))
 
             for synonim in synonims:
                 # get connections of these synonims also
                 self.logger.info("found synonim: " + synonim)
-                self.crawled.append(synonim)
-                self.logger.info("adding synonim connections to crawl list")
-                p = {}
-                try:
-                    p = self.concept_db.get_parents(synonim)
-                except:
-                    pass
-                self.logger.debug("synonim connections: " + str(p))
+                self.crawled.add(synonim)
+                p = self.concept_db.get_parents(synonim)
                 for n in p:
                     nodes.setdefault(n, p[n])
         elif direction == "childs":
-            nodes = self.concept_db.get_childs(node)
+            nodes = dict(self.concept_db.get_childs(node))
             # check if node as synonims
             synonims = self.concept_db.get_synonims(node)
             for synonim in synonims:
                 # get connections of these synonims also
                 self.logger.info("found synonim: " + synonim)
-                self.logger.info("adding synonim connections to crawl list")
-                c = {}
-                try:
-                    c = self.concept_db.get_childs(synonim)
-                except:
-                    pass
-                self.logger.debug("synonim connections: " + str(c))
+                c = self.concept_db.get_childs(synonim)
                 for n in c:
                     nodes.setdefault(n, c[n])
         else:
@@ -175,56 +428,71 @@ class ConceptCrawler():
 
         # if no connections found return
         if len(nodes) == 0:
-            self.logger.info(node + " doesn't have any " + direction + " connection")
+            self.logger.info(node + " doesn't have any " + direction +
+                             " connection")
             return None
 
         # add these nodes to "nodes to crawl"
-        for node in dict(nodes):
+        depth = self.depths.get(node, 0) + 1
+        for node in list(nodes):
+            if self.beyond_depth(depth):
+                self.logger.info("Maximum crawl depth reached: " + str(depth))
+                nodes.pop(node)
+                continue
+            self.depths.setdefault(node, depth)
             self.uncrawled.append(node)
             # add all antonims from these nodes to do no crawl
-            for antonim in self.concept_db.get_antonims(node):
-                self.do_not_crawl.append(antonim)
-                self.logger.info("blacklisting node " + antonim + " because it is an antonim of: " + node)
+            if self.concept_db.has_concept(node):
+                self.do_not_crawl.update(self.concept_db.get_antonims(node))
             # remove any node we are not supposed to crawl
             if node in self.do_not_crawl:
                 self.logger.info("we are in a blacklisted node: " + node)
                 nodes.pop(node)
 
-        # create a weighted list giving preference
-
-
-        new_weights = {}
+        # weighted choice giving preference to stronger connections
+        # turn all values into a value between 0 and 100
+        # smaller values are more important
+        candidates = []
+        totals = []
+        total = 0
         for node in nodes:
-            # turn all values into a value between 0 and 1
-            # multiply by 100
-            # smaller values are more important
-            new_weights[node] = int(100 - sigmoid(nodes[node]) * 100)
-        self.logger.info("next node weights are: " + str(new_weights))
-
-        list = [k for k in new_weights for dummy in range(new_weights[k])]
-        if list == []:
-            next_node = None
-        else:
-            # choose a node to crawl next
-            next_node = random.choice(list)
-        return next_node
+            weight = int(100 - sigmoid(nodes[node]) * 100)
+            if weight > 0:
+                total += weight
+                candidates.append(node)
+                totals.append(total)
+        if total == 0:
+            return None
+        # choose a node to crawl next
+        return candidates[bisect.bisect_right(totals, random.randrange(total))]
 
     def reset_visit_counter(self):
-        # visit counter at zero
-        for node in self.concept_db.get_concept_names():
-            self.visits[node] = 0
+        # visit counter at zero, unvisited nodes count as 0 visits, listing
+        # every concept would read the whole store behind a WorkingSet
+        self.visits = {}
 
-    def drunk_crawl(self, center_node, target_node, direction="parents"):
+    def next_uncrawled(self):
+        # last node we left behind (keep on this path), skipping crawled ones
+        while self.uncrawled:
+            node = self.uncrawled.pop()
+            if node not in self.crawled:
+                return node
+        return None
+
+    def drunk_crawl(self, center_node, target_node, direction="parents",
+                    max_depth=None, max_visits=None, time_budget=None):
         # reset variables
         self.logger = CrawlLogger("Crawler", "Drunk")
+        self.default_budget(max_depth, max_visits, time_budget)
+        self.depths = {center_node: 0}
         # crawl path
         self.crawl_path = []
         # crawled antonims
-        self.do_not_crawl = []
+        self.do_not_crawl = set()
         # nodes we left behind without checking
-        self.uncrawled = []
+        self.uncrawled = deque()
         # nodes we already checked
-        self.crawled = []
+        self.crawled = OrderedSet()
         # count visits to each node
         self.visits = {}
         # start at center node
@@ -233,60 +501,72 @@ class ConceptCrawler():
 
         next_node = self.choose_next_node(center_node, direction)
 
-
-        crawl_depth = 1
         while True:
             # check if we found answer
             if target_node in self.crawled:
                 self.logger.info("Found target node")
                 return True
+            if self.over_budget(len(self.crawled)):
+                # partial crawl, self.truncated is set
+                return False
             if next_node is None:
-                # choose next node
-                if len(self.uncrawled) == 0:
+                # reached a dead end, pick next unchecked node
+                next_node = self.next_uncrawled()
+                if next_node is None:
                     self.logger.info("No more nodes to crawl")
-                    #no more nodes to crawl
+                    # no more nodes to crawl
                     return False
-                # reached a dead end, pic next unchecked node
-                # chose last uncrawled node (keep on this path)
-                next_node = self.uncrawled[-1]
-                # TODO check crawl_depth threshold
-                #if crawl_depth >= self.depth:
-                #    # do not crawl further
-                #    self.logger.info("Maximum crawl depth reached: " + str(crawl_depth))
-                #    return False
-            self.logger.info( "next: " + next_node)
-            self.logger.info( "depth: " + str(crawl_depth))
+            self.logger.info("next: " + next_node)
             # see if we already crawled this
             if next_node in self.crawled:
                 self.logger.info("crawling this node again: " + next_node)
                 # increase visit counter
-                self.visits[next_node] += 1
-                self.logger.info("number of visits: " + str(self.visits[next_node]))
+                self.visits[next_node] = self.visits.get(next_node, 0) + 1
                 # add to crawl path
                 self.crawl_path.append(next_node)
-                # remove fom uncrawled list
-                i = 0
-                for node in self.uncrawled:
-                    if node == next_node:
-                        self.logger.info("removing node from uncrawled node list: " + node)
-                        self.uncrawled.pop(i)
-                    i += 1
                 # chose another to crawl
                 next_node = None
             # crawl next node
-            self.logger.info("choosing next node")
             next_node = self.choose_next_node(next_node, direction)
-            self.logger.info("crawled nodes: " + str(self.crawled))
-            # print "crawl_path: " + str(self.crawl_path)
-            self.logger.info("uncrawled nodes: " + str(self.uncrawled))
-            crawl_depth += 1  # went further
 
-    def explorer_crawl(self, center_node, target_node, direction="parents"):
+    def explorer_crawl(self, center_node, target_node, direction="parents",
+                       max_depth=None, weighted=False, max_visits=None,
+                       time_budget=None):
         # TODO load all relevant nodes into storage first
-        # since nodes are "infinite" the easiest way to populate nodes is to do some crawls
+        # since nodes are "infinite" the easiest way to populate nodes is to
+        # do some crawls
         self.logger = CrawlLogger("Crawler", "Explorer")
-        self.uncrawled = []  # none
-        self.do_not_crawl = []  # none
-        self.reset_visit_counter()
-        self.crawled = self.concept_db.get_concept_names()
-        self.crawl_path = self.find_shortest_path(center_node, target_node, direction=direction)
+        self.uncrawled = deque()  # none
+        self.do_not_crawl = set()  # none
+        self.visits = {}
+        # self.depth is for the drunk crawl, shortest paths are only capped
+        # when the caller asks for it
+        if max_visits is None:
+            max_visits = self.max_visits
+        if time_budget is None:
+            time_budget = self.time_budget
+        self.crawl_path = self.find_shortest_path(center_node, target_node,
+                                                  direction=direction,
+                                                  max_depth=max_depth,
+                                                  weighted=weighted,
+                                                  max_visits=max_visits,
+                                                  time_budget=time_budget)
+        return self.crawl_path is not None
+
+    def index_crawl(self, center_node, target_node, max_visits=None,
+                    time_budget=None):
+        # answer from the connector ancestor index instead of crawling
+        # depth is not limited, cached ancestors are complete closures
+        self.logger = CrawlLogger("Crawler", "Index")
+        self.uncrawled = deque()  # none
+        self.do_not_crawl = set()  # none
+        self.visits = {}
+        self.crawl_path = []
+        self.crawled = set()
+        self.default_budget(None, max_visits, time_budget)
+        if center_node == target_node:
+            return self.concept_db.is_ancestor(center_node, target_node)
+        ancestors, complete = self.concept_db.ancestors.closure(
+            center_node, self._max_visits, self._deadline)
+        self.truncated = not complete
+        return target_node in ancestors
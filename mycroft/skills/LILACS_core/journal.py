@@ -0,0 +1,131 @@
+from threading import Event, Lock, Thread
+
+from mycroft.util.log import getLogger
+
+__authors__ = ["jarbas", "heinzschmidt"]
+
+logger = getLogger("ConceptJournal")
+
+
+class ConceptJournal(object):
+    """
+    Write-behind persistence of ConceptConnector changes
+
+    The connector marks every node it changes, a background thread writes
+    the marked nodes to the store in one batch every interval seconds or
+    as soon as batch_size nodes are waiting. A batch is a single store
+    transaction; names only leave the journal once it has been committed
+    and only if they were not marked again meanwhile, a failed batch is
+    retried with the next one. Nodes leaving memory are written back by
+    write_back, which waits for a batch being written to finish first.
+
+    The store needs save_many(node_dicts) and delete(name), like
+    LILACS_storage.concept_store.ConceptStore (use durable=True there so
+    every committed batch is fsynced).
+    """
+
+    def __init__(self, connector, store, batch_size=500, interval=5.0):
+        self.connector = connector
+        self.store = store
+        self.batch_size = batch_size
+        self.interval = interval
+        self.lock = Lock()
+        # name -> mark number, tells later marks apart from the written one
+        self.dirty = {}
+        self.deleted = set()
+        self._marks = 0
+        # number of nodes written and batches committed, for benchmarks
+        self.written = 0
+        self.batches = 0
+        self._wake = Event()
+        self._stopped = False
+        self._flush_lock = Lock()
+        self.thread = Thread(target=self._run, name="ConceptJournal")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def mark(self, concept_name):
+        with self.lock:
+            self._marks += 1
+            self.dirty[concept_name] = self._marks
+            self.deleted.discard(concept_name)
+            waiting = len(self.dirty)
+        if waiting >= self.batch_size:
+            self._wake.set()
+
+    def mark_deleted(self, concept_name):
+        with self.lock:
+            self.dirty.pop(concept_name, None)
+            self.deleted.add(concept_name)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.dirty) + len(self.deleted)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped:
+                break
+            try:
+                self.flush()
+            except Exception:
+                logger.error("Could not write concepts to storage",
+                             exc_info=True)
+
+    def flush(self):
+        """ Write all pending changes now, returns the number of nodes """
+        with self._flush_lock:
+            with self.lock:
+                dirty = dict(self.dirty)
+                deleted = set(self.deleted)
+            if not dirty and not deleted:
+                return 0
+            nodes = []
+            for name in dirty:
+                # evicted nodes are written back before leaving memory,
+                # one that is not loaded now has nothing left to write
+                node = self.connector.get_loaded(name)
+                if node is not None:
+                    nodes.append(node.to_dict())
+            # on failure every name is still pending for the next batch
+            self.store.save_many(nodes, deleted)
+            with self.lock:
+                self._forget(dirty)
+                self.deleted -= deleted
+            self.written += len(nodes)
+            self.batches += 1
+            logger.debug("wrote " + str(len(nodes)) + " concepts to storage")
+            return len(nodes)
+
+    def _forget(self, written):
+        # names marked again meanwhile wait for the next batch
+        for name, mark in written.items():
+            if self.dirty.get(name) == mark:
+                del self.dirty[name]
+
+    def write_back(self, concept_name, node):
+        """
+        Write node now if it has pending changes, it is leaving memory
+
+        Call it before the node stops being loaded, a batch being written
+        meanwhile may hold an older copy and is waited for
+        """
+        with self._flush_lock:
+            with self.lock:
+                mark = self.dirty.get(concept_name)
+            if mark is None:
+                return
+            self.store.save(node.to_dict())
+            with self.lock:
+                self._forget({concept_name: mark})
+            self.written += 1
+
+    def stop(self, flush=True):
+        """ Stop the background thread, writing what is left if flush """
+        self._stopped = True
+        self._wake.set()
+        self.thread.join()
+        if flush:
+            self.flush()
@@ -4,18 +4,22 @@
 # standard questions helper functions
 
 
-def why_is_this_that(this, that, crawler=None):
+def why_is_this_that(this, that, crawler=None, weighted=False):
     if crawler is None:
         return None
-    crawler.explorer_crawl(this, that)
+    # shortest chain of parents, weighted prefers the strongest connections
+    crawler.explorer_crawl(this, that, weighted=weighted)
     nodes = crawler.crawl_path
     return nodes
 
 
-def is_this_that(this, that, crawler=None):
+def is_this_that(this, that, crawler=None, mode="index"):
     if crawler is None:
         return None
-    flag = crawler.drunk_crawl(this, that)
+    # mode "drunk" does a random crawl instead of using the ancestor index
+    if mode == "drunk":
+        return crawler.drunk_crawl(this, that)
+    flag = crawler.index_crawl(this, that)
     return flag
 
 
@@ -30,9 +34,12 @@ def examples_of_this(this, crawler=None):
     return examples
 
 
-def common_this_and_that( this, that, crawler=None):
+def common_this_and_that(this, that, crawler=None, mode="index"):
     if crawler is None:
         return None
+    if mode != "drunk":
+        # closest common ancestors first
+        return crawler.concept_db.common_ancestors(this, that)
     crawler.drunk_crawl(this, "no target crawl")
     p_crawl = crawler.crawled
     common = []
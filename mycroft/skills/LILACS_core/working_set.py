@@ -0,0 +1,181 @@
+from collections import deque
+from threading import RLock
+
+from mycroft.skills.LILACS_core.concept import ConceptNode
+from mycroft.util.log import getLogger
+
+__authors__ = ["jarbas", "heinzschmidt"]
+
+logger = getLogger("WorkingSet")
+
+
+class WorkingSet(object):
+    """
+    Bounded dict of ConceptNodes backed by a ConceptStore
+
+    Used as ConceptConnector.concepts, at most capacity nodes are kept in
+    memory and nodes that are not are loaded from the store when accessed.
+    Eviction is CLOCK (second chance), an LRU approximation that only
+    needs a set add per access. Evicted nodes are written back first, only
+    the dirty ones if a ConceptJournal tracks them, every one otherwise.
+
+    The last few nodes accessed are never evicted, callers may still be
+    holding them to make a change.
+
+    Bus handlers change it from their own threads while the journal
+    thread reads it, every method but peek holds self.lock. Listing the
+    concepts (names, iteration, len) reads every name in the store.
+    """
+
+    RECENT = 16
+
+    def __init__(self, store, capacity=100000, journal=None):
+        self.store = store
+        self.capacity = max(capacity, self.RECENT + 1)
+        self.journal = journal
+        # reentrant, paging a node in may evict another
+        self.lock = RLock()
+        self._nodes = {}
+        # clock ring of resident names, the hand is on the left
+        self._ring = deque()
+        self._referenced = set()
+        self._recent = deque(maxlen=self.RECENT)
+        # removed but maybe still in the store until the journal flushes
+        self._removed = set()
+        # names known not to be in the store
+        self._missing = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _touch(self, name):
+        self._referenced.add(name)
+        self._recent.append(name)
+
+    def _insert(self, name, node):
+        if name not in self._nodes:
+            self._ring.append(name)
+        self._nodes[name] = node
+        self._touch(name)
+        while len(self._nodes) > self.capacity:
+            self._evict()
+
+    def _evict(self):
+        while True:
+            name = self._ring.popleft()
+            if name not in self._nodes:
+                # removed meanwhile
+                continue
+            if name in self._referenced or name in self._recent:
+                # second chance
+                self._referenced.discard(name)
+                self._ring.append(name)
+                continue
+            break
+        node = self._nodes[name]
+        # written while still loaded, so a journal flush meanwhile sees it
+        try:
+            if self.journal is not None:
+                self.journal.write_back(name, node)
+            else:
+                self.store.save(node.to_dict())
+        except Exception:
+            self._ring.append(name)
+            raise
+        del self._nodes[name]
+        self.evictions += 1
+
+    def _page_in(self, name):
+        if name in self._removed or name in self._missing:
+            return None
+        stored = self.store.load(name)
+        if stored is None:
+            if len(self._missing) > self.capacity:
+                self._missing.clear()
+            self._missing.add(name)
+            return None
+        self.misses += 1
+        node = ConceptNode.from_dict(stored)
+        self._insert(node.name, node)
+        return node
+
+    def peek(self, name):
+        """ Node if it is in memory, without loading it or marking it used """
+        # no lock, the journal flush calls it while evictions wait for it
+        return self._nodes.get(name)
+
+    def get(self, name, default=None):
+        with self.lock:
+            node = self._nodes.get(name)
+            if node is not None:
+                self.hits += 1
+                self._touch(name)
+                return node
+            node = self._page_in(name)
+            if node is None:
+                return default
+            return node
+
+    def __getitem__(self, name):
+        node = self.get(name)
+        if node is None:
+            raise KeyError(name)
+        return node
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __setitem__(self, name, node):
+        with self.lock:
+            self._removed.discard(name)
+            self._missing.discard(name)
+            self._insert(name, node)
+
+    def setdefault(self, name, node):
+        with self.lock:
+            current = self.get(name)
+            if current is not None:
+                return current
+            self[name] = node
+            return node
+
+    def pop(self, name, *default):
+        with self.lock:
+            node = self.get(name)
+            if node is None:
+                if default:
+                    return default[0]
+                raise KeyError(name)
+            del self._nodes[name]
+            self._removed.add(name)
+            return node
+
+    def names(self):
+        """
+        Every concept name, in memory or only in the store
+
+        Reads every name in the store, avoid it on hot paths
+        """
+        with self.lock:
+            names = set(self.store.names())
+            names.update(self._nodes)
+            return names - self._removed
+
+    def resident(self):
+        """ Number of nodes in memory """
+        return len(self._nodes)
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return len(self.names())
+
+    def keys(self):
+        return list(self.names())
+
+    def values(self):
+        return [self[name] for name in self.names()]
+
+    def items(self):
+        return [(name, self[name]) for name in self.names()]
@@ -101,6 +101,11 @@ class LILACSCuriositySkill(MycroftSkill):
     def stop(self):
         self.handle_deactivate_intent("global stop")
 
+    def shutdown(self):
+        if self.service is not None:
+            self.service.shutdown()
+        super(LILACSCuriositySkill, self).shutdown()
+
     def converse(self, transcript, lang="en-us"):
         # parse all utterances for entitys
         if "bump curiosity" not in transcript[0]:
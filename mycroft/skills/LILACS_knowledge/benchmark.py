@@ -0,0 +1,83 @@
+import logging
+import sys
+import time
+from threading import Thread
+
+from mycroft.messagebus.client.ws import WebsocketClient
+from mycroft.skills.LILACS_knowledge.knowledgeservice import KnowledgeService
+
+__author__ = 'jarbas'
+
+# usage: python -m mycroft.skills.LILACS_knowledge.benchmark [subjects] \
+#            [backends]
+# ie:    python -m mycroft.skills.LILACS_knowledge.benchmark dog,cat,frog \
+#            dbpedia,wikidata
+#
+# Times the whole knowledge path (bus, knowledge service, cache, backends)
+# for every subject, asking the backends one by one until one answers and
+# all at once. Needs the messagebus and the knowledge service running, to
+# run without network record fixtures first with the knowledge cache in
+# "online" mode and a "path", then switch the cache "mode" to "replay".
+# In "online" mode the second pass is mostly answered from the cache.
+
+DEFAULT_SUBJECTS = ["dog", "cat", "frog", "human", "animal", "mammal",
+                    "computer", "music", "water", "sun"]
+DEFAULT_BACKENDS = ["dbpedia", "wikidata", "wikipedia", "wordnik"]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def report(name, times):
+    print "%-12s mean %8.1f ms  p50 %8.1f ms  p95 %8.1f ms" % (
+        name, 1000 * sum(times) / len(times),
+        1000 * percentile(times, 0.5), 1000 * percentile(times, 0.95))
+
+
+def sequential(service, subject, backends):
+    for backend in backends:
+        if service.adquire(subject, backend):
+            return backend
+
+
+def parallel(service, subject, backends):
+    return service.adquire_first(subject, backends)[0]
+
+
+def run(service, subjects, backends):
+    for name, adquire in [("sequential", sequential),
+                          ("parallel", parallel)]:
+        times = []
+        for subject in subjects:
+            start = time.time()
+            backend = adquire(service, subject, backends)
+            times.append(time.time() - start)
+            print "%-12s %-20s %-12s %8.1f ms" % (
+                name, subject, backend, 1000 * times[-1])
+        report(name, times)
+
+
+def main(argv):
+    logging.disable(logging.INFO)
+    subjects = DEFAULT_SUBJECTS
+    backends = DEFAULT_BACKENDS
+    if len(argv) > 1:
+        subjects = argv[1].split(",")
+    if len(argv) > 2:
+        backends = argv[2].split(",")
+    ws = WebsocketClient()
+    service = KnowledgeService(ws)
+
+    def benchmark():
+        run(service, subjects, backends)
+        ws.close()
+
+    # handlers block the bus thread, answers must be read meanwhile
+    ws.once('open', lambda: Thread(target=benchmark).start())
+    ws.run_forever()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
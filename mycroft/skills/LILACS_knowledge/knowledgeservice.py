@@ -1,23 +1,128 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from mycroft.messagebus.client.pending import PendingRequests
 from mycroft.messagebus.message import Message
+from mycroft.metrics import MetricsAggregator
+from mycroft.util.log import getLogger
+
+__author__ = 'jarbas'
+
+logger = getLogger("KnowledgeService")
+
+
+def any_answer(backend, answer):
+    """ default accept for adquire_first, any non empty answer is good """
+    return bool(answer)
 
 
 class KnowledgeService():
-    def __init__(self, emitter):
+    # requests remembered for latency metrics, unanswered ones are dropped
+    MAX_TRACKED = 100
+    # seconds between metrics uploads, latencies are aggregated meanwhile
+    FLUSH_INTERVAL = 60
+
+    def __init__(self, emitter, timeout=30):
         self.emitter = emitter
-        self.result = None
+        self.timeout = timeout
+        self.pending = PendingRequests()
+        self.metrics = MetricsAggregator()
+        # request_id -> (backend, time sent)
+        self.sent = OrderedDict()
+        self.last_flush = time.time()
+        self.lock = Lock()
         self.emitter.on("LILACS_result", self.get_result)
-        self.waiting = False
 
-    def adquire(self, subject="consciousness", utterance=''):
-        self.waiting = True
+    def _send(self, subject, utterance):
+        request_id = self.pending.new()
+        with self.lock:
+            self.sent[request_id] = (utterance or "default", time.time())
+            if len(self.sent) > self.MAX_TRACKED:
+                backend, started = self.sent.popitem(last=False)[1]
+                self.metrics.increment("knowledge." + backend + ".lost")
         self.emitter.emit(Message('LILACS_KnowledgeService_adquire',
                                   data={'subject': subject,
-                                        'utterance': utterance}))
-        while self.waiting:
-            pass
-        return self.result
+                                        'utterance': utterance,
+                                        'request_id': request_id}))
+        return request_id
+
+    def adquire(self, subject="consciousness", utterance='', timeout=None):
+        """
+        Ask the knowledge service about subject and block until a backend
+        answers, an empty dict is returned if none does within timeout
+        """
+        if timeout is None:
+            timeout = self.timeout
+        request_id = self._send(subject, utterance)
+        result = self.pending.wait(request_id, timeout)
+        if result is None:
+            logger.warn("no knowledge about " + str(subject) + " in " +
+                        str(timeout) + " seconds")
+            return {}
+        return result
+
+    def adquire_first(self, subject, backends, accept=None, timeout=None):
+        """
+        Ask every backend in backends about subject at the same time
+
+        Answers are taken in the order of backends, the first one accepted
+        is returned as soon as every backend before it answered, without
+        waiting for the ones after it. accept(backend, answer) decides
+        if an answer is good, by default any non empty answer is.
+
+        Returns (backend, answers), answers is a dict of backend -> answer
+        of everything received so far, backend is None if no answer was
+        accepted within timeout.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if accept is None:
+            accept = any_answer
+        deadline = time.time() + timeout
+        requests = [(backend, self._send(subject, backend))
+                    for backend in backends]
+        answers = {}
+        chosen = None
+        for backend, request_id in requests:
+            if chosen is not None:
+                # only collect what already arrived
+                answer = self.pending.wait(request_id, 0)
+            else:
+                answer = self.pending.wait(request_id,
+                                           max(deadline - time.time(), 0))
+            if answer is None:
+                continue
+            answers[backend] = answer
+            if chosen is None:
+                try:
+                    if accept(backend, answer):
+                        chosen = backend
+                except Exception:
+                    logger.debug("answer from " + backend + " not accepted")
+        if chosen is None:
+            logger.warn("no knowledge about " + str(subject) + " from " +
+                        str(backends))
+        return chosen, answers
 
     def get_result(self, message):
-        self.result = message.data["data"]
-        self.waiting = False
+        request_id = message.data.get("request_id")
+        with self.lock:
+            sent = self.sent.pop(request_id, None)
+            if sent is not None:
+                backend, started = sent
+                self.metrics.timer("knowledge." + backend,
+                                   time.time() - started)
+                if time.time() - self.last_flush >= self.FLUSH_INTERVAL:
+                    self._flush()
+        self.pending.resolve(request_id, message.data["data"])
+
+    def _flush(self):
+        # callers hold self.lock
+        self.metrics.flush()
+        self.last_flush = time.time()
 
+    def shutdown(self):
+        """ publish the metrics aggregated since the last flush """
+        with self.lock:
+            self._flush()
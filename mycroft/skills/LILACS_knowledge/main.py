@@ -20,9 +20,13 @@ from os.path import abspath, dirname, basename, isdir, join
 from os import listdir
 import sys
 import imp
+from collections import OrderedDict
+from threading import Lock
 
 from mycroft.configuration import ConfigurationManager
 from mycroft.messagebus.client.ws import WebsocketClient
+from mycroft.messagebus.message import Message
+from mycroft.skills.LILACS_knowledge.services.cache import load_cache
 from mycroft.util.log import getLogger
 
 __author__ = 'jarbas'
@@ -36,6 +40,11 @@ ws = None
 default = None
 service = []
 current = None
+cache = None
+# request_id -> (backend, subject) of answers to cache when they arrive
+uncached = OrderedDict()
+uncached_lock = Lock()
+MAX_UNCACHED = 1000
 
 
 def create_service_descriptor(service_folder):
@@ -99,8 +108,10 @@ def load_services_callback():
     global ws
     global default
     global service
+    global cache
 
     config = ConfigurationManager.get().get("knowledge")
+    cache = load_cache(config.get("cache", {}))
     service = load_services(config, ws)
     logger.info(service)
     default_name = config.get('default-backend', '')
@@ -118,6 +129,7 @@ def load_services_callback():
 
     # do stuff
     ws.on('LILACS_KnowledgeService_adquire', _adquire)
+    ws.on('LILACS_result', _cache_result)
     ws.on('mycroft.stop', _stop)
 
 
@@ -133,7 +145,7 @@ def _stop(message=None):
     logger.info('Stopped')
 
 
-def adquire(subject, prefered_service):
+def adquire(subject, prefered_service, request_id=None):
     """
         play seeking knwoledge on the prefered service if it supports
         the uri. If not the next best backend is found.
@@ -151,12 +163,45 @@ def adquire(subject, prefered_service):
         service = default
     else:  # Fall back to asking user?
         logger.error("no service")
+        # answer anyway so the requester does not wait for its timeout
+        ws.emit(Message("LILACS_result", {"data": {},
+                                          "request_id": request_id}))
         return
 
-    service.adquire(subject)
+    if cache is not None:
+        answer = cache.get(service.name, subject)
+        if answer is not None or cache.replay:
+            logger.info("answer from cache")
+            ws.emit(Message("LILACS_result", {"data": answer or {},
+                                              "request_id": request_id}))
+            return
+        if request_id:
+            with uncached_lock:
+                uncached[request_id] = (service.name, subject)
+                if len(uncached) > MAX_UNCACHED:
+                    # backend never answered
+                    uncached.popitem(last=False)
+
+    service.adquire(subject, request_id)
     current = service
 
 
+def _cache_result(message):
+    """
+        Handler for LILACS_result. Caches answers of backends, empty answers
+        are failures and are asked again next time.
+    """
+    if cache is None:
+        return
+    with uncached_lock:
+        pending = uncached.pop(message.data.get('request_id'), None)
+    if pending is None:
+        return
+    backend, subject = pending
+    if message.data.get('data'):
+        cache.put(backend, subject, message.data['data'])
+
+
 def _adquire(message):
     """
         Handler for LILACS_KnowledgeService_adquire. Starts seeking knowledge about.... Also
@@ -180,7 +225,7 @@ def _adquire(message):
     else:
         prefered_service = None
 
-    adquire(subject, prefered_service)
+    adquire(subject, prefered_service, message.data.get('request_id'))
 
 
 def connect():
@@ -13,11 +13,12 @@ class KnowledgeBackend():
         pass
 
     @abstractmethod
-    def adquire(self, subject):
+    def adquire(self, subject, request_id=None):
         pass
 
     @abstractmethod
-    def send_result(self, result = {}):
+    def send_result(self, result={}, request_id=None):
+        """ emit LILACS_result, echoing the request_id it was asked with """
         pass
 
     @abstractmethod
@@ -0,0 +1,144 @@
+import json
+import os
+import sqlite3
+import time
+from os.path import join
+from threading import Lock
+
+from mycroft.util import get_cache_directory
+from mycroft.util.log import getLogger
+
+__author__ = 'jarbas'
+
+logger = getLogger("KnowledgeCache")
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS answers ("
+    " backend TEXT NOT NULL,"
+    " subject TEXT NOT NULL,"
+    " data TEXT NOT NULL,"
+    " stored REAL NOT NULL,"
+    " used REAL NOT NULL,"
+    " size INTEGER NOT NULL,"
+    " PRIMARY KEY (backend, subject))",
+    "CREATE INDEX IF NOT EXISTS answers_used ON answers (used)"
+]
+
+
+class KnowledgeCache(object):
+    """
+    Answers of knowledge backends kept on disk, keyed by backend and subject
+
+    Answers older than ttl seconds are fetched again. When the answers
+    take more than max_size bytes the least recently used are dropped
+    until they fit in 90% of it, so eviction does not run on every put.
+
+    With replay=True the cache is a read only recording: answers never
+    expire and a miss means there is no answer, backends are not asked.
+    """
+
+    def __init__(self, path, ttl=604800, max_size=50 * 1024 * 1024,
+                 replay=False):
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        # bus handlers run on other threads, access is serialized by the lock
+        self.lock = Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            for statement in SCHEMA:
+                self.db.execute(statement)
+        self.size = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0]
+        logger.info("knowledge cache at " + self.path)
+
+    def get(self, backend, subject):
+        """ cached answer of backend about subject, None if there is none """
+        now = time.time()
+        with self.lock, self.db:
+            row = self.db.execute(
+                "SELECT data, stored, size FROM answers "
+                "WHERE backend = ? AND subject = ?",
+                (backend, subject)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            data, stored, size = row
+            if not self.replay and self.ttl and now - stored > self.ttl:
+                self.db.execute("DELETE FROM answers "
+                                "WHERE backend = ? AND subject = ?",
+                                (backend, subject))
+                self.size -= size
+                self.misses += 1
+                return None
+            if not self.replay:
+                self.db.execute("UPDATE answers SET used = ? "
+                                "WHERE backend = ? AND subject = ?",
+                                (now, backend, subject))
+            self.hits += 1
+        return json.loads(data)
+
+    def put(self, backend, subject, answer):
+        if self.replay:
+            return
+        data = json.dumps(answer)
+        size = len(data)
+        if size > self.max_size:
+            return
+        now = time.time()
+        with self.lock, self.db:
+            row = self.db.execute("SELECT size FROM answers "
+                                  "WHERE backend = ? AND subject = ?",
+                                  (backend, subject)).fetchone()
+            if row is not None:
+                self.size -= row[0]
+            self.db.execute(
+                "INSERT OR REPLACE INTO answers "
+                "(backend, subject, data, stored, used, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (backend, subject, data, now, now, size))
+            self.size += size
+            if self.size > self.max_size:
+                self._evict(self.max_size * 0.9)
+
+    def _evict(self, target):
+        evicted = []
+        for backend, subject, size in self.db.execute(
+                "SELECT backend, subject, size FROM answers "
+                "ORDER BY used"):
+            if self.size <= target:
+                break
+            evicted.append((backend, subject))
+            self.size -= size
+        self.db.executemany("DELETE FROM answers "
+                            "WHERE backend = ? AND subject = ?", evicted)
+        logger.debug("evicted " + str(len(evicted)) + " answers")
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def load_cache(config):
+    """ KnowledgeCache for the knowledge "cache" config, None if off """
+    mode = config.get("mode", "online")
+    if mode == "off":
+        return None
+    path = config.get("path") or join(get_cache_directory("lilacs"),
+                                      "knowledge.db")
+    return KnowledgeCache(path, ttl=config.get("ttl", 604800),
+                          max_size=config.get("max_size", 50 * 1024 * 1024),
+                          replay=mode == "replay")
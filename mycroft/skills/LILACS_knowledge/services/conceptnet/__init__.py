@@ -22,6 +22,7 @@ class ConceptNetService(KnowledgeBackend):
     def _adquire(self, message=None):
         logger.info('ConceptNetKnowledge_Adquire')
         subject = message.data["subject"]
+        request_id = message.data.get("request_id")
         if subject is None:
             logger.error("No subject to adquire knowledge about")
             return
@@ -79,15 +80,19 @@ class ConceptNetService(KnowledgeBackend):
 
             except:
                 logger.error("Could not parse concept net for " + str(subject))
-            self.send_result(dict)
+            self.send_result(dict, request_id)
 
 
-    def adquire(self, subject):
+    def adquire(self, subject, request_id=None):
         logger.info('Call ConceptNetKnowledgeAdquire')
-        self.emitter.emit(Message('ConceptNetKnowledgeAdquire', {"subject": subject}))
-
-    def send_result(self, result={}):
-        self.emitter.emit(Message("LILACS_result", {"data": result}))
+        self.emitter.emit(Message('ConceptNetKnowledgeAdquire',
+                                  {"subject": subject,
+                                   "request_id": request_id}))
+
+    def send_result(self, result={}, request_id=None):
+        self.emitter.emit(Message("LILACS_result",
+                                  {"data": result,
+                                   "request_id": request_id}))
 
     def stop(self):
         logger.info('ConceptNetKnowledge_Stop')
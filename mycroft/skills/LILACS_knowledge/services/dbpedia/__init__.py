@@ -27,6 +27,7 @@ class DBpediaService(KnowledgeBackend):
     def _adquire(self, message=None):
         logger.info('DBpediaKnowledge_Adquire')
         subject = message.data["subject"]
+        request_id = message.data.get("request_id")
         if subject is None:
             logger.error("No subject to adquire knowledge about")
             return
@@ -62,7 +63,7 @@ class DBpediaService(KnowledgeBackend):
                 dict["dbpedia"] = node_data
             except:
                 logger.error("Could not parse dbpedia for " + str(subject))
-            self.send_result(dict)
+            self.send_result(dict, request_id)
 
     def scrap_resource_page(self, link):
         u = link.replace("http://dbpedia.org/resource/", "http://dbpedia.org/data/") + ".json"
@@ -120,12 +121,16 @@ class DBpediaService(KnowledgeBackend):
 
         return dbpedia
 
-    def adquire(self, subject):
+    def adquire(self, subject, request_id=None):
         logger.info('Call DBpediaKnowledgeAdquire')
-        self.emitter.emit(Message('DBpediaKnowledgeAdquire', {"subject": subject}))
-
-    def send_result(self, result = {}):
-        self.emitter.emit(Message("LILACS_result", {"data": result}))
+        self.emitter.emit(Message('DBpediaKnowledgeAdquire',
+                                  {"subject": subject,
+                                   "request_id": request_id}))
+
+    def send_result(self, result={}, request_id=None):
+        self.emitter.emit(Message("LILACS_result",
+                                  {"data": result,
+                                   "request_id": request_id}))
 
     def stop(self):
         logger.info('DBpediaKnowledge_Stop')
@@ -23,6 +23,7 @@ class WikidataService(KnowledgeBackend):
     def _adquire(self, message=None):
         logger.info('WikidataKnowledge_Adquire')
         subject = message.data["subject"]
+        request_id = message.data.get("request_id")
         if subject is None:
             logger.error("No subject to adquire knowledge about")
             return
@@ -46,14 +47,18 @@ class WikidataService(KnowledgeBackend):
                 dict["wikidata"] = node_data
             except:
                 logger.error("Could not parse wikidata for " + str(subject))
-            self.send_result(dict)
+            self.send_result(dict, request_id)
 
-    def adquire(self, subject):
+    def adquire(self, subject, request_id=None):
         logger.info('Call WikidataKnowledgeAdquire')
-        self.emitter.emit(Message('WikidataKnowledgeAdquire', {"subject": subject}))
+        self.emitter.emit(Message('WikidataKnowledgeAdquire',
+                                  {"subject": subject,
+                                   "request_id": request_id}))
 
-    def send_result(self, result = {}):
-        self.emitter.emit(Message("LILACS_result", {"data": result}))
+    def send_result(self, result={}, request_id=None):
+        self.emitter.emit(Message("LILACS_result",
+                                  {"data": result,
+                                   "request_id": request_id}))
 
     def stop(self):
         logger.info('WikidataKnowledge_Stop')
@@ -23,6 +23,7 @@ class WikiHowService(KnowledgeBackend):
     def _adquire(self, message=None):
         logger.info('WikihowKnowledge_Adquire')
         subject = message.data["subject"]
+        request_id = message.data.get("request_id")
         if subject is None:
             logger.error("No subject to adquire knowledge about")
             return
@@ -35,7 +36,7 @@ class WikiHowService(KnowledgeBackend):
                 dict["wikihow"] = how_to
             except:
                 logger.error("Could not parse wikihow for " + str(subject))
-            self.send_result(dict)
+            self.send_result(dict, request_id)
 
     def search_wikihow(self, search_term):
         # print "Seaching wikihow for " + search_term
@@ -144,12 +145,16 @@ class WikiHowService(KnowledgeBackend):
         how_to["url"] = link
         return how_to
 
-    def adquire(self, subject):
+    def adquire(self, subject, request_id=None):
         logger.info('Call WikihowKnowledgeAdquire')
-        self.emitter.emit(Message('WikihowKnowledgeAdquire', {"subject": subject}))
-
-    def send_result(self, result = {}):
-        self.emitter.emit(Message("LILACS_result", {"data": result}))
+        self.emitter.emit(Message('WikihowKnowledgeAdquire',
+                                  {"subject": subject,
+                                   "request_id": request_id}))
+
+    def send_result(self, result={}, request_id=None):
+        self.emitter.emit(Message("LILACS_result",
+                                  {"data": result,
+                                   "request_id": request_id}))
 
     def stop(self):
         logger.info('WikihowKnowledge_Stop')
@@ -22,6 +22,7 @@ class WikipediaService(KnowledgeBackend):
     def _adquire(self, message=None):
         logger.info('WikipediaKnowledge_Adquire')
         subject = message.data["subject"]
+        request_id = message.data.get("request_id")
         if subject is None:
             logger.error("No subject to adquire knowledge about")
             return
@@ -44,7 +45,7 @@ class WikipediaService(KnowledgeBackend):
 
             except:
                 logger.error("Could not parse wikipedia for " + str(subject))
-            self.send_result(dict)
+            self.send_result(dict, request_id)
 
     def parse_infobox(self, subject):
         page = wptools.page(subject, silent=True, verbose=False).get_parse()
@@ -57,12 +58,16 @@ class WikipediaService(KnowledgeBackend):
         return data
 
 
-    def adquire(self, subject):
+    def adquire(self, subject, request_id=None):
         logger.info('Call WikipediaKnowledgeAdquire')
-        self.emitter.emit(Message('WikipediaKnowledgeAdquire', {"subject": subject}))
-
-    def send_result(self, result = {}):
-        self.emitter.emit(Message("LILACS_result", {"data": result}))
+        self.emitter.emit(Message('WikipediaKnowledgeAdquire',
+                                  {"subject": subject,
+                                   "request_id": request_id}))
+
+    def send_result(self, result={}, request_id=None):
+        self.emitter.emit(Message("LILACS_result",
+                                  {"data": result,
+                                   "request_id": request_id}))
 
     def stop(self):
         logger.info('WikipediaKnowledge_Stop')
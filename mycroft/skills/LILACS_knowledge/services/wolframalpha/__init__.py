@@ -32,6 +32,7 @@ class WolframAlpha(KnowledgeBackend):
     def _adquire(self, message=None):
         logger.info('WolframAlphaKnowledge_Adquire')
         subject = message.data["subject"]
+        request_id = message.data.get("request_id")
         if subject is None:
             logger.error("No subject to adquire knowledge about")
             return
@@ -46,15 +47,19 @@ class WolframAlpha(KnowledgeBackend):
                 dict["wolfram alpha"] = node_data
             except:
                 logger.error("Could not parse wolfram alpha for " + str(subject))
-            self.send_result(dict)
+            self.send_result(dict, request_id)
 
 
-    def adquire(self, subject):
+    def adquire(self, subject, request_id=None):
         logger.info('Call WolframKnowledgeAdquire')
-        self.emitter.emit(Message('WolframAlphaKnowledgeAdquire', {"subject": subject}))
-
-    def send_result(self, result={}):
-        self.emitter.emit(Message("LILACS_result", {"data": result}))
+        self.emitter.emit(Message('WolframAlphaKnowledgeAdquire',
+                                  {"subject": subject,
+                                   "request_id": request_id}))
+
+    def send_result(self, result={}, request_id=None):
+        self.emitter.emit(Message("LILACS_result",
+                                  {"data": result,
+                                   "request_id": request_id}))
 
 
     def wolfram_to_nodes(self, query, lang="en-us"):
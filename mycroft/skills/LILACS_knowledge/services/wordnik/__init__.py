@@ -29,6 +29,7 @@ class Wordnik(KnowledgeBackend):
     def _adquire(self, message=None):
         logger.info('WordnikKnowledge_Adquire')
         subject = message.data["subject"]
+        request_id = message.data.get("request_id")
         if subject is None:
             logger.error("No subject to adquire knowledge about")
             return
@@ -44,15 +45,19 @@ class Wordnik(KnowledgeBackend):
                 dict["wordnik"] = node_data
             except:
                 logger.error("Could not parse wordnik for " + str(subject))
-            self.send_result(dict)
+            self.send_result(dict, request_id)
 
 
-    def adquire(self, subject):
+    def adquire(self, subject, request_id=None):
         logger.info('Call WordnikAdquire')
-        self.emitter.emit(Message('WordnikKnowledgeAdquire', {"subject": subject}))
-
-    def send_result(self, result={}):
-        self.emitter.emit(Message("LILACS_result", {"data": result}))
+        self.emitter.emit(Message('WordnikKnowledgeAdquire',
+                                  {"subject": subject,
+                                   "request_id": request_id}))
+
+    def send_result(self, result={}, request_id=None):
+        self.emitter.emit(Message("LILACS_result",
+                                  {"data": result,
+                                   "request_id": request_id}))
 
     def get_definitions(self, subject):
         definitions = self.wordApi.getDefinitions(subject,
@@ -0,0 +1,131 @@
+import json
+import os
+import sqlite3
+from threading import Lock
+
+from mycroft.util.log import getLogger
+
+__author__ = 'jarbas'
+
+logger = getLogger("ConceptStore")
+
+# sqlite limits the number of variables in one statement
+CHUNK_SIZE = 500
+
+# data and connections are json, a node is always read and written whole
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS nodes ("
+    " name TEXT PRIMARY KEY,"
+    " type TEXT NOT NULL,"
+    " data TEXT,"
+    " connections TEXT)"
+]
+
+
+class ConceptStore(object):
+    """
+    Concept graph kept in a SQLite database in WAL mode
+
+    Nodes are the dicts produced by ConceptNode.to_dict, stored one row per
+    node so a single node and its neighbours can be read with two primary
+    key lookups, without loading the whole graph.
+
+    With durable=True every committed transaction is fsynced, otherwise
+    a power loss may drop the last transactions (never corrupt the file).
+    """
+
+    def __init__(self, path, durable=False):
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        # bus handlers run on other threads, access is serialized by the lock
+        self.lock = Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        if durable:
+            self.db.execute("PRAGMA synchronous=FULL")
+        else:
+            self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            for statement in SCHEMA:
+                self.db.execute(statement)
+        logger.info("concept store at " + self.path)
+
+    def save(self, node):
+        self.save_many([node])
+
+    def save_many(self, nodes, deleted=()):
+        """
+        Write nodes, replacing stored ones, and remove the deleted names
+        in a single transaction
+        """
+        with self.lock, self.db:
+            self.db.executemany("DELETE FROM nodes WHERE name = ?",
+                                ((name,) for name in deleted))
+            self.db.executemany(
+                "INSERT OR REPLACE INTO nodes (name, type, data, connections) "
+                "VALUES (?, ?, ?, ?)",
+                ((node["name"], node.get("type", "info"),
+                  json.dumps(node.get("data") or {}),
+                  json.dumps(node.get("connections") or {}))
+                 for node in nodes))
+
+    def delete(self, name):
+        self.save_many([], [name])
+
+    def load(self, name):
+        """ Stored node dict for name, None if it was never saved """
+        return self.load_many([name]).get(name)
+
+    def load_many(self, names):
+        """ dict of name -> node dict, names not stored are left out """
+        names = list(set(names))
+        nodes = {}
+        with self.lock:
+            for i in range(0, len(names), CHUNK_SIZE):
+                chunk = names[i:i + CHUNK_SIZE]
+                marks = ",".join("?" * len(chunk))
+                for name, type, data, connections in self.db.execute(
+                        "SELECT name, type, data, connections FROM nodes "
+                        "WHERE name IN (" + marks + ")", chunk):
+                    nodes[name] = {"name": name, "type": type,
+                                   "data": json.loads(data or "{}"),
+                                   "connections": json.loads(
+                                       connections or "{}")}
+        return nodes
+
+    def load_with_neighbours(self, name):
+        """
+        Node name and every node it is connected to, as a dict of
+        name -> node dict, empty if name was never saved
+        """
+        node = self.load(name)
+        if node is None:
+            return {}
+        neighbours = set()
+        for targets in node["connections"].values():
+            neighbours.update(targets)
+        neighbours.discard(name)
+        nodes = self.load_many(neighbours)
+        nodes[name] = node
+        return nodes
+
+    def __contains__(self, name):
+        with self.lock:
+            row = self.db.execute("SELECT 1 FROM nodes WHERE name = ?",
+                                  (name,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def names(self):
+        with self.lock:
+            return [row[0] for row in
+                    self.db.execute("SELECT name FROM nodes")]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
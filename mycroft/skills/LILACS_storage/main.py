@@ -1,5 +1,6 @@
 
 import json
+import logging
 from os.path import expanduser, exists, abspath, dirname, basename, isdir, join
 from os import listdir
 import sys
@@ -242,7 +243,9 @@ def main():
         #logger.debug(message)
 
     logger.info("Staring Storage Services")
-    ws.on('message', echo)
+    # raw messages subscribe to every message type, only when logged
+    if logger.isEnabledFor(logging.DEBUG):
+        ws.on('message', echo)
     ws.once('open', load_services_callback)
     ws.run_forever()
 
@@ -0,0 +1,69 @@
+from os.path import abspath
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.LILACS_storage.concept_store import ConceptStore
+from mycroft.skills.LILACS_storage.services import StorageBackend
+from mycroft.util.log import getLogger
+
+__author__ = 'jarbas'
+
+logger = getLogger(abspath(__file__).split('/')[-2])
+
+DEFAULT_PATH = "~/.mycroft/lilacs/concepts.db"
+
+
+class SqliteService(StorageBackend):
+
+    def __init__(self, config, emitter, name='sqlite'):
+        self.config = config
+        self.process = None
+        self.emitter = emitter
+        self.name = name
+        self.store = ConceptStore(self.config.get("path", DEFAULT_PATH))
+        self.emitter.on('SqliteStorageLoad', self._load)
+        self.emitter.on('SqliteStorageSave', self._save)
+
+    def _load(self, message=None):
+        logger.info('SqliteStorage_Load')
+        node = message.data["node"]
+        if node is None:
+            logger.error("No node to load")
+            return
+        # node and all its neighbours, so the crawler can keep going
+        nodes = self.store.load_with_neighbours(node)
+        self.send_result(node, nodes)
+
+    def _save(self, message=None):
+        logger.info('SqliteStorage_Save')
+        node = message.data["node"]
+        if node is None:
+            logger.error("No node to save")
+            return
+        # node dict as made by ConceptNode.to_dict
+        self.store.save(node)
+
+    def load(self, node):
+        logger.info('Call SqliteStorageLoad')
+        self.emitter.emit(Message('SqliteStorageLoad', {"node": node}))
+
+    def save(self, node):
+        logger.info('Call SqliteStorageSave')
+        self.emitter.emit(Message('SqliteStorageSave', {"node": node}))
+
+    def send_result(self, node, nodes={}):
+        self.emitter.emit(Message("LILACS_StorageService_result",
+                                  {"node": node, "data": nodes}))
+
+    def stop(self):
+        logger.info('SqliteStorage_Stop')
+        if self.process:
+            self.process.terminate()
+            self.process = None
+
+
+def load_service(base_config, emitter):
+    backends = base_config.get('backends', [])
+    services = [(b, backends[b]) for b in backends
+                if backends[b]['type'] == 'sqlite']
+    instances = [SqliteService(s[1], emitter, s[0]) for s in services]
+    return instances
@@ -17,6 +17,7 @@
 
 
 import argparse
+import logging
 import sys
 from os.path import dirname, exists, isdir
 
@@ -82,7 +83,9 @@ class SkillContainer(object):
 
     def run(self):
         try:
-            self.ws.on('message', LOG.debug)
+            # raw messages subscribe to every message type, only when logged
+            if LOG.isEnabledFor(logging.DEBUG):
+                self.ws.on('message', LOG.debug)
             self.ws.on('open', self.load_skill)
             self.ws.on('error', LOG.error)
             self.ws.run_forever()
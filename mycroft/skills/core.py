@@ -224,8 +224,9 @@ class MycroftSkill(object):
         self.emitter.on('mycroft.stop', self.__handle_stop)
 
     def detach(self):
-        for intent in self.registered_intents:
-            self.emitter.emit(Message("detach_intent", {"intent_name": intent}))
+        self.emitter.emit(Message("update_intents", {
+            "skill_id": self.skill_id,
+            "detach": [name for name, intent in self.registered_intents]}))
 
     def initialize(self):
         """
@@ -265,19 +266,26 @@ class MycroftSkill(object):
 
     def disable_intent(self, intent_name):
         """Disable a registered intent"""
-        self.emitter.emit(Message("disable_intent", {"intent_name": intent_name}))
+        self.update_intents(disable=[intent_name])
 
     def enable_intent(self, intent_name):
         """Reenable a registered self intent"""
-        self.emitter.emit(Message("enable_intent", {"intent_name": intent_name}))
+        self.update_intents(enable=[intent_name])
+
+    def update_intents(self, enable=(), disable=()):
+        """
+        Enable and disable registered intents of this skill at once, the
+        intent service applies them together from a single message
+        """
+        self.emitter.emit(Message("update_intents", {
+            "skill_id": self.skill_id, "enable": list(enable),
+            "disable": list(disable)}))
 
     def handle_enable_intent(self, message):
         intent_name = message.data["intent_name"]
         for (name, intent) in self.registered_intents:
             if name == intent_name:
-                self.registered_intents.remove((name, intent))
-                intent.name = name
-                self.register_intent(intent, None)
+                self.enable_intent(intent_name)
                 logger.info("Enabling Intent " + intent_name)
                 return
         logger.error("Could not Re-enable Intent " + intent_name)
@@ -285,8 +293,7 @@ class MycroftSkill(object):
     def handle_disable_intent(self, message):
         intent_name = message.data["intent_name"]
         logger.debug('Disabling intent ' + intent_name)
-        name = str(self.skill_id) + ':' + intent_name
-        self.emitter.emit(Message("detach_intent", {"intent_name": name}))
+        self.disable_intent(intent_name)
 
     def register_vocabulary(self, entity, entity_type):
         self.emitter.emit(Message('register_vocab', {
@@ -18,6 +18,8 @@
 
 from adapt.engine import IntentDeterminationEngine
 
+from mycroft.configuration import ConfigurationManager
+from mycroft.messagebus.client.pending import PendingRequests
 from mycroft.messagebus.message import Message
 from mycroft.skills.intent_parser import IntentParser
 from mycroft.util.log import getLogger
@@ -27,35 +29,58 @@ import time
 __author__ = 'seanfitz'
 
 logger = getLogger(__name__)
+config = ConfigurationManager.get().get("skills", {})
 
 
 class Intent(object):
-    def __init__(self, emitter):
+    def __init__(self, emitter, converse_wait=config.get("converse_wait", 3)):
         self.engine = IntentDeterminationEngine()
         self.emitter = emitter
         self.intent_parser = IntentParser(self.emitter)
         self.active_skills = []  # [skill_id , timestamp]
         self.converse_timeout = 5  # minutes to prune active_skills
+        # seconds to wait for the converse answer of active skills
+        self.converse_wait = converse_wait
+        self.pending = PendingRequests()
         self.emitter.on('register_intent', self.handle_register_intent)
         self.emitter.on('recognizer_loop:utterance', self.handle_utterance)
         self.emitter.on('converse_status_response', self.handle_conversation_response)
 
-    def do_conversation(self, utterances, skill_id, lang):
+    def request_conversation(self, utterances, skill_id, lang):
+        request_id = self.pending.new()
         self.emitter.emit(Message("converse_status_request", {
-            "skill_id": skill_id, "utterances": utterances, "lang": lang}))
-        self.waiting = True
-        self.result = False
-        while self.waiting:
-            pass
-        return self.result
+            "skill_id": skill_id, "utterances": utterances, "lang": lang,
+            "request_id": request_id}))
+        return request_id
+
+    def do_conversation(self, utterances, skill_id, lang):
+        """ True if skill_id handled utterances in its converse method """
+        request_id = self.request_conversation(utterances, skill_id, lang)
+        return bool(self.pending.wait(request_id, self.converse_wait))
+
+    def converse(self, utterances, lang):
+        """
+        Ask every active skill at once if it handles utterances
+
+        Returns the id of the most recently active skill that did, only
+        waiting for the answers of the skills before it, or None if none
+        did within converse_wait seconds.
+        """
+        deadline = time.time() + self.converse_wait
+        requests = [(skill[0], self.request_conversation(utterances,
+                                                         skill[0], lang))
+                    for skill in self.active_skills]
+        for index, (skill_id, request_id) in enumerate(requests):
+            if self.pending.wait(request_id, max(deadline - time.time(), 0)):
+                for other_id, other in requests[index + 1:]:
+                    self.pending.cancel(other)
+                return skill_id
+        return None
 
     def handle_conversation_response(self, message):
-        # id = message.data["skill_id"]
-        # no need to crosscheck id because waiting before new request is made
-        # no other skill will make this request is safe assumption
-        result = message.data["result"]
-        self.result = result
-        self.waiting = False
+        # answers without a request id go to the oldest request
+        self.pending.resolve(message.data.get("request_id"),
+                             message.data["result"])
 
     def remove_active_skill(self, skill_id):
         for skill in self.active_skills:
@@ -80,12 +105,12 @@ class Intent(object):
                               if time.time() - skill[1] <= self.converse_timeout * 60]
 
         # check if any skill wants to handle utterance
-        for skill in self.active_skills:
-            if self.do_conversation(utterances, skill[0], lang):
-                # update timestamp, or there will be a timeout where
-                # intent stops conversing whether its being used or not
-                self.add_active_skill(skill[0])
-                return
+        skill_id = self.converse(utterances, lang)
+        if skill_id is not None:
+            # update timestamp, or there will be a timeout where
+            # intent stops conversing whether its being used or not
+            self.add_active_skill(skill_id)
+            return
         # no skill wants to handle utterance, proceed
 
         best_intent = None
@@ -4,7 +4,9 @@ from mycroft.util.log import getLogger
 from mycroft.messagebus.message import Message
 
 import time
+from collections import OrderedDict
 from multiprocessing import Process
+from threading import Lock
 
 from mycroft.util.parse import normalize
 
@@ -14,8 +16,10 @@ logger = getLogger(__name__)
 
 
 class IntentTree():
-    def __init__(self, emitter, layers = [], timer = 500):
+    def __init__(self, emitter, layers = [], timer = 500, skill_id=None):
         self.emitter = emitter
+        # layers hold intent names without the "skill_id:" prefix
+        self.skill_id = skill_id
         # make intent tree for N layers
         self.tree = []
         self.current_layer = 0
@@ -27,11 +31,26 @@ class IntentTree():
 
     def disable_intent(self, intent_name):
         """Disable a registered intent"""
-        self.emitter.emit(Message("disable_intent", {"intent_name": intent_name}))
+        self.update_intents(disable=[intent_name])
 
     def enable_intent(self, intent_name):
         """Reenable a registered self intent"""
-        self.emitter.emit(Message("enable_intent", {"intent_name": intent_name}))
+        self.update_intents(enable=[intent_name])
+
+    def update_intents(self, enable=(), disable=()):
+        """Enable and disable intents at once, in a single bus message"""
+        if self.skill_id is None:
+            # names can't be prefixed, leave it to the skill's own handlers
+            for intent_name in disable:
+                self.emitter.emit(Message("disable_intent",
+                                          {"intent_name": intent_name}))
+            for intent_name in enable:
+                self.emitter.emit(Message("enable_intent",
+                                          {"intent_name": intent_name}))
+            return
+        self.emitter.emit(Message("update_intents", {
+            "skill_id": self.skill_id, "enable": list(enable),
+            "disable": list(disable)}))
 
     def start_timer(self):
 
@@ -66,7 +85,7 @@ class IntentTree():
     def next(self):
         logger.info("Going to next Tree Layer")
         self.current_layer += 1
-        if self.current_layer > len(self.tree):
+        if self.current_layer >= len(self.tree):
             logger.info("Already in last layer, going to layer 0")
             self.current_layer = 0
         if self.current_layer != 0:
@@ -77,7 +96,7 @@ class IntentTree():
         logger.info("Going to previous Tree Layer")
         self.current_layer -= 1
         if self.current_layer < 0:
-            self.current_layer = len(self.tree)
+            self.current_layer = len(self.tree) - 1
             logger.info("Already in layer 0, going to last layer")
         if self.current_layer != 0:
             self.start_timer()
@@ -107,37 +126,33 @@ class IntentTree():
     def disable(self):
         logger.info("Disabling tree")
         # disable all tree layers
-        for i in range(0, len(self.tree)):
-            self.deactivate_layer(i)
+        self.update_intents(disable=[intent_name for layer in self.tree
+                                     for intent_name in layer])
 
     def activate_layer(self, layer_num):
         # error check
-        if layer_num < 0 or layer_num > len(self.tree):
+        if layer_num < 0 or layer_num >= len(self.tree):
             logger.error("invalid layer number")
             return
 
         self.current_layer = layer_num
 
-        # disable other layers
-        self.disable()
-
-        # TODO in here we should wait for all intents to be detached
-        # sometimes detach intent from this step comes after register from next
-        time.sleep(0.3)
-
-        # enable layer
+        # disable other layers and enable this one in the same update, the
+        # intent service applies it at once so no ordering issues
         logger.info("Activating Layer " + str(layer_num))
-        for intent_name in self.tree[layer_num]:
-            self.enable_intent(intent_name)
+        enable = self.tree[layer_num]
+        self.update_intents(enable=enable,
+                            disable=[intent_name for layer in self.tree
+                                     for intent_name in layer
+                                     if intent_name not in enable])
 
     def deactivate_layer(self, layer_num):
         # error check
-        if layer_num < 0 or layer_num > len(self.tree):
+        if layer_num < 0 or layer_num >= len(self.tree):
             logger.error("invalid layer number")
             return
         logger.info("Deactivating Layer " + str(layer_num))
-        for intent_name in self.tree[layer_num]:
-            self.disable_intent(intent_name)
+        self.update_intents(disable=self.tree[layer_num])
 
 
 class IntentParser():
@@ -145,8 +160,14 @@ class IntentParser():
         self.engine = IntentDeterminationEngine()
         self.emitter = emitter
         self.reply = None
+        # every registered intent by name, disabled ones stay here but are
+        # left out of the engine until enabled again
+        self.intents = OrderedDict()
+        self.disabled = set()
+        self.lock = Lock()
         self.emitter.on('register_vocab', self.handle_register_vocab)
         self.emitter.on('detach_intent', self.handle_detach_intent)
+        self.emitter.on('update_intents', self.handle_update_intents)
 
     def register_intent(self, intent_dict, handler=None):
 
@@ -154,7 +175,13 @@ class IntentParser():
                       intent_dict.get('requires'),
                       intent_dict.get('at_least_one'),
                       intent_dict.get('optional'))
-        self.engine.register_intent_parser(intent)
+        with self.lock:
+            replaced = intent.name in self.intents
+            self.intents[intent.name] = intent
+            if replaced or intent.name in self.disabled:
+                self._update_engine()
+            else:
+                self.engine.register_intent_parser(intent)
 
         def receive_handler(message):
             try:
@@ -208,8 +235,36 @@ class IntentParser():
             self.engine.register_entity(
                 start_concept, end_concept, alias_of=alias_of)
 
+    def update_intents(self, enable=(), disable=(), detach=()):
+        """
+        Enable, disable and detach intents by name as a single change, the
+        engine gets the new intent list at once, no utterance is parsed
+        with only part of the change applied
+        """
+        with self.lock:
+            for intent_name in detach:
+                self.intents.pop(intent_name, None)
+                self.disabled.discard(intent_name)
+            # may arrive before the intent is registered, it stays disabled
+            self.disabled.update(disable)
+            self.disabled.difference_update(enable)
+            self._update_engine()
+
+    def _update_engine(self):
+        self.engine.intent_parsers = [
+            intent for name, intent in self.intents.iteritems()
+            if name not in self.disabled]
+
     def handle_detach_intent(self, message):
         intent_name = message.data.get('intent_name')
-        new_parsers = [
-            p for p in self.engine.intent_parsers if p.name != intent_name]
-        self.engine.intent_parsers = new_parsers
+        self.update_intents(detach=[intent_name])
+
+    def handle_update_intents(self, message):
+        # names are prefixed with the skill id when one is given
+        skill_id = message.data.get("skill_id")
+        prefix = "" if skill_id is None else str(skill_id) + ":"
+
+        def names(key):
+            return [prefix + name for name in message.data.get(key, [])]
+        self.update_intents(enable=names("enable"), disable=names("disable"),
+                            detach=names("detach"))
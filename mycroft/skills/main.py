@@ -17,6 +17,7 @@
 
 
 import json
+import logging
 import sys
 import time
 from threading import Timer
@@ -153,6 +154,7 @@ def handle_conversation_request(message):
     skill_id = int(message.data["skill_id"])
     utterances = message.data["utterances"]
     lang = message.data["lang"]
+    request_id = message.data.get("request_id")
     global ws, loaded_skills
     # loop trough skills list and call converse for skill with skill_id
     for skill in loaded_skills:
@@ -160,10 +162,11 @@ def handle_conversation_request(message):
             instance = loaded_skills[skill]["instance"]
             result = instance.converse(utterances, lang)
             ws.emit(Message("converse_status_response", {
-                    "skill_id": skill_id, "result": result}))
+                    "skill_id": skill_id, "result": result,
+                    "request_id": request_id}))
             return
     ws.emit(Message("converse_status_response", {
-        "skill_id": 0, "result": False}))
+        "skill_id": 0, "result": False, "request_id": request_id}))
 
 
 def main():
@@ -189,7 +192,9 @@ def main():
             pass
         logger.debug(message)
 
-    ws.on('message', echo)
+    # raw messages subscribe to every message type, only when logged
+    if logger.isEnabledFor(logging.DEBUG):
+        ws.on('message', echo)
     ws.once('open', load_watch_skills)
     ws.on('converse_status_request', handle_conversation_request)
     ws.run_forever()
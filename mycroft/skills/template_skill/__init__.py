@@ -63,7 +63,8 @@ class TemplateSkill(MycroftSkill):
     def build_intent_tree(self):
         layers = [["FirstIntent"], ["SecondIntent"]]
         timer_timeout_in_seconds = 60
-        self.tree = IntentTree(self.emitter, layers, timer_timeout_in_seconds)
+        self.tree = IntentTree(self.emitter, layers, timer_timeout_in_seconds,
+                               self.skill_id)
         # not sure where to put this in core, should be in initialize of every skill
         self.emitter.on('enable_intent', self.handle_enable_intent)
         self.emitter.on('disable_intent', self.handle_disable_intent)
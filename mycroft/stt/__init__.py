@@ -14,9 +14,11 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+from Queue import Queue
 from abc import ABCMeta, abstractmethod
+from threading import Thread
 
-from speech_recognition import Recognizer
+from speech_recognition import AudioData, Recognizer
 
 from mycroft.api import STTApi
 from mycroft.configuration import ConfigurationManager
@@ -27,8 +29,79 @@ __author__ = "jdorleans"
 LOG = getLogger("STT")
 
 
+class STTStream(object):
+    """
+    Audio of one utterance handed to an STT while it is being recorded
+
+    write() is called with every chunk as it is read from the mic, stop()
+    when the utterance is complete returns its transcription. This one
+    keeps the chunks and transcribes the whole clip with execute() on
+    stop(), for backends that can not do better.
+    """
+
+    def __init__(self, stt, sample_rate, sample_width, language=None):
+        self.stt = stt
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.language = language
+        self.byte_data = bytearray()
+
+    def write(self, chunk):
+        self.byte_data.extend(chunk)
+
+    def stop(self):
+        audio = AudioData(str(self.byte_data), self.sample_rate,
+                          self.sample_width)
+        return self.stt.execute(audio, self.language)
+
+    def cancel(self):
+        self.byte_data = bytearray()
+
+
+class ThreadedSTTStream(STTStream):
+    """
+    Feeds the chunks of an utterance to StreamingSTT.stream_audio running
+    on its own thread, so it recognizes while the user is still speaking
+    """
+
+    def __init__(self, stt, sample_rate, sample_width, language=None):
+        super(ThreadedSTTStream, self).__init__(stt, sample_rate,
+                                                sample_width, language)
+        self.queue = Queue()
+        self.text = None
+        self.error = None
+        self.thread = Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        try:
+            self.text = self.stt.stream_audio(iter(self.queue.get, None),
+                                              self.sample_rate,
+                                              self.sample_width,
+                                              self.language)
+        except Exception, e:
+            self.error = e
+
+    def write(self, chunk):
+        self.queue.put(chunk)
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.text
+
+    def cancel(self):
+        # the result is never read, no need to wait for it
+        self.queue.put(None)
+
+
 class STT(object):
     __metaclass__ = ABCMeta
+    # True if transcription starts before the utterance is complete
+    streaming = False
 
     def __init__(self):
         config_core = ConfigurationManager.get()
@@ -47,6 +120,34 @@ class STT(object):
     def execute(self, audio, language=None):
         pass
 
+    def stream(self, sample_rate, sample_width, language=None):
+        """ STTStream to hand audio to while it is recorded """
+        return STTStream(self, sample_rate, sample_width, language)
+
+
+class StreamingSTT(STT):
+    """
+    STT that receives audio chunk by chunk while the user is speaking, by
+    the end of the utterance most of it is already processed
+    """
+    __metaclass__ = ABCMeta
+    streaming = True
+
+    def execute(self, audio, language=None):
+        return self.stream_audio(iter([audio.frame_data]), audio.sample_rate,
+                                 audio.sample_width, language)
+
+    def stream(self, sample_rate, sample_width, language=None):
+        return ThreadedSTTStream(self, sample_rate, sample_width, language)
+
+    @abstractmethod
+    def stream_audio(self, chunks, sample_rate, sample_width, language=None):
+        """
+        Transcribe the audio in chunks, an iterator that blocks until the
+        next chunk is recorded and ends with the utterance
+        """
+        pass
+
 
 class TokenSTT(STT):
     __metaclass__ = ABCMeta
@@ -17,12 +17,12 @@
 
 
 import unittest
-from Queue import Queue
 
 import speech_recognition
 from os.path import dirname, join
 from speech_recognition import WavFile, AudioData
 
+from mycroft.client.speech.audio_queue import AudioQueue
 from mycroft.client.speech.listener import AudioConsumer, RecognizerLoop
 from mycroft.client.speech.local_recognizer import LocalRecognizer
 from mycroft.stt import GoogleSTT
@@ -51,7 +51,7 @@ class AudioConsumerTest(unittest.TestCase):
 
     def setUp(self):
         self.loop = RecognizerLoop()
-        self.queue = Queue()
+        self.queue = AudioQueue()
         self.recognizer = MockRecognizer()
 
         self.consumer = AudioConsumer(
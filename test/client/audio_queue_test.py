@@ -0,0 +1,76 @@
+import time
+import unittest
+from threading import Thread
+
+from mycroft.client.speech.audio_queue import AudioQueue
+
+__author__ = 'jarbas'
+
+
+class Audio(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class Stream(object):
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class AudioQueueTest(unittest.TestCase):
+    def test_in_order(self):
+        queue = AudioQueue()
+        queue.put(Audio("a"))
+        queue.put(Audio("b"))
+        self.assertEquals(queue.get().audio.name, "a")
+        self.assertEquals(queue.get().audio.name, "b")
+
+    def test_full_drops_oldest(self):
+        queue = AudioQueue(maxsize=2)
+        audio = Audio("a")
+        audio.stt_stream = Stream()
+        for phrase in [audio, Audio("b"), Audio("c")]:
+            queue.put(phrase)
+        self.assertEquals(len(queue), 2)
+        self.assertEquals(queue.dropped, 1)
+        self.assertTrue(audio.stt_stream.cancelled)
+        self.assertEquals(queue.get().audio.name, "b")
+
+    def test_stale_dropped(self):
+        queue = AudioQueue(max_age=0.05)
+        queue.put(Audio("old"))
+        time.sleep(0.1)
+        queue.put(Audio("new"))
+        phrase = queue.get()
+        self.assertEquals(phrase.audio.name, "new")
+        self.assertEquals(queue.dropped, 1)
+        # the dropped phrase does not hold the new one back
+        queue.wait_turn(phrase)
+
+    def test_workers_finish_in_order(self):
+        queue = AudioQueue(maxsize=10)
+        emitted = []
+        # the first phrase takes longest to transcribe
+        stt_time = {"a": 0.2, "b": 0.1, "c": 0.0}
+
+        def work():
+            phrase = queue.get()
+            time.sleep(stt_time[phrase.audio.name])
+            queue.wait_turn(phrase)
+            emitted.append(phrase.audio.name)
+            queue.finish(phrase)
+        workers = [Thread(target=work) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        start = time.time()
+        for name in "abc":
+            queue.put(Audio(name))
+        for worker in workers:
+            worker.join(5)
+        elapsed = time.time() - start
+        self.assertEquals(emitted, ["a", "b", "c"])
+        # transcribed at the same time, not one after the other
+        self.assertTrue(elapsed < 0.3, elapsed)
@@ -0,0 +1,47 @@
+import unittest
+
+from pyee import EventEmitter
+
+from mycroft.client.speech.mic import ResponsiveRecognizer
+from test.client.dynamic_energy_test import MockSource
+
+__author__ = 'jarbas'
+
+
+class MockSTTStream(object):
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class MockSTT(object):
+    def __init__(self):
+        self.streams = []
+
+    def stream(self, sample_rate, sample_width):
+        self.streams.append(MockSTTStream())
+        return self.streams[-1]
+
+
+class ListenTest(unittest.TestCase):
+    def setUp(self):
+        self.recognizer = ResponsiveRecognizer(None)
+        self.recognizer.wait_until_wake_word = lambda *args: None
+        self.stt = MockSTT()
+
+    def test_stream_cancelled_on_error(self):
+        def record_phrase(source, sec_per_buffer, stream):
+            raise IOError("device unavailable")
+
+        self.recognizer.record_phrase = record_phrase
+        self.assertRaises(IOError, self.recognizer.listen, MockSource(),
+                          EventEmitter(), self.stt)
+        self.assertTrue(self.stt.streams[0].cancelled)
+
+    def test_stream_returned(self):
+        self.recognizer.record_phrase = lambda *args: b"\x00\x00" * 100
+        audio = self.recognizer.listen(MockSource(), EventEmitter(), self.stt)
+        self.assertFalse(self.stt.streams[0].cancelled)
+        self.assertEquals(audio.stt_stream, self.stt.streams[0])
@@ -4,6 +4,7 @@ import os
 from speech_recognition import WavFile
 
 from mycroft.client.speech.listener import RecognizerLoop
+from mycroft.client.speech.local_recognizer import LocalRecognizer
 
 __author__ = 'seanfitz'
 
@@ -30,3 +31,33 @@ class LocalRecognizerTest(unittest.TestCase):
         with source as audio:
             hyp = self.recognizer.transcribe(audio.stream.read())
             assert self.recognizer.key_phrase in hyp.hypstr.lower()
+
+
+class LocalRecognizerStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.recognizer = LocalRecognizer("hey mycroft",
+                                          "HH EY . M AY K R AO F T", 1e-90,
+                                          16000, "en-us")
+        source = WavFile(os.path.join(DATA_DIR, "weather_mycroft.wav"))
+        with source as audio:
+            self.byte_data = audio.stream.read()
+
+    def stream(self, chunk_size=2048):
+        self.recognizer.start_stream()
+        try:
+            for i in range(0, len(self.byte_data), chunk_size):
+                if self.recognizer.stream(self.byte_data[i:i + chunk_size]):
+                    return True
+        finally:
+            self.recognizer.end_stream()
+        return False
+
+    def testStreaming(self):
+        assert self.stream()
+        # a new stream starts from scratch
+        assert self.stream()
+
+    def testRestartedStream(self):
+        # restart on every chunk, the overlap still holds the key phrase
+        self.recognizer.stream_restart = 1
+        assert self.stream()
@@ -0,0 +1,33 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mycroft.client.speech.mic_level import MicLevel
+
+__author__ = 'jarbas'
+
+
+class MicLevelTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "mic_level")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shared(self):
+        reader = MicLevel(self.path)
+        self.assertEquals(reader.read(), None)
+        writer = MicLevel(self.path)
+        writer.publish(42, 1.5)
+        self.assertEquals(reader.read(), (42, 1.5))
+        writer.publish(7, 2.5)
+        self.assertEquals(reader.read(), (7, 2.5))
+
+    def test_replaces_old_file(self):
+        with open(self.path, 'w') as f:
+            f.write("Energy:  cur=4 thresh=1.5 and some more text")
+        MicLevel(self.path).publish(4, 1.5)
+        self.assertEquals(os.path.getsize(self.path), MicLevel.FORMAT.size)
+        self.assertEquals(MicLevel(self.path).read(), (4, 1.5))
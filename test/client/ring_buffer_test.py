@@ -0,0 +1,47 @@
+import unittest
+
+from mycroft.client.speech.ring_buffer import RingBuffer
+
+__author__ = 'jarbas'
+
+
+class RingBufferTest(unittest.TestCase):
+    def test_fills_up(self):
+        ring = RingBuffer(8)
+        ring.append("abc")
+        self.assertEquals(ring.get(), "abc")
+        ring.append("def")
+        self.assertEquals(ring.get(), "abcdef")
+        self.assertEquals(len(ring), 6)
+
+    def test_keeps_newest(self):
+        ring = RingBuffer(8)
+        window = ""
+        for chunk in ["abc", "defg", "hi", "jklmn", "o", "pqrstuv"]:
+            ring.append(chunk)
+            window = (window + chunk)[-8:]
+            self.assertEquals(ring.get(), window)
+
+    def test_chunk_larger_than_window(self):
+        ring = RingBuffer(4)
+        ring.append("ab")
+        ring.append("cdefgh")
+        self.assertEquals(ring.get(), "efgh")
+
+    def test_view_is_contiguous_buffer(self):
+        ring = RingBuffer(4)
+        ring.append("abcdef")
+        view = ring.view()
+        self.assertEquals(view + "!", "cdef!")
+        ring.append("g")
+        # the view shares memory with the ring, "c" was overwritten
+        self.assertEquals(str(view), "gdef")
+        self.assertEquals(ring.get(), "defg")
+
+    def test_clear(self):
+        ring = RingBuffer(4)
+        ring.append("abc")
+        ring.clear()
+        self.assertEquals(ring.get(), "")
+        ring.append("de")
+        self.assertEquals(ring.get(), "de")
@@ -0,0 +1,62 @@
+import math
+import struct
+import unittest
+
+from mycroft.client.speech.vad import VoiceActivityDetector
+
+__author__ = 'jarbas'
+
+RATE = 16000
+THRESHOLD = 1000
+
+
+def tone(seconds, amplitude, frequency=200):
+    samples = int(seconds * RATE)
+    return struct.pack("<%dh" % samples, *[
+        int(amplitude * math.sin(2 * math.pi * frequency * i / RATE))
+        for i in range(samples)])
+
+
+def silence(seconds):
+    return "\0\0" * int(seconds * RATE)
+
+
+class VoiceActivityDetectorTest(unittest.TestCase):
+    def setUp(self):
+        self.vad = VoiceActivityDetector(RATE, 2, hangover=0.3,
+                                         min_speech=0.1)
+
+    def feed(self, audio, chunk=1024):
+        for start in range(0, len(audio), chunk):
+            self.vad.update(audio[start:start + chunk], THRESHOLD)
+
+    def test_phrase(self):
+        self.feed(silence(0.5))
+        self.assertFalse(self.vad.heard_speech)
+        self.feed(tone(0.5, 4000))
+        self.assertTrue(self.vad.heard_speech)
+        self.assertFalse(self.vad.silent)
+        # a pause between words shorter than the hangover
+        self.feed(silence(0.2))
+        self.assertFalse(self.vad.silent)
+        self.feed(tone(0.2, 4000) + silence(0.3))
+        self.assertTrue(self.vad.silent)
+
+    def test_frames_across_chunks(self):
+        # chunks of 100 bytes, frames of 320
+        self.feed(tone(0.05, 4000), chunk=100)
+        self.assertEquals(self.vad.speech_frames, 5)
+        self.assertEquals(self.vad.remainder, "")
+
+    def test_unvoiced(self):
+        # quieter than the threshold but crossing zero like a fricative
+        self.feed(tone(0.2, 1200, frequency=4000))
+        self.assertTrue(self.vad.heard_speech)
+        self.vad.reset()
+        self.feed(tone(0.2, 1200))
+        self.assertFalse(self.vad.heard_speech)
+
+    def test_clicks_are_silence(self):
+        click = tone(0.01, 4000) + silence(0.05)
+        self.feed(tone(0.2, 4000) + click * 6)
+        self.assertTrue(self.vad.silent)
@@ -0,0 +1,59 @@
+import time
+import unittest
+from threading import Event, Lock
+
+from concurrent.futures import ThreadPoolExecutor
+
+from mycroft.messagebus.client.dispatch import Dispatcher
+
+__author__ = 'jarbas'
+
+
+class DispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_ordered(self):
+        dispatcher = Dispatcher(self.executor, 1)
+        handled = []
+
+        def handle(i):
+            # earlier calls take longer, only ordering keeps them in place
+            time.sleep(0.001 * (10 - i))
+            handled.append(i)
+        for i in range(10):
+            dispatcher.dispatch(handle, i)
+        self.executor.shutdown()
+        self.assertEquals(handled, range(10))
+
+    def test_limit(self):
+        dispatcher = Dispatcher(self.executor, 2)
+        lock = Lock()
+        running = [0]
+        most = [0]
+
+        def handle():
+            with lock:
+                running[0] += 1
+                most[0] = max(most[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+        for i in range(8):
+            dispatcher.dispatch(handle)
+        self.executor.shutdown()
+        self.assertEquals(most[0], 2)
+        self.assertEquals(len(dispatcher), 0)
+
+    def test_errors_do_not_stop_the_queue(self):
+        dispatcher = Dispatcher(self.executor, 1)
+        done = Event()
+
+        def fail():
+            raise ValueError("handler failed")
+        dispatcher.dispatch(fail)
+        dispatcher.dispatch(done.set)
+        self.assertTrue(done.wait(5))
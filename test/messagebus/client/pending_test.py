@@ -0,0 +1,50 @@
+import time
+import unittest
+from threading import Thread
+
+from mycroft.messagebus.client.pending import PendingRequests
+
+__author__ = 'jarbas'
+
+
+class PendingRequestsTest(unittest.TestCase):
+    def setUp(self):
+        self.pending = PendingRequests()
+
+    def test_resolved_before_wait(self):
+        request_id = self.pending.new()
+        self.assertTrue(self.pending.resolve(request_id, "answer"))
+        self.assertEquals(self.pending.wait(request_id, 1), "answer")
+        self.assertEquals(len(self.pending), 0)
+
+    def test_resolved_by_other_thread(self):
+        request_id = self.pending.new()
+        Thread(target=self.pending.resolve,
+               args=(request_id, "answer")).start()
+        self.assertEquals(self.pending.wait(request_id, 5), "answer")
+
+    def test_timeout(self):
+        request_id = self.pending.new()
+        start = time.time()
+        self.assertEquals(self.pending.wait(request_id, 0.05, {}), {})
+        self.assertTrue(time.time() - start < 1)
+        # late replies are dropped
+        self.assertFalse(self.pending.resolve(request_id, "late"))
+        self.assertEquals(len(self.pending), 0)
+
+    def test_replies_matched_by_id(self):
+        first = self.pending.new()
+        second = self.pending.new()
+        self.pending.resolve(second, 2)
+        self.pending.resolve(first, 1)
+        self.assertEquals(self.pending.wait(first, 1), 1)
+        self.assertEquals(self.pending.wait(second, 1), 2)
+
+    def test_reply_without_id_goes_to_oldest(self):
+        first = self.pending.new()
+        second = self.pending.new()
+        self.pending.resolve(None, 1)
+        self.assertEquals(self.pending.wait(first, 1), 1)
+        self.assertEquals(len(self.pending), 1)
+        self.pending.cancel(second)
+        self.assertFalse(self.pending.resolve(None, 2))
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+from threading import Event, Thread
+
+import tornado.ioloop as ioloop
+import tornado.web as web
+from websocket import WebSocketApp
+
+from mycroft.messagebus.client.unix import UnixWebSocketApp
+from mycroft.messagebus.client.ws import WebsocketClient
+from mycroft.messagebus.message import Message
+from mycroft.messagebus.service.main import listen_unix
+from mycroft.messagebus.service.ws import WebsocketEventHandler
+
+__author__ = 'jarbas'
+
+
+class UnixTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "bus.sock")
+        self.loop = ioloop.IOLoop()
+        started = Event()
+
+        def serve():
+            self.loop.make_current()
+            application = web.Application([("/core", WebsocketEventHandler)])
+            self.server = listen_unix(application, self.path)
+            started.set()
+            self.loop.start()
+        self.thread = Thread(target=serve)
+        self.thread.start()
+        started.wait(5)
+
+    def tearDown(self):
+        self.loop.add_callback(self.server.stop)
+        self.loop.add_callback(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close(all_fds=True)
+        shutil.rmtree(self.directory)
+
+    def test_falls_back_to_tcp(self):
+        ws = WebsocketClient(transport="unix",
+                             unix_socket=os.path.join(self.directory, "none"))
+        self.assertTrue(isinstance(ws.client, WebSocketApp))
+        self.assertFalse(isinstance(ws.client, UnixWebSocketApp))
+
+    def test_round_trip(self):
+        ws = WebsocketClient(transport="unix", unix_socket=self.path)
+        self.assertTrue(isinstance(ws.client, UnixWebSocketApp))
+        received = []
+        done = Event()
+
+        def handle(message):
+            received.append(message.data)
+            done.set()
+        ws.on("test", handle)
+        ws.once("open", lambda: ws.emit(Message("test", {"n": 1})))
+        client = Thread(target=ws.run_forever)
+        client.start()
+        done.wait(5)
+        ws.close()
+        client.join(5)
+        self.assertEquals(received, [{"n": 1}])
@@ -0,0 +1,172 @@
+import inspect
+import json
+import unittest
+
+from mycroft.messagebus.client.ws import WebsocketClient
+from mycroft.messagebus.message import Message
+
+__author__ = 'jarbas'
+
+
+class FakeSocket(object):
+    connected = True
+
+
+class FakeApp(object):
+    def __init__(self):
+        self.sock = FakeSocket()
+        self.sent = []
+
+    def send(self, data, opcode=None):
+        self.sent.append(Message.deserialize(data).__dict__)
+
+
+def handler(message):
+    pass
+
+
+def other_handler(message):
+    pass
+
+
+class SubscriptionTest(unittest.TestCase):
+    def setUp(self):
+        self.ws = WebsocketClient(format="json", compress=0)
+        self.ws.client = FakeApp()
+
+    def sent(self):
+        return [(message["type"], message["data"])
+                for message in self.ws.client.sent]
+
+    def test_handlers_subscribe(self):
+        self.ws.on("speak", handler)
+        self.ws.on("speak", handler)
+        self.ws.once("open", handler)
+        self.assertEquals(self.sent(), [("mycroft.bus.subscribe",
+                                         {"types": ["speak"]})])
+
+    def test_remove_unsubscribes(self):
+        self.ws.on("speak", handler)
+        self.ws.on("speak", other_handler)
+        self.ws.remove("speak", handler)
+        self.assertEquals(len(self.sent()), 1)
+        self.ws.remove("speak", other_handler)
+        self.assertEquals(self.sent()[-1], ("mycroft.bus.unsubscribe",
+                                            {"types": ["speak"]}))
+
+    def test_resubscribe_on_connect(self):
+        self.ws.on("speak", lambda message: None)
+        self.ws.subscribe("*")
+        self.ws.client.sent = []
+        self.ws.on_open(None)
+        message_type, data = self.sent()[0]
+        self.assertEquals(message_type, "mycroft.bus.subscribe")
+        self.assertEquals(sorted(data["types"]), ["*", "speak"])
+
+    def test_everything_until_subscribed(self):
+        self.ws.on_open(None)
+        self.ws.once("open", lambda: None)
+        self.assertEquals(self.sent(), [])
+
+    def test_raw_messages_subscribe_to_all(self):
+        received = []
+        self.ws.on("message", received.append)
+        self.assertEquals(self.sent(), [("mycroft.bus.subscribe",
+                                         {"types": ["*"]})])
+        self.ws.remove("message", received.append)
+        self.assertEquals(self.sent()[-1], ("mycroft.bus.unsubscribe",
+                                            {"types": ["*"]}))
+
+    def test_handlers_still_called(self):
+        received = []
+        self.ws.on("speak", received.append)
+        self.ws.emitter.emit("speak", Message("speak", {}))
+        self.assertEquals(len(received), 1)
+
+
+class FormatTest(unittest.TestCase):
+    def setUp(self):
+        self.ws = WebsocketClient(format="msgpack", compress=1024)
+        self.ws.client = FakeApp()
+
+    def test_negotiated(self):
+        self.ws.on_open(None)
+        message = self.ws.client.sent[0]
+        self.assertEquals(message["type"], "mycroft.bus.format")
+        self.assertEquals(message["data"], {"formats": ["msgpack", "json"],
+                                            "compress": 1024})
+        self.assertEquals(self.ws.format, ("json", 0))
+        self.ws.on_message(None, Message("mycroft.bus.format",
+                                         {"format": "msgpack",
+                                          "compress": 1024}).serialize())
+        self.assertEquals(self.ws.format, ("msgpack", 1024))
+
+    def test_binary_messages(self):
+        received = []
+        self.ws.on("message", received.append)
+        self.ws.on_message(None, Message("a", {"i": 1}).serialize("msgpack"))
+        self.assertEquals(json.loads(received[0])["data"], {"i": 1})
+
+    def test_json_only(self):
+        ws = WebsocketClient(format="json", compress=0)
+        ws.client = FakeApp()
+        ws.on_open(None)
+        self.assertEquals(ws.client.sent, [])
+
+
+class FlakyApp(FakeApp):
+    """ a connection that drops as soon as it is made """
+
+    def __init__(self, ws, stack):
+        super(FlakyApp, self).__init__()
+        self.ws = ws
+        self.stack = stack
+
+    def run_forever(self):
+        self.stack.append(len(inspect.stack()))
+        if len(self.stack) == 5:
+            self.ws.close()
+
+    def close(self):
+        pass
+
+
+class ReconnectTest(unittest.TestCase):
+    def test_not_recursive(self):
+        ws = WebsocketClient()
+        stack = []
+        ws.retry = ws.MIN_RETRY = 0
+        ws.create_client = lambda: FlakyApp(ws, stack)
+        ws.client = ws.create_client()
+        ws.run_forever()
+        self.assertEquals(len(stack), 5)
+        self.assertEquals(len(set(stack)), 1)
+
+    def test_backoff(self):
+        ws = WebsocketClient()
+        ws.MIN_RETRY = 0.001
+        ws.retry = 0.001
+        stack = []
+        ws.create_client = lambda: FlakyApp(ws, stack)
+        ws.client = ws.create_client()
+        ws.run_forever()
+        self.assertEquals(ws.retry, 0.016)
+        ws.on_open(None)
+        self.assertEquals(ws.retry, 0.001)
+
+
+class ConcurrencyTest(unittest.TestCase):
+    def test_limited_types_in_order(self):
+        ws = WebsocketClient(concurrency={"speak": 1})
+        handled = []
+        ws.on("speak", lambda message: handled.append(message.data["i"]))
+        for i in range(20):
+            ws.dispatch(Message("speak", {"i": i}))
+        ws.executor.shutdown()
+        self.assertEquals(handled, range(20))
+
+    def test_unlimited(self):
+        ws = WebsocketClient(concurrency={})
+        ws.set_concurrency("speak", 1)
+        ws.set_concurrency("speak", None)
+        self.assertEquals(ws.dispatchers, {})
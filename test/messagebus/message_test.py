@@ -0,0 +1,46 @@
+import json
+import unittest
+
+from mycroft.messagebus.message import Message, is_binary
+
+__author__ = 'jarbas'
+
+
+class SerializationTest(unittest.TestCase):
+    def setUp(self):
+        self.message = Message("LILACS_result",
+                               {"data": {"dbpedia": {"dog": {
+                                   "abstract": "a domesticated canid " * 100,
+                                   "links": ["http://dbpedia.org/dog"]}}},
+                                "request_id": "1"},
+                               {"target": "skills"})
+
+    def check(self, serialized):
+        message = Message.deserialize(serialized)
+        self.assertEquals(message.type, self.message.type)
+        self.assertEquals(message.data, self.message.data)
+        self.assertEquals(message.context, self.message.context)
+
+    def test_json(self):
+        serialized = self.message.serialize()
+        self.assertFalse(is_binary(serialized))
+        self.assertEquals(json.loads(serialized)["type"], "LILACS_result")
+        self.check(serialized)
+        self.check(unicode(serialized))
+
+    def test_msgpack(self):
+        serialized = self.message.serialize("msgpack")
+        self.assertTrue(is_binary(serialized))
+        self.check(serialized)
+
+    def test_compressed(self):
+        for format in ["json", "msgpack"]:
+            serialized = self.message.serialize(format, compress=1024)
+            self.assertTrue(is_binary(serialized))
+            self.assertTrue(len(serialized) < 500)
+            self.check(serialized)
+
+    def test_small_messages_not_compressed(self):
+        message = Message("speak", {"utterance": "hello"})
+        self.assertEquals(message.serialize("json", compress=1024),
+                          message.serialize())
@@ -0,0 +1,194 @@
+import json
+import unittest
+
+from tornado import gen
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application
+from tornado.websocket import websocket_connect
+
+from mycroft.messagebus.service import ws
+from mycroft.messagebus.message import Message
+from mycroft.messagebus.service.ws import WebsocketEventHandler
+
+__author__ = 'jarbas'
+
+
+class FakeStream(object):
+    def __init__(self):
+        self.full = False
+        self.drained = None
+
+    def writing(self):
+        return self.full
+
+    def write(self, data, callback=None):
+        self.drained = callback
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.stream = FakeStream()
+        self.written = []
+
+    def write_message(self, message, binary=False):
+        self.written.append(message)
+
+
+def handler(**options):
+    # no tornado request needed to exercise the queue
+    client = WebsocketEventHandler.__new__(WebsocketEventHandler)
+    client.initialize(**options)
+    client.ws_connection = FakeConnection()
+    client.closed = False
+
+    def close(*args):
+        client.closed = True
+    client.close = close
+    return client
+
+
+class OutboundQueueTest(unittest.TestCase):
+    def test_written_while_socket_takes_it(self):
+        client = handler()
+        client.send("a")
+        client.send("b")
+        self.assertEquals(client.ws_connection.written, ["a", "b"])
+        self.assertEquals(len(client.queue), 0)
+
+    def test_queued_until_drained(self):
+        client = handler()
+        stream = client.ws_connection.stream
+        stream.full = True
+        client.send("a")
+        client.send("b")
+        self.assertEquals(client.ws_connection.written, [])
+        self.assertEquals(list(client.queue), ["a", "b"])
+        stream.full = False
+        stream.drained()
+        self.assertEquals(client.ws_connection.written, ["a", "b"])
+        self.assertEquals(client.queue_bytes, 0)
+
+    def test_drop_oldest(self):
+        client = handler(max_queue_size=3)
+        client.ws_connection.stream.full = True
+        for message in "abcde":
+            client.send(message)
+        self.assertEquals(list(client.queue), ["c", "d", "e"])
+        self.assertEquals(client.dropped, 2)
+        self.assertFalse(client.closed)
+
+    def test_max_queue_bytes(self):
+        client = handler(max_queue_bytes=10)
+        client.ws_connection.stream.full = True
+        for message in ["aaaa", "bbbb", "cccc"]:
+            client.send(message)
+        self.assertEquals(list(client.queue), ["bbbb", "cccc"])
+
+    def test_disconnect(self):
+        client = handler(max_queue_size=3, overflow="disconnect")
+        ws.client_connections.append(client)
+        client.ws_connection.stream.full = True
+        for message in "abcd":
+            client.send(message)
+        self.assertTrue(client.closed)
+        self.assertFalse(client in ws.client_connections)
+        self.assertEquals(len(client.queue), 0)
+
+
+class RoutingTest(AsyncHTTPTestCase):
+    def setUp(self):
+        super(RoutingTest, self).setUp()
+        # connections of other tests are gone with their io loop
+        del ws.client_connections[:]
+
+    def get_app(self):
+        return Application([("/core", WebsocketEventHandler)])
+
+    @gen.coroutine
+    def connect(self):
+        url = "ws://localhost:" + str(self.get_http_port()) + "/core"
+        connection = yield websocket_connect(url, io_loop=self.io_loop)
+        message = yield connection.read_message()
+        self.assertEquals(json.loads(message)["type"], "connected")
+        raise gen.Return(connection)
+
+    @gen_test
+    def test_every_client_gets_every_message(self):
+        first = yield self.connect()
+        second = yield self.connect()
+        for i in range(3):
+            first.write_message(json.dumps({"type": "test", "data": {"i": i}}))
+        for connection in [first, second]:
+            for i in range(3):
+                message = yield connection.read_message()
+                self.assertEquals(json.loads(message)["data"], {"i": i})
+        first.close()
+        second.close()
+
+    @gen.coroutine
+    def sync(self, connection):
+        # messages of a connection are handled in order, once its own
+        # message comes back the ones before it were handled
+        connection.write_message(json.dumps({"type": "sync", "data": {}}))
+        message = yield connection.read_message()
+        self.assertEquals(Message.deserialize(message).type, "sync")
+
+    @gen_test
+    def test_subscriptions(self):
+        publisher = yield self.connect()
+        subscriber = yield self.connect()
+        subscriber.write_message(json.dumps({"type": "mycroft.bus.subscribe",
+                                             "data": {"types": ["b",
+                                                                "sync"]}}))
+        yield self.sync(subscriber)
+        yield publisher.read_message()
+        for message_type in ["a", "b", "a"]:
+            publisher.write_message(json.dumps({"type": message_type,
+                                                "data": {}}))
+        # publisher never subscribed, it gets everything
+        for message_type in ["a", "b", "a"]:
+            message = yield publisher.read_message()
+            self.assertEquals(json.loads(message)["type"], message_type)
+        message = yield subscriber.read_message()
+        self.assertEquals(json.loads(message)["type"], "b")
+
+        subscriber.write_message(json.dumps(
+            {"type": "mycroft.bus.unsubscribe", "data": {"types": ["b"]}}))
+        subscriber.write_message(json.dumps({"type": "mycroft.bus.subscribe",
+                                             "data": {"types": ["c"]}}))
+        yield self.sync(subscriber)
+        for message_type in ["b", "c"]:
+            publisher.write_message(json.dumps({"type": message_type,
+                                                "data": {}}))
+        message = yield subscriber.read_message()
+        self.assertEquals(json.loads(message)["type"], "c")
+        publisher.close()
+        subscriber.close()
+
+    @gen_test
+    def test_format(self):
+        publisher = yield self.connect()
+        subscriber = yield self.connect()
+        subscriber.write_message(json.dumps(
+            {"type": "mycroft.bus.format",
+             "data": {"formats": ["msgpack", "json"], "compress": 0}}))
+        message = yield subscriber.read_message()
+        self.assertEquals(json.loads(message)["data"]["format"], "msgpack")
+        yield self.sync(subscriber)
+        yield publisher.read_message()
+        # json from the publisher is msgpack for the subscriber
+        publisher.write_message(json.dumps({"type": "a", "data": {"i": 1}}))
+        message = yield subscriber.read_message()
+        self.assertEquals(ord(message[0]), 0x02)
+        self.assertEquals(Message.deserialize(message).data, {"i": 1})
+        # and the other way around
+        subscriber.write_message(Message("b", {"i": 2}).serialize("msgpack"),
+                                 binary=True)
+        message = yield publisher.read_message()
+        # the publisher gets its own json as it was sent
+        self.assertEquals(json.loads(message), {"type": "a",
+                                                "data": {"i": 1}})
+        message = yield publisher.read_message()
+        self.assertEquals(json.loads(message)["data"], {"i": 2})
+        publisher.close()
+        subscriber.close()
@@ -0,0 +1,172 @@
+import unittest
+
+from mycroft.skills.LILACS_core import concept
+from mycroft.skills.LILACS_core.concept import ConceptConnector, \
+    ConceptNode, OrderedSet, EMPTY_WEIGHTS, intern_name
+
+__author__ = 'jarbas'
+
+
+class OrderedSetTest(unittest.TestCase):
+    def test_keeps_insertion_order(self):
+        s = OrderedSet(["b", "a", "c", "a"])
+        self.assertEquals(list(s), ["b", "a", "c"])
+        self.assertEquals(len(s), 3)
+
+    def test_discard(self):
+        s = OrderedSet(["a", "b", "c", "d"])
+        s.discard("b")
+        s.discard("missing")
+        self.assertFalse("b" in s)
+        self.assertEquals(list(s), ["a", "c", "d"])
+        s.discard("a")
+        s.discard("c")
+        s.add("a")
+        self.assertEquals(list(s), ["d", "a"])
+
+    def test_large_set_is_indexed(self):
+        items = [str(i) for i in range(OrderedSet.SMALL * 4)]
+        s = OrderedSet(items)
+        for item in items[::2]:
+            s.discard(item)
+        self.assertEquals(list(s), items[1::2])
+        self.assertTrue(items[1] in s)
+        self.assertFalse(items[0] in s)
+
+
+class InternNameTest(unittest.TestCase):
+    def test_bounded(self):
+        limit = concept.MAX_NAMES
+        concept.MAX_NAMES = 10
+        self.addCleanup(setattr, concept, "MAX_NAMES", limit)
+        name = "".join(["shared", "name"])
+        self.assertTrue(intern_name("".join(["shared", "name"])) is
+                        intern_name(name))
+        for i in range(100):
+            intern_name("name_" + str(i))
+        self.assertEquals(len(concept._names), 10)
+
+
+class ConceptNodeTest(unittest.TestCase):
+    def test_stub_node_shares_empty_containers(self):
+        node = ConceptNode("stub")
+        self.assertTrue(node.get_parents() is EMPTY_WEIGHTS)
+        self.assertEquals(node.get_synonims(), [])
+        self.assertRaises(TypeError, node.get_parents().setdefault, "a", 1)
+
+    def test_connections_drop_back_to_sentinel(self):
+        node = ConceptNode("dog", parent_concepts={"animal": 1})
+        node.remove_parent("animal")
+        self.assertTrue(node.get_parents() is EMPTY_WEIGHTS)
+
+    def test_parents_keep_insertion_order(self):
+        names = ["p" + str(i) for i in range(20)]
+        node = ConceptNode("node")
+        for name in reversed(names):
+            node.add_parent(name, gen=len(name))
+        node.remove_parent("p7")
+        expected = [name for name in reversed(names) if name != "p7"]
+        self.assertEquals(list(node.get_parents()), expected)
+        self.assertEquals(node.get_parents().keys(), expected)
+        self.assertEquals([name for name, gen in node.get_parents().items()],
+                          expected)
+        self.assertEquals(node.get_parents()["p12"], 3)
+
+    def test_data_is_not_shared(self):
+        first = ConceptNode("first", data={})
+        second = ConceptNode("second", data={})
+        first.add_data("abstract", "text")
+        self.assertEquals(second.get_data(), {})
+
+
+class ConceptConnectorTest(unittest.TestCase):
+    def setUp(self):
+        self.connector = ConceptConnector()
+
+    def test_create_concept_links_both_sides(self):
+        self.connector.create_concept("human", parent_concepts={"animal": 2},
+                                      child_concepts={"joe": 1},
+                                      synonims=["person"], antonims=[])
+        self.assertEquals(self.connector.get_parents("human"), {"animal": 2})
+        self.assertEquals(self.connector.get_childs("animal"), {"human": 2})
+        self.assertEquals(self.connector.get_parents("joe"), {"human": 1})
+        self.assertEquals(self.connector.get_synonims("person"), ["human"])
+
+    def test_merge_does_not_duplicate(self):
+        self.connector.create_concept("human", parent_concepts={"animal": 2},
+                                      child_concepts={}, synonims=["person"],
+                                      antonims=[])
+        self.connector.create_concept("human", parent_concepts={"mammal": 1},
+                                      child_concepts={}, synonims=["person"],
+                                      antonims=[])
+        self.assertEquals(sorted(self.connector.get_parents("human")),
+                          ["animal", "mammal"])
+        self.assertEquals(self.connector.get_synonims("human"), ["person"])
+
+    def test_reverse_index(self):
+        self.connector.add_spawn("cow", "milk")
+        self.connector.add_part("car", "wheel")
+        self.connector.add_consumes("car", "fuel")
+        self.assertEquals(self.connector.get_spawned_by("milk"), ["cow"])
+        self.assertEquals(self.connector.get_part_off("wheel"), ["car"])
+        self.assertEquals(self.connector.get_consumed_by("fuel"), ["car"])
+        self.connector.disconnect("car", "parts", "wheel")
+        self.assertEquals(self.connector.get_parts("car"), [])
+        self.assertEquals(self.connector.get_part_off("wheel"), [])
+
+    def test_parent_cannot_be_child(self):
+        self.connector.add_child("animal", "dog")
+        self.connector.add_parent("animal", "dog")
+        self.assertEquals(self.connector.get_parents("animal"), {})
+
+
+class AncestorIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.connector = ConceptConnector()
+        self.connector.create_concept("dog", parent_concepts={"mammal": 1},
+                                      synonims=["canine"])
+        self.connector.create_concept("canine", parent_concepts={"pet": 1})
+        self.connector.create_concept("mammal",
+                                      parent_concepts={"animal": 1})
+
+    def test_ancestors(self):
+        self.assertEquals(self.connector.ancestors.ancestors("dog"),
+                          frozenset(["mammal", "animal", "canine", "pet"]))
+        self.assertTrue(self.connector.is_ancestor("dog", "dog"))
+        self.assertFalse(self.connector.is_ancestor("animal", "dog"))
+        self.assertFalse(self.connector.is_ancestor("unknown", "animal"))
+
+    def test_invalidated_on_new_parent(self):
+        self.assertFalse(self.connector.is_ancestor("dog", "living being"))
+        self.connector.add_parent("animal", "living being")
+        self.assertTrue(self.connector.is_ancestor("dog", "living being"))
+        self.connector.create_concept("living being",
+                                      parent_concepts={"thing": 1})
+        self.assertTrue(self.connector.is_ancestor("mammal", "thing"))
+
+    def test_invalidated_on_disconnect(self):
+        self.assertTrue(self.connector.is_ancestor("dog", "animal"))
+        self.connector.disconnect("mammal", "parents", "animal")
+        self.assertFalse(self.connector.is_ancestor("dog", "animal"))
+
+    def test_cycles(self):
+        self.connector.add_parent("animal", "thing")
+        self.connector.add_parent("thing", "dog")
+        self.assertTrue(self.connector.is_ancestor("thing", "pet"))
+        self.assertTrue(self.connector.is_ancestor("mammal", "mammal"))
+
+    def test_closures_bounded(self):
+        self.connector.ancestors.MAX_CLOSURES = 2
+        for name in ["dog", "canine", "mammal", "animal"]:
+            self.connector.ancestors.ancestors(name)
+        self.assertEquals(len(self.connector.ancestors._closures), 2)
+        self.assertTrue(self.connector.is_ancestor("dog", "animal"))
+
+    def test_common_ancestors(self):
+        self.connector.create_concept("cat", parent_concepts={"mammal": 2,
+                                                              "pet": 1})
+        self.assertEquals(self.connector.common_ancestors("dog", "cat"),
+                          ["pet", "mammal", "animal"])
+        self.assertEquals(self.connector.common_ancestors("mammal", "cat"),
+                          ["mammal", "animal"])
+        self.assertEquals(self.connector.common_ancestors("dog", "rock"), [])
@@ -0,0 +1,222 @@
+import unittest
+
+from mycroft.skills.LILACS_core.concept import ConceptConnector
+from mycroft.skills.LILACS_core.crawler import ConceptCrawler
+from mycroft.skills.LILACS_core.questions import is_this_that
+
+__author__ = 'jarbas'
+
+
+class ShortestPathTest(unittest.TestCase):
+    def setUp(self):
+        connector = ConceptConnector()
+        # dog -> mammal -> animal -> living being
+        # dog -> pet -> animal (gen 5, weak connection)
+        connector.create_concept("dog", parent_concepts={"mammal": 1,
+                                                         "pet": 1})
+        connector.create_concept("mammal", parent_concepts={"vertebrate": 1})
+        connector.create_concept("vertebrate", parent_concepts={"animal": 1})
+        connector.create_concept("pet", parent_concepts={"animal": 5})
+        connector.create_concept("animal",
+                                 parent_concepts={"living being": 1})
+        self.crawler = ConceptCrawler(concept_connector=connector)
+
+    def test_bidirectional_path(self):
+        path = self.crawler.find_shortest_path("dog", "living being")
+        self.assertEquals(path, ["dog", "pet", "animal", "living being"])
+
+    def test_childs_direction(self):
+        path = self.crawler.find_shortest_path("animal", "dog",
+                                               direction="childs")
+        self.assertEquals(path, ["animal", "pet", "dog"])
+
+    def test_weighted_path_prefers_strong_connections(self):
+        path = self.crawler.find_shortest_path("dog", "living being",
+                                               weighted=True)
+        self.assertEquals(path, ["dog", "mammal", "vertebrate", "animal",
+                                 "living being"])
+
+    def test_depth_cap(self):
+        self.assertEquals(self.crawler.find_shortest_path(
+            "dog", "living being", max_depth=2), None)
+        self.assertEquals(self.crawler.find_shortest_path(
+            "dog", "animal", max_depth=2), ["dog", "pet", "animal"])
+        # the weak connection is the only way there in 3 connections
+        self.assertEquals(self.crawler.find_shortest_path(
+            "dog", "living being", weighted=True, max_depth=3),
+            ["dog", "pet", "animal", "living being"])
+        self.assertEquals(self.crawler.find_shortest_path(
+            "dog", "living being", weighted=True, max_depth=2), None)
+
+    def test_weighted_depth_cap_takes_fewer_connections(self):
+        connector = ConceptConnector()
+        # c -> a -> b -> t costs 3, c -> b -> t costs 6 in 2 connections
+        connector.create_concept("c", parent_concepts={"a": 1, "b": 5})
+        connector.create_concept("a", parent_concepts={"b": 1})
+        connector.create_concept("b", parent_concepts={"t": 1})
+        crawler = ConceptCrawler(concept_connector=connector)
+        self.assertEquals(crawler.find_shortest_path("c", "t", weighted=True),
+                          ["c", "a", "b", "t"])
+        self.assertEquals(crawler.find_shortest_path("c", "t", weighted=True,
+                                                     max_depth=2),
+                          ["c", "b", "t"])
+        self.assertEquals(crawler.find_shortest_path("c", "t", weighted=True,
+                                                     max_depth=1), None)
+
+    def test_no_path(self):
+        self.assertEquals(self.crawler.find_shortest_path("animal", "dog"),
+                          None)
+        self.assertFalse(self.crawler.explorer_crawl("animal", "dog"))
+
+    def test_same_node(self):
+        self.assertEquals(self.crawler.find_shortest_path("dog", "dog"),
+                          ["dog"])
+
+    def test_crawled_is_a_set(self):
+        self.crawler.mark_as_crawled("dog")
+        self.crawler.find_shortest_path("dog", "animal")
+        self.crawler.mark_as_crawled("cat")
+        self.assertTrue("cat" in self.crawler.crawled)
+        self.crawler.index_crawl("dog", "animal")
+        self.crawler.mark_as_crawled("cat")
+
+
+class IsThisThatTest(unittest.TestCase):
+    def setUp(self):
+        connector = ConceptConnector()
+        connector.create_concept("frog", parent_concepts={"amphibian": 1})
+        connector.create_concept("amphibian", parent_concepts={"animal": 1})
+        self.crawler = ConceptCrawler(concept_connector=connector)
+
+    def test_index_and_drunk_modes_agree(self):
+        for target in ["amphibian", "animal", "plant"]:
+            self.assertEquals(is_this_that("frog", target, self.crawler),
+                              is_this_that("frog", target, self.crawler,
+                                           mode="drunk"))
+        self.assertTrue(is_this_that("frog", "animal", self.crawler))
+
+
+class DrunkCrawlTest(unittest.TestCase):
+    def setUp(self):
+        connector = ConceptConnector()
+        connector.create_concept("dog", parent_concepts={"mammal": 1},
+                                 synonims=["canine"])
+        connector.create_concept("cat", parent_concepts={"mammal": 2})
+        connector.create_concept("whale", parent_concepts={"mammal": 7})
+        connector.create_concept("mammal", parent_concepts={"animal": 1})
+        connector.create_concept("canine", parent_concepts={"carnivore": 1})
+        self.crawler = ConceptCrawler(concept_connector=connector)
+
+    def test_crawls_every_child(self):
+        self.assertFalse(self.crawler.drunk_crawl("animal", "no target crawl",
+                                                  direction="childs"))
+        self.assertEquals(sorted(self.crawler.crawled),
+                          ["animal", "cat", "dog", "mammal", "whale"])
+        self.assertEquals(len(self.crawler.uncrawled), 0)
+
+    def test_follows_synonims(self):
+        self.assertTrue(self.crawler.drunk_crawl("dog", "carnivore"))
+        self.assertTrue(self.crawler.drunk_crawl("dog", "animal"))
+        self.assertFalse(self.crawler.drunk_crawl("cat", "carnivore"))
+
+    def test_weighted_choice(self):
+        # gen 7 connections weigh 0 and are only crawled from the frontier
+        for i in range(20):
+            self.crawler.drunk_crawl("mammal", "no target crawl",
+                                     direction="childs")
+            self.assertNotEquals(self.crawler.crawl_path[1], "whale")
+
+
+class CrawlBudgetTest(unittest.TestCase):
+    def setUp(self):
+        self.connector = ConceptConnector()
+        # chain of 10 concepts, concept_0 is a concept_1 is a concept_2 ...
+        for i in range(9):
+            self.connector.create_concept("concept_" + str(i),
+                                          parent_concepts={
+                                              "concept_" + str(i + 1): 1})
+        self.crawler = ConceptCrawler(concept_connector=self.connector)
+
+    def test_drunk_max_depth(self):
+        self.assertFalse(self.crawler.drunk_crawl("concept_0", "concept_9",
+                                                  max_depth=3))
+        self.assertTrue(self.crawler.depth_limited)
+        self.assertFalse(self.crawler.truncated)
+        self.assertEquals(list(self.crawler.crawled),
+                          ["concept_0", "concept_1", "concept_2",
+                           "concept_3"])
+        self.assertTrue(self.crawler.drunk_crawl("concept_0", "concept_9"))
+        self.assertFalse(self.crawler.depth_limited)
+
+    def test_crawler_depth(self):
+        crawler = ConceptCrawler(depth=2, concept_connector=self.connector)
+        self.assertFalse(crawler.drunk_crawl("concept_0", "concept_9"))
+        self.assertTrue(crawler.depth_limited)
+        # explorer crawls are only capped by an explicit max_depth
+        self.assertTrue(crawler.explorer_crawl("concept_0", "concept_9"))
+        self.assertFalse(crawler.depth_limited)
+        self.assertFalse(crawler.explorer_crawl("concept_0", "concept_9",
+                                                max_depth=2))
+        self.assertTrue(crawler.depth_limited)
+
+    def test_max_visits(self):
+        self.assertFalse(self.crawler.drunk_crawl("concept_0", "concept_9",
+                                                  max_visits=5))
+        self.assertTrue(self.crawler.truncated)
+        self.assertEquals(len(self.crawler.crawled), 5)
+        self.assertFalse(self.crawler.explorer_crawl("concept_0", "concept_9",
+                                                     max_visits=4))
+        self.assertTrue(self.crawler.truncated)
+        self.assertFalse(self.crawler.explorer_crawl("concept_0", "concept_9",
+                                                     max_visits=4,
+                                                     weighted=True))
+        self.assertTrue(self.crawler.truncated)
+        self.assertFalse(self.crawler.index_crawl("concept_0", "concept_9",
+                                                  max_visits=4))
+        self.assertTrue(self.crawler.truncated)
+        # partial closures are not cached
+        self.assertTrue(self.crawler.index_crawl("concept_0", "concept_9"))
+        self.assertFalse(self.crawler.truncated)
+
+    def test_time_budget(self):
+        self.assertFalse(self.crawler.drunk_crawl("concept_0", "concept_9",
+                                                  time_budget=-1))
+        self.assertTrue(self.crawler.truncated)
+        self.assertEquals(len(self.crawler.crawled), 1)
+
+    def test_find_all_paths_max_depth(self):
+        self.assertEquals(self.crawler.find_all_paths("concept_0",
+                                                      "concept_3"),
+                          [["concept_0", "concept_1", "concept_2",
+                            "concept_3"]])
+        self.assertEquals(self.crawler.find_all_paths("concept_0",
+                                                      "concept_3",
+                                                      max_depth=2), [])
+        self.assertTrue(self.crawler.depth_limited)
+        self.assertFalse(self.crawler.truncated)
+
+
+class DepthLimitTest(unittest.TestCase):
+    def setUp(self):
+        connector = ConceptConnector()
+        # start -> deep_1 -> deep_2 -> deep_3 -> deep_4, start -> target
+        connector.create_concept("start", parent_concepts={"deep_1": 1,
+                                                           "target": 1})
+        for i in range(1, 4):
+            connector.create_concept("deep_" + str(i), parent_concepts={
+                "deep_" + str(i + 1): 1})
+        self.crawler = ConceptCrawler(concept_connector=connector)
+
+    def test_deep_sibling_does_not_stop_find_all_paths(self):
+        self.assertEquals(self.crawler.find_all_paths("start", "target",
+                                                      max_depth=2),
+                          [["start", "target"]])
+        self.assertTrue(self.crawler.depth_limited)
+        self.assertFalse(self.crawler.truncated)
+
+    def test_deep_sibling_does_not_stop_drunk_crawl(self):
+        # whichever branch is crawled first the target is still reached
+        for i in range(10):
+            self.assertTrue(self.crawler.drunk_crawl("start", "target",
+                                                     max_depth=2))
+            self.assertFalse(self.crawler.truncated)
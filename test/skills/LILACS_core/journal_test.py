@@ -0,0 +1,161 @@
+import shutil
+import tempfile
+import time
+import unittest
+from os.path import join
+from threading import Event, Thread
+
+from mycroft.skills.LILACS_core.concept import ConceptConnector
+from mycroft.skills.LILACS_core.journal import ConceptJournal
+from mycroft.skills.LILACS_storage.concept_store import ConceptStore
+
+__author__ = 'jarbas'
+
+
+class FailingStore(object):
+    def __init__(self):
+        self.fail = True
+        self.saved = {}
+
+    def save_many(self, nodes, deleted=()):
+        if self.fail:
+            raise IOError("disk full")
+        for node in nodes:
+            self.saved[node["name"]] = node
+
+
+class BlockingStore(object):
+    # holds every batch until proceed is set
+    def __init__(self, store):
+        self.store = store
+        self.saving = Event()
+        self.proceed = Event()
+
+    def save(self, node):
+        self.store.save(node)
+
+    def save_many(self, nodes, deleted=()):
+        self.saving.set()
+        self.proceed.wait()
+        self.store.save_many(nodes, deleted)
+
+
+class SnapshotJournal(object):
+    # what a flush right after each mark would write
+    def __init__(self, connector):
+        self.connector = connector
+        self.marked = {}
+
+    def mark(self, concept_name):
+        node = self.connector.get_loaded(concept_name)
+        if node is not None:
+            self.marked[concept_name] = node.to_dict()["connections"]
+
+
+class ConceptJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.store = ConceptStore(join(self.folder, "concepts.db"),
+                                  durable=True)
+        self.connector = ConceptConnector()
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.folder)
+
+    def attach(self, store, **kwargs):
+        journal = ConceptJournal(self.connector, store, **kwargs)
+        self.connector.journal = journal
+        self.addCleanup(journal.stop, False)
+        return journal
+
+    def test_flush(self):
+        journal = self.attach(self.store, interval=60)
+        self.connector.create_concept("dog", parent_concepts={"mammal": 1})
+        self.assertEquals(len(journal), 2)
+        self.assertEquals(journal.flush(), 2)
+        self.assertEquals(len(journal), 0)
+        self.assertEquals(self.store.load("mammal")["connections"],
+                          {"childs": {"dog": 1}})
+        self.connector.add_data("dog", "legs", 4)
+        self.connector.remove_concept("mammal")
+        journal.flush()
+        self.assertEquals(self.store.load("dog")["data"], {"legs": 4})
+        self.assertFalse("mammal" in self.store)
+
+    def test_batch_size_wakes_writer(self):
+        journal = self.attach(self.store, batch_size=10, interval=60)
+        for i in range(10):
+            self.connector.create_concept("concept_" + str(i))
+        for i in range(100):
+            if len(self.store) == 10:
+                break
+            time.sleep(0.01)
+        self.assertEquals(len(self.store), 10)
+        self.assertEquals(journal.batches, 1)
+
+    def test_interval(self):
+        self.attach(self.store, interval=0.01)
+        self.connector.create_concept("dog")
+        for i in range(100):
+            if "dog" in self.store:
+                break
+            time.sleep(0.01)
+        self.assertTrue("dog" in self.store)
+
+    def test_failed_batch_is_kept(self):
+        store = FailingStore()
+        journal = self.attach(store, interval=60)
+        self.connector.create_concept("dog")
+        self.assertRaises(IOError, journal.flush)
+        self.assertEquals(len(journal), 1)
+        store.fail = False
+        journal.flush()
+        self.assertEquals(list(store.saved), ["dog"])
+
+    def test_write_back_during_flush(self):
+        store = BlockingStore(self.store)
+        journal = self.attach(store, interval=60)
+        self.connector.create_concept("dog")
+        flushing = Thread(target=journal.flush)
+        flushing.start()
+        store.saving.wait()
+        # changed while the old copy is being written, then evicted
+        self.connector.add_data("dog", "legs", 4)
+        evicting = Thread(target=journal.write_back,
+                          args=("dog", self.connector.get_loaded("dog")))
+        evicting.start()
+        evicting.join(0.1)
+        store.proceed.set()
+        flushing.join()
+        evicting.join()
+        self.assertEquals(self.store.load("dog")["data"], {"legs": 4})
+        self.assertEquals(len(journal), 0)
+
+    def test_marked_during_flush_is_kept(self):
+        store = BlockingStore(self.store)
+        journal = self.attach(store, interval=60)
+        self.connector.create_concept("dog")
+        flushing = Thread(target=journal.flush)
+        flushing.start()
+        store.saving.wait()
+        self.connector.add_data("dog", "legs", 4)
+        store.proceed.set()
+        flushing.join()
+        self.assertEquals(len(journal), 1)
+        journal.flush()
+        self.assertEquals(self.store.load("dog")["data"], {"legs": 4})
+
+    def test_marked_after_change(self):
+        journal = SnapshotJournal(self.connector)
+        self.connector.journal = journal
+        self.connector.create_concept("dog", parent_concepts={"mammal": 1},
+                                      antonims=["cat"])
+        self.assertEquals(journal.marked["mammal"], {"childs": {"dog": 1}})
+        self.assertEquals(journal.marked["cat"], {"antonims": ["dog"]})
+        self.connector.add_parent("dog", "pet")
+        self.assertEquals(journal.marked["dog"]["parents"],
+                          {"mammal": 1, "pet": 1})
+        self.assertEquals(journal.marked["pet"], {"childs": {"dog": 1}})
+        self.connector.disconnect("dog", "parents", "mammal")
+        self.assertEquals(journal.marked["mammal"], {})
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+import unittest
+from os.path import join
+from threading import Thread
+
+from mycroft.skills.LILACS_core.concept import ConceptConnector
+from mycroft.skills.LILACS_core.crawler import ConceptCrawler
+from mycroft.skills.LILACS_core.journal import ConceptJournal
+from mycroft.skills.LILACS_core.working_set import WorkingSet
+from mycroft.skills.LILACS_storage.concept_store import ConceptStore
+
+__author__ = 'jarbas'
+
+
+def build(connector, size=200):
+    # concept_i is a concept_(i / 3), so a tree about 5 levels deep
+    for i in range(1, size):
+        connector.create_concept("concept_" + str(i),
+                                 parent_concepts={"concept_" + str(i / 3): 1},
+                                 synonims=["synonim_" + str(i)])
+
+
+class WorkingSetTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.store = ConceptStore(join(self.folder, "concepts.db"))
+        self.concepts = WorkingSet(self.store, capacity=20)
+        self.connector = ConceptConnector(concepts=self.concepts)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.folder)
+
+    def test_bounded(self):
+        build(self.connector)
+        self.assertEquals(self.concepts.resident(), 20)
+        self.assertTrue(self.concepts.evictions > 0)
+        self.assertEquals(len(self.connector.get_concept_names()), 399)
+
+    def test_same_graph_as_in_memory(self):
+        build(self.connector)
+        memory = ConceptConnector()
+        build(memory)
+        for name in memory.get_concept_names():
+            self.assertEquals(self.connector.get_concepts()[name].to_dict(),
+                              memory.get_concepts()[name].to_dict())
+        self.assertTrue(self.concepts.misses > 0)
+        self.assertEquals(self.concepts.resident(), 20)
+
+    def test_crawl(self):
+        build(self.connector)
+        crawler = ConceptCrawler(concept_connector=self.connector)
+        self.assertEquals(crawler.find_shortest_path("concept_199",
+                                                     "concept_0"),
+                          ["concept_199", "concept_66", "concept_22",
+                           "concept_7", "concept_2", "concept_0"])
+        self.assertTrue(self.connector.is_ancestor("synonim_199",
+                                                   "concept_2"))
+
+    def test_removed_concept_stays_removed(self):
+        build(self.connector)
+        self.connector.remove_concept("concept_1")
+        self.assertFalse(self.connector.has_concept("concept_1"))
+        self.assertTrue("concept_1" in self.store)
+        self.assertFalse("concept_1" in self.connector.get_concept_names())
+
+    def test_journal_writes_back_dirty_nodes(self):
+        journal = ConceptJournal(self.connector, self.store, interval=60)
+        self.addCleanup(journal.stop, False)
+        self.connector.journal = journal
+        self.concepts.journal = journal
+        build(self.connector)
+        # no batch written yet, evicted nodes were written back
+        self.assertEquals(journal.batches, 0)
+        self.assertTrue(len(self.store) >= 399 - 20)
+        journal.flush()
+        self.assertEquals(len(self.store), 399)
+        self.assertEquals(self.store.load("concept_1")["connections"]
+                          ["childs"], {"concept_3": 1, "concept_4": 1,
+                                       "concept_5": 1})
+
+    def test_threads(self):
+        journal = ConceptJournal(self.connector, self.store, batch_size=10,
+                                 interval=0.01)
+        self.addCleanup(journal.stop, False)
+        self.connector.journal = journal
+        self.concepts.journal = journal
+
+        def create(first):
+            for i in range(first, 400, 4):
+                self.connector.create_concept("concept_" + str(i),
+                                              data={"number": i})
+
+        threads = [Thread(target=create, args=(first,)) for first in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        journal.flush()
+        self.assertEquals(len(self.store), 400)
+        self.assertEquals(self.store.load("concept_7")["data"],
+                          {"number": 7})
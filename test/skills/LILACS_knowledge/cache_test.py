@@ -0,0 +1,136 @@
+import shutil
+import tempfile
+import time
+import unittest
+from os.path import join
+
+from pyee import EventEmitter
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.LILACS_knowledge import main
+from mycroft.skills.LILACS_knowledge.services.cache import KnowledgeCache
+
+__author__ = 'jarbas'
+
+
+class MessageEmitter(EventEmitter):
+    def emit(self, message, *args):
+        if isinstance(message, Message):
+            return EventEmitter.emit(self, message.type, message)
+        return EventEmitter.emit(self, message, *args)
+
+
+class CountingBackend(object):
+    def __init__(self, emitter, answer):
+        self.name = "dbpedia"
+        self.emitter = emitter
+        self.answer = answer
+        self.asked = 0
+
+    def adquire(self, subject, request_id=None):
+        self.asked += 1
+        self.emitter.emit(Message("LILACS_result",
+                                  {"data": self.answer,
+                                   "request_id": request_id}))
+
+    def stop(self):
+        pass
+
+
+class KnowledgeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = join(self.folder, "knowledge.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def cache(self, **kwargs):
+        cache = KnowledgeCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_get_put(self):
+        cache = self.cache()
+        self.assertEquals(cache.get("dbpedia", "dog"), None)
+        cache.put("dbpedia", "dog", {"dbpedia": {"dog": "a pet"}})
+        self.assertEquals(cache.get("dbpedia", "dog"),
+                          {"dbpedia": {"dog": "a pet"}})
+        self.assertEquals(cache.get("wikidata", "dog"), None)
+        self.assertEquals((cache.hits, cache.misses), (1, 2))
+
+    def test_persistent(self):
+        self.cache().put("dbpedia", "dog", {"a": 1})
+        self.assertEquals(self.cache().get("dbpedia", "dog"), {"a": 1})
+
+    def test_ttl(self):
+        cache = self.cache(ttl=0.05)
+        cache.put("dbpedia", "dog", {"a": 1})
+        time.sleep(0.1)
+        self.assertEquals(cache.get("dbpedia", "dog"), None)
+        self.assertEquals(len(cache), 0)
+        self.assertEquals(cache.size, 0)
+
+    def test_size_cap_evicts_least_recently_used(self):
+        answer = {"data": "x" * 100}
+        cache = self.cache(max_size=1000)
+        for i in range(8):
+            cache.put("dbpedia", "subject_" + str(i), answer)
+            time.sleep(0.001)
+        cache.get("dbpedia", "subject_0")
+        cache.put("dbpedia", "subject_8", answer)
+        self.assertTrue(cache.size <= 1000)
+        self.assertTrue(len(cache) < 9)
+        self.assertNotEquals(cache.get("dbpedia", "subject_0"), None)
+        self.assertNotEquals(cache.get("dbpedia", "subject_8"), None)
+        self.assertEquals(cache.get("dbpedia", "subject_1"), None)
+
+    def test_replay(self):
+        self.cache(ttl=0.01).put("dbpedia", "dog", {"a": 1})
+        time.sleep(0.05)
+        cache = self.cache(ttl=0.01, replay=True)
+        self.assertEquals(cache.get("dbpedia", "dog"), {"a": 1})
+        cache.put("dbpedia", "cat", {"a": 2})
+        self.assertEquals(len(cache), 1)
+
+
+class CachedAdquireTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.results = []
+        main.ws = MessageEmitter()
+        main.ws.on("LILACS_result", main._cache_result)
+        main.ws.on("LILACS_result",
+                   lambda message: self.results.append(message.data))
+
+    def tearDown(self):
+        main.cache.close()
+        main.cache = None
+        shutil.rmtree(self.folder)
+
+    def test_answers_are_cached(self):
+        main.cache = KnowledgeCache(join(self.folder, "knowledge.db"))
+        backend = CountingBackend(main.ws, {"dbpedia": {"dog": "a pet"}})
+        main.adquire("dog", backend, "1")
+        main.adquire("dog", backend, "2")
+        self.assertEquals(backend.asked, 1)
+        self.assertEquals(self.results,
+                          [{"data": {"dbpedia": {"dog": "a pet"}},
+                            "request_id": "1"},
+                           {"data": {"dbpedia": {"dog": "a pet"}},
+                            "request_id": "2"}])
+
+    def test_failures_are_not_cached(self):
+        main.cache = KnowledgeCache(join(self.folder, "knowledge.db"))
+        backend = CountingBackend(main.ws, {})
+        main.adquire("dog", backend, "1")
+        main.adquire("dog", backend, "2")
+        self.assertEquals(backend.asked, 2)
+
+    def test_replay_does_not_ask_backends(self):
+        main.cache = KnowledgeCache(join(self.folder, "knowledge.db"),
+                                    replay=True)
+        backend = CountingBackend(main.ws, {"dbpedia": {"dog": "a pet"}})
+        main.adquire("dog", backend, "1")
+        self.assertEquals(backend.asked, 0)
+        self.assertEquals(self.results, [{"data": {}, "request_id": "1"}])
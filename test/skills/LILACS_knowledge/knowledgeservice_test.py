@@ -0,0 +1,171 @@
+import time
+import unittest
+from threading import Thread
+
+from pyee import EventEmitter
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.LILACS_knowledge.knowledgeservice import KnowledgeService
+
+__author__ = 'jarbas'
+
+
+class MessageEmitter(EventEmitter):
+    """ in process bus, handlers get the Message like on the websocket """
+
+    def emit(self, message, *args):
+        if isinstance(message, Message):
+            return EventEmitter.emit(self, message.type, message)
+        return EventEmitter.emit(self, message, *args)
+
+
+class SlowBackend(object):
+    """ answers every request after a delay given in the subject """
+
+    def __init__(self, emitter, echo_id=True):
+        self.emitter = emitter
+        self.echo_id = echo_id
+        emitter.on('LILACS_KnowledgeService_adquire', self.adquire)
+
+    def adquire(self, message):
+        Thread(target=self.answer, args=(message.data,)).start()
+
+    def answer(self, data):
+        time.sleep(data["subject"])
+        result = {"data": {"delay": data["subject"]}}
+        if self.echo_id:
+            result["request_id"] = data["request_id"]
+        self.emitter.emit(Message("LILACS_result", result))
+
+
+class KnowledgeServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MessageEmitter()
+
+    def test_adquire(self):
+        SlowBackend(self.emitter)
+        service = KnowledgeService(self.emitter)
+        self.assertEquals(service.adquire(0.01), {"delay": 0.01})
+
+    def test_concurrent_adquire(self):
+        SlowBackend(self.emitter)
+        service = KnowledgeService(self.emitter)
+        results = {}
+
+        def adquire(delay):
+            results[delay] = service.adquire(delay)
+
+        threads = [Thread(target=adquire, args=(delay,))
+                   for delay in [0.3, 0.2, 0.1]]
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # answered out of order, each waiter got its own answer
+        for delay in [0.3, 0.2, 0.1]:
+            self.assertEquals(results[delay], {"delay": delay})
+        self.assertTrue(time.time() - start < 0.55)
+
+    def test_timeout(self):
+        service = KnowledgeService(self.emitter, timeout=0.05)
+        self.assertEquals(service.adquire("nobody answers"), {})
+        self.assertEquals(len(service.pending), 0)
+
+    def test_backend_without_request_id(self):
+        SlowBackend(self.emitter, echo_id=False)
+        service = KnowledgeService(self.emitter)
+        self.assertEquals(service.adquire(0.01), {"delay": 0.01})
+
+
+class Backends(object):
+    """ answers after the delay of the backend named in the utterance """
+
+    def __init__(self, emitter, delays, answers):
+        self.emitter = emitter
+        self.delays = delays
+        self.answers = answers
+        emitter.on('LILACS_KnowledgeService_adquire', self.adquire)
+
+    def adquire(self, message):
+        Thread(target=self.answer, args=(message.data,)).start()
+
+    def answer(self, data):
+        backend = data["utterance"]
+        time.sleep(self.delays[backend])
+        self.emitter.emit(Message("LILACS_result",
+                                  {"data": self.answers.get(backend, {}),
+                                   "request_id": data["request_id"]}))
+
+
+class AdquireFirstTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MessageEmitter()
+        self.service = KnowledgeService(self.emitter, timeout=2)
+
+    def adquire_first(self, delays, answers, backends=None):
+        Backends(self.emitter, delays, answers)
+        start = time.time()
+        result = self.service.adquire_first(
+            "dog", backends or ["dbpedia", "wikidata", "wikipedia"])
+        return result, time.time() - start
+
+    def test_backends_asked_at_once(self):
+        # the first two have nothing, sequential would take 0.6 seconds
+        (chosen, answers), elapsed = self.adquire_first(
+            {"dbpedia": 0.2, "wikidata": 0.2, "wikipedia": 0.2},
+            {"wikipedia": {"wikipedia": "a pet"}})
+        self.assertEquals(chosen, "wikipedia")
+        self.assertEquals(answers["wikipedia"], {"wikipedia": "a pet"})
+        self.assertTrue(elapsed < 0.45)
+
+    def test_priority_order(self):
+        # wikidata answers first but dbpedia is preferred
+        (chosen, answers), elapsed = self.adquire_first(
+            {"dbpedia": 0.2, "wikidata": 0.01, "wikipedia": 1},
+            {"dbpedia": {"dbpedia": "a pet"},
+             "wikidata": {"wikidata": "an animal"},
+             "wikipedia": {"wikipedia": "a mammal"}})
+        self.assertEquals(chosen, "dbpedia")
+        # merged with what arrived, not waiting for the slow backend
+        self.assertEquals(sorted(answers), ["dbpedia", "wikidata"])
+        self.assertTrue(elapsed < 0.8)
+
+    def test_accept(self):
+        Backends(self.emitter, {"dbpedia": 0, "wikidata": 0},
+                 {"dbpedia": {"dbpedia": {}},
+                  "wikidata": {"wikidata": "an animal"}})
+        chosen, answers = self.service.adquire_first(
+            "dog", ["dbpedia", "wikidata"],
+            accept=lambda backend, answer: bool(answer[backend]))
+        self.assertEquals(chosen, "wikidata")
+
+    def test_timeout(self):
+        self.service.timeout = 0.1
+        (chosen, answers), elapsed = self.adquire_first(
+            {"dbpedia": 1, "wikidata": 1}, {}, ["dbpedia", "wikidata"])
+        self.assertEquals(chosen, None)
+        self.assertEquals(answers, {})
+        self.assertTrue(elapsed < 0.5)
+
+    def test_latency_metrics(self):
+        self.service.metrics.flush = lambda: None
+        self.adquire_first({"dbpedia": 0.05, "wikidata": 0.01,
+                            "wikipedia": 0.01},
+                           {"dbpedia": {"dbpedia": "a pet"}})
+        timers = self.service.metrics._timers
+        self.assertTrue(timers["knowledge.dbpedia"][0] >= 0.05)
+        self.assertEquals(len(timers["knowledge.wikidata"]), 1)
+
+    def test_metrics_flushed_periodically(self):
+        flushes = []
+        self.service.metrics.flush = lambda: flushes.append(time.time())
+        delays = {"dbpedia": 0.01, "wikidata": 0.01}
+        answers = {"dbpedia": {"dbpedia": "a pet"}}
+        self.adquire_first(delays, answers, ["dbpedia"])
+        self.assertEquals(flushes, [])
+        self.service.FLUSH_INTERVAL = 0
+        self.adquire_first(delays, answers, ["wikidata"])
+        self.assertEquals(len(flushes), 1)
+        self.service.shutdown()
+        self.assertEquals(len(flushes), 2)
@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+import unittest
+from os.path import join
+
+from mycroft.skills.LILACS_core.concept import ConceptConnector, ConceptNode
+from mycroft.skills.LILACS_storage.concept_store import ConceptStore
+
+__author__ = 'jarbas'
+
+
+class ConceptStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = join(self.folder, "lilacs", "concepts.db")
+        self.store = ConceptStore(self.path)
+        connector = ConceptConnector()
+        connector.create_concept("dog", data={"legs": 4},
+                                 parent_concepts={"mammal": 2, "pet": 5},
+                                 synonims=["canine", "hound"])
+        connector.create_concept("mammal", parent_concepts={"animal": 1})
+        self.concepts = connector.get_concepts()
+        self.store.save_many([node.to_dict()
+                              for node in self.concepts.values()])
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.folder)
+
+    def test_round_trip(self):
+        dog = ConceptNode.from_dict(self.store.load("dog"))
+        self.assertEquals(dog.get_parents(), {"mammal": 2, "pet": 5})
+        self.assertEquals(dog.get_synonims(), ["canine", "hound"])
+        self.assertEquals(dog.get_data(), {"legs": 4})
+        self.assertEquals(dog.to_dict(), self.concepts["dog"].to_dict())
+        self.assertEquals(self.store.load("cat"), None)
+
+    def test_load_with_neighbours(self):
+        nodes = self.store.load_with_neighbours("mammal")
+        self.assertEquals(sorted(nodes), ["animal", "dog", "mammal"])
+        self.assertEquals(nodes["dog"]["connections"]["parents"],
+                          {"mammal": 2, "pet": 5})
+        self.assertEquals(self.store.load_with_neighbours("cat"), {})
+
+    def test_save_replaces_connections(self):
+        dog = self.concepts["dog"]
+        dog.remove_parent("pet")
+        self.store.save(dog.to_dict())
+        self.assertEquals(self.store.load("dog")["connections"]["parents"],
+                          {"mammal": 2})
+
+    def test_persistent(self):
+        self.store.close()
+        self.store = ConceptStore(self.path)
+        self.assertEquals(len(self.store), len(self.concepts))
+        self.assertTrue("canine" in self.store)
+        self.store.delete("canine")
+        self.assertFalse("canine" in self.store)
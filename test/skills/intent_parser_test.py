@@ -0,0 +1,110 @@
+import time
+import unittest
+
+from pyee import EventEmitter
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.intent_parser import IntentParser, IntentTree
+
+__author__ = 'jarbas'
+
+
+class MessageEmitter(EventEmitter):
+    """ in process bus, handlers get the Message like on the websocket """
+
+    def emit(self, message, *args):
+        if isinstance(message, Message):
+            return EventEmitter.emit(self, message.type, message)
+        return EventEmitter.emit(self, message, *args)
+
+
+def intent(name):
+    return {"name": name, "requires": [(name + "Keyword", name + "Keyword")],
+            "at_least_one": [], "optional": []}
+
+
+class IntentRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MessageEmitter()
+        self.parser = IntentParser(self.emitter)
+        for name in ["1:A", "1:B", "2:C"]:
+            self.parser.register_intent(intent(name))
+
+    def active(self):
+        return [parser.name for parser in self.parser.engine.intent_parsers]
+
+    def update(self, **data):
+        self.emitter.emit(Message("update_intents", data))
+
+    def test_batch(self):
+        self.update(skill_id=1, disable=["A", "B"])
+        self.assertEquals(self.active(), ["2:C"])
+        self.update(skill_id=1, enable=["B"], disable=["A"])
+        self.assertEquals(self.active(), ["1:B", "2:C"])
+        # enabled intents keep their place
+        self.update(enable=["1:A"])
+        self.assertEquals(self.active(), ["1:A", "1:B", "2:C"])
+
+    def test_detach(self):
+        self.emitter.emit(Message("detach_intent", {"intent_name": "1:A"}))
+        self.update(skill_id=2, detach=["C"])
+        self.assertEquals(self.active(), ["1:B"])
+        self.update(enable=["1:A"])
+        self.assertEquals(self.active(), ["1:B"])
+
+    def test_register_again(self):
+        self.parser.register_intent(intent("1:A"))
+        self.assertEquals(self.active(), ["1:A", "1:B", "2:C"])
+
+    def test_disabled_before_registered(self):
+        self.update(disable=["3:D"])
+        self.parser.register_intent(intent("3:D"))
+        self.assertEquals(self.active(), ["1:A", "1:B", "2:C"])
+        self.update(enable=["3:D"])
+        self.assertEquals(self.active(), ["1:A", "1:B", "2:C", "3:D"])
+
+
+class IntentTreeTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MessageEmitter()
+        self.parser = IntentParser(self.emitter)
+        self.updates = []
+        self.emitter.on("update_intents", self.updates.append)
+        self.layers = [["Layer%dIntent%d" % (layer, i) for i in range(100)]
+                       for layer in range(3)]
+        for layer in self.layers:
+            for name in layer:
+                self.parser.register_intent(intent("7:" + name))
+
+    def active(self):
+        return set(parser.name for parser in self.parser.engine.intent_parsers)
+
+    def test_switch_layers(self):
+        tree = IntentTree(self.emitter, self.layers, skill_id=7)
+        self.assertEquals(self.active(),
+                          set("7:" + name for name in self.layers[0]))
+        start = time.time()
+        tree.activate_layer(2)
+        elapsed = time.time() - start
+        self.assertEquals(self.active(),
+                          set("7:" + name for name in self.layers[2]))
+        # one message per switch, applied without waiting
+        self.assertEquals(len(self.updates), 2)
+        self.assertTrue(elapsed < 0.05, elapsed)
+
+    def test_invalid_layer(self):
+        tree = IntentTree(self.emitter, self.layers, skill_id=7)
+        tree.activate_layer(3)
+        self.assertEquals(tree.current_layer, 0)
+        self.assertEquals(len(self.updates), 1)
+
+    def test_without_skill_id(self):
+        intents = []
+        self.emitter.on("enable_intent", intents.append)
+        tree = IntentTree(self.emitter, self.layers)
+        tree.activate_layer(1)
+        # the skill handles per intent messages, nothing piles up
+        self.assertEquals(len(self.updates), 0)
+        self.assertEquals(self.parser.disabled, set())
+        self.assertEquals([message.data["intent_name"]
+                           for message in intents[-100:]], self.layers[1])
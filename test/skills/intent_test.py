@@ -0,0 +1,117 @@
+import time
+import unittest
+from threading import Thread
+
+from pyee import EventEmitter
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.intent import Intent
+
+__author__ = 'jarbas'
+
+CONVERSE_DELAY = 0.05
+
+
+class MessageEmitter(EventEmitter):
+    """ in process bus, handlers get the Message like on the websocket """
+
+    def emit(self, message, *args):
+        if isinstance(message, Message):
+            return EventEmitter.emit(self, message.type, message)
+        return EventEmitter.emit(self, message, *args)
+
+
+class ConversingSkills(object):
+    """ answers converse requests after a delay, like the skills service """
+
+    def __init__(self, emitter, accepting=(), delays=None, echo_id=True):
+        self.emitter = emitter
+        self.accepting = accepting
+        self.delays = delays or {}
+        self.echo_id = echo_id
+        self.asked = []
+        emitter.on("converse_status_request", self.converse)
+
+    def converse(self, message):
+        self.asked.append(message.data["skill_id"])
+        Thread(target=self.answer, args=(message.data,)).start()
+
+    def answer(self, data):
+        skill_id = data["skill_id"]
+        delay = self.delays.get(skill_id, CONVERSE_DELAY)
+        if delay is None:
+            return
+        time.sleep(delay)
+        response = {"skill_id": skill_id,
+                    "result": skill_id in self.accepting}
+        if self.echo_id:
+            response["request_id"] = data["request_id"]
+        self.emitter.emit(Message("converse_status_response", response))
+
+
+class ConverseTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MessageEmitter()
+        self.intent = Intent(self.emitter, converse_wait=1)
+        engine = self.intent.intent_parser.engine
+        engine.register_entity("time", "TimeKeyword")
+        self.intent.intent_parser.register_intent(
+            {"name": "99:TimeIntent",
+             "requires": [("TimeKeyword", "TimeKeyword")],
+             "at_least_one": [], "optional": []})
+        self.intents = []
+        self.emitter.on("99:TimeIntent", self.intents.append)
+
+    def activate(self, *skill_ids):
+        for skill_id in skill_ids:
+            self.intent.add_active_skill(skill_id)
+
+    def utterance(self):
+        start = time.time()
+        self.emitter.emit(Message("recognizer_loop:utterance",
+                                  {"utterances": ["what time is it"],
+                                   "lang": "en-us"}))
+        return time.time() - start
+
+    def test_latency(self):
+        ConversingSkills(self.emitter)
+        for skills in [0, 5, 20]:
+            self.intent.active_skills = []
+            self.activate(*range(1, skills + 1))
+            elapsed = self.utterance()
+            self.assertEquals(len(self.intents), 1)
+            del self.intents[:]
+            # skills are asked at once, not one after the other
+            if skills:
+                self.assertTrue(elapsed < 5 * CONVERSE_DELAY, elapsed)
+            else:
+                self.assertTrue(elapsed < CONVERSE_DELAY, elapsed)
+
+    def test_most_recent_skill_wins(self):
+        # skill 1 answers first but skill 2 was active more recently
+        skills = ConversingSkills(self.emitter, accepting=(1, 2),
+                                  delays={1: 0, 2: 0.1})
+        self.activate(1, 2, 3)
+        self.utterance()
+        self.assertEquals(sorted(skills.asked), [1, 2, 3])
+        self.assertEquals(self.intents, [])
+        self.assertEquals(self.intent.active_skills[0][0], 2)
+
+    def test_does_not_wait_for_less_recent_skills(self):
+        ConversingSkills(self.emitter, accepting=(2,), delays={1: None})
+        self.activate(1, 2)
+        self.assertTrue(self.utterance() < self.intent.converse_wait)
+        self.assertEquals(self.intents, [])
+
+    def test_timeout(self):
+        self.intent.converse_wait = 0.1
+        ConversingSkills(self.emitter, accepting=(1,), delays={1: None})
+        self.activate(1)
+        elapsed = self.utterance()
+        self.assertEquals(len(self.intents), 1)
+        self.assertTrue(0.1 <= elapsed < 1, elapsed)
+
+    def test_answer_without_request_id(self):
+        ConversingSkills(self.emitter, accepting=(1,), echo_id=False)
+        self.activate(1)
+        self.assertTrue(self.intent.do_conversation(["hello"], 1, "en-us"))
@@ -0,0 +1,94 @@
+import time
+import unittest
+
+from speech_recognition import AudioData
+
+from mycroft.stt import STT, STTStream, StreamingSTT
+
+__author__ = 'jarbas'
+
+# seconds the stand in spends on every byte of audio
+COST_PER_BYTE = 0.0005
+CHUNK = 16
+
+
+def chunks(text):
+    return [word.ljust(CHUNK) for word in text.split()]
+
+
+class LocalSTT(StreamingSTT):
+    """
+    Streaming stand in, the audio holds the words and recognizing a chunk
+    takes time in proportion to its size
+    """
+
+    def __init__(self):
+        super(LocalSTT, self).__init__()
+        self.received = []
+
+    def stream_audio(self, chunks, sample_rate, sample_width, language=None):
+        words = []
+        for chunk in chunks:
+            self.received.append(chunk)
+            time.sleep(len(chunk) * COST_PER_BYTE)
+            words.extend(chunk.split())
+        if "fail" in words:
+            raise ValueError("could not understand")
+        return " ".join(words)
+
+
+class ClipSTT(STT):
+    def execute(self, audio, language=None):
+        return audio.frame_data.upper()
+
+
+class STTStreamTest(unittest.TestCase):
+    def test_buffers_for_execute(self):
+        stream = ClipSTT().stream(16000, 2)
+        for chunk in ["ab", "cd"]:
+            stream.write(chunk)
+        self.assertEquals(stream.stop(), "ABCD")
+        self.assertFalse(ClipSTT.streaming)
+
+
+class StreamingSTTTest(unittest.TestCase):
+    def setUp(self):
+        self.stt = LocalSTT()
+        self.audio = chunks("what time is it in new york " * 3)
+
+    def speak(self, stream):
+        # chunks arrive in real time, slower than they are recognized
+        for chunk in self.audio:
+            stream.write(chunk)
+            time.sleep(2 * CHUNK * COST_PER_BYTE)
+
+    def test_transcribes_while_recording(self):
+        stream = self.stt.stream(16000, 2)
+        self.speak(stream)
+        self.assertTrue(len(self.stt.received) >= len(self.audio) - 1)
+        start = time.time()
+        text = stream.stop()
+        latency = time.time() - start
+        self.assertEquals(text, "what time is it in new york " * 2 +
+                          "what time is it in new york")
+        clip = AudioData("".join(self.audio), 16000, 2)
+        start = time.time()
+        self.assertEquals(self.stt.execute(clip), text)
+        # only the last chunk is left when the user stops talking
+        self.assertTrue(latency < (time.time() - start) / 4, latency)
+
+    def test_error(self):
+        stream = self.stt.stream(16000, 2)
+        for chunk in chunks("please fail"):
+            stream.write(chunk)
+        self.assertRaises(ValueError, stream.stop)
+
+    def test_cancel(self):
+        stream = self.stt.stream(16000, 2)
+        stream.write(self.audio[0])
+        start = time.time()
+        stream.cancel()
+        self.assertTrue(time.time() - start < CHUNK * COST_PER_BYTE)
+        stream.thread.join(1)
+        self.assertFalse(stream.thread.is_alive())
+        self.assertTrue(isinstance(stream, STTStream))